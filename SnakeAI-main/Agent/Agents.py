@@ -1,5 +1,5 @@
+from Agent.DecisionCache import DecisionCache
 import random
-import tensorflow
 import numpy as np
 #import keyboard    used for human player, unused in final setup
 
@@ -63,12 +63,17 @@ class RandomAgent(Agent):
 #            return 1
         
 
+#With decisionCache > 0, the moves chosen for up to that many states are remembered, see DecisionCache.
 class AIAgent(Agent):
-        def __init__(self, model):
+        def __init__(self, model, decisionCache=0):
             super().__init__()
             self.model = model
             self.energyMax = 300 #How long can go without food before dying, prevents infinite loops or extremely slow paths
             self.energy = self.energyMax
+            self.decisions = None
+            if(decisionCache > 0):
+                self.decisions = DecisionCache(decisionCache)
+                self.weightsVersion = None #Version of the model's weights the cached moves were chosen with
 
 
         def reset(self):
@@ -77,6 +82,8 @@ class AIAgent(Agent):
             self.foodEaten = 0
             self.died = False
             self.energy = self.energyMax
+            if(self.decisions != None):
+                self.decisions.clear()
             
         def MakeMove(self, g):
             distToFood = g.GetDistance(g.snake.head, g.food)
@@ -110,11 +117,26 @@ class AIAgent(Agent):
 
 
         #Model uses input to choose 3 moves, left forward or right.
+        #The model can be a Keras model or a NumpyModel, anything callable on a batch of inputs.
+        #With a decision cache, states already seen are answered from it. It is cleared when a NumpyModel's weights
+        #change, other models need the agent to be reset after changing them.
         def ChooseMove(self, input):
+            decisions = self.decisions
+            if(decisions != None):
+                version = getattr(self.model, "version", None)
+                if(version != self.weightsVersion):
+                    decisions.clear()
+                    self.weightsVersion = version
+                key = np.asarray(input).tobytes()
+                move = decisions.get(key)
+                if(move != None):
+                    return move
             #input = tensorflow.cast(input, float)
-            input = tensorflow.expand_dims(input, axis=0)
+            input = np.expand_dims(input, axis=0)
             choices = self.model(input)
             bestChoice = np.argmax(choices)
+            if(decisions != None):
+                decisions.put(key, bestChoice)
             return bestChoice
 
             
\ No newline at end of file
@@ -0,0 +1,93 @@
+import numpy as np
+
+#Activation functions, computed in float32 the same way Keras does
+def relu(x):
+    return np.maximum(x, 0)
+
+def softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+def linear(x):
+    return x
+
+ACTIVATIONS = {"relu": relu, "softmax": softmax, "linear": linear}
+
+#Most genomes whose weights forward gathers at once, so running a subset of a large population
+#never copies more than this many genomes' weights
+GATHER_ROWS = 256
+
+#Returns the layer list of a Keras Sequential model of Dense layers, as (inputs, outputs, activation) tuples
+def layersFromKeras(model):
+    layers = []
+    for layer in model.layers:
+        kernel = layer.get_weights()[0]
+        layers.append((kernel.shape[0], kernel.shape[1], layer.activation.__name__))
+    return layers
+
+#Runs a whole population of Dense networks with the same architecture at once.
+#Each layer's weights are kept as stacked (P, in, out) kernels and (P, 1, out) biases,
+#so one step of every game is one batched matmul per layer instead of one model call per game.
+class BatchedModel:
+    def __init__(self, layers):
+        self.layers = layers
+        self.numParams = sum(inSize*outSize + outSize for inSize, outSize, _ in layers)
+        self.kernels = []
+        self.biases = []
+
+    @classmethod
+    def fromKeras(self, model):
+        return self(layersFromKeras(model))
+
+    #Unpacks flat weight vectors, one row per genome, laid out the same way as
+    #pygad.kerasga.model_weights_as_vector: each layer's kernel (row major) followed by its bias.
+    #The weights are copied, so setGenome never writes into the caller's array. Without copy, the kernels and biases
+    #are views into solutions (when it is already float32), which then must not change while they are used.
+    def setPopulation(self, solutions, copy=True):
+        if(copy):
+            solutions = np.array(solutions, dtype=np.float32)
+        else:
+            solutions = np.asarray(solutions, dtype=np.float32)
+        if(solutions.ndim == 1):
+            solutions = solutions[None, :]
+        count = solutions.shape[0]
+        self.kernels = []
+        self.biases = []
+        start = 0
+        for inSize, outSize, _ in self.layers:
+            end = start + inSize*outSize
+            self.kernels.append(solutions[:, start:end].reshape(count, inSize, outSize))
+            self.biases.append(solutions[:, end:end+outSize].reshape(count, 1, outSize))
+            start = end + outSize
+
+    #Replaces the weights of one genome with a flat weight vector
+    def setGenome(self, row, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        start = 0
+        for (inSize, outSize, _), kernel, bias in zip(self.layers, self.kernels, self.biases):
+            end = start + inSize*outSize
+            kernel[row] = vector[start:end].reshape(inSize, outSize)
+            bias[row, 0] = vector[end:end+outSize]
+            start = end + outSize
+
+    #Runs inputs of shape (B, in) or (B, K, in) through the networks of the given genomes (all by default).
+    #Row i of the inputs is fed to genome rows[i]. Returns the output layer, shaped like the inputs.
+    def forward(self, inputs, rows=None):
+        if(rows is not None and len(rows) > GATHER_ROWS):
+            return np.concatenate([self.forward(inputs[i:i+GATHER_ROWS], rows[i:i+GATHER_ROWS]) for i in range(0, len(rows), GATHER_ROWS)])
+        x = np.asarray(inputs, dtype=np.float32)
+        single = x.ndim == 2
+        if(single):
+            x = x[:, None, :]
+        for (_, _, activation), kernel, bias in zip(self.layers, self.kernels, self.biases):
+            if(rows is not None):
+                kernel = kernel[rows]
+                bias = bias[rows]
+            x = ACTIVATIONS[activation](np.matmul(x, kernel) + bias)
+        if(single):
+            x = x[:, 0, :]
+        return x
+
+    #Picks a move for each input the same way AIAgent.ChooseMove does, by taking the argmax of the output
+    def chooseMoves(self, inputs, rows=None):
+        return np.argmax(self.forward(inputs, rows), axis=-1)
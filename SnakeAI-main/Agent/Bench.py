@@ -0,0 +1,149 @@
+from Agent.Agents import RandomAgent, AIAgent
+from Agent.NumpyModel import loadModel
+from Game.Grid import Grid, Direction, EMPTY
+import numpy as np
+import contextlib
+import platform
+import tempfile
+import timeit
+import time
+import json
+import io
+
+#Benchmarks of the game and training hot paths, used by "main.py bench".
+#Every result is a named metric with a unit and whether higher or lower is better, so runs can be saved
+#as JSON and compared against a stored baseline.
+
+GRID_SIZES = [10, 30, 100, 200]
+MODELS = ["ExtraSmall", "Small", "MediumSize", "Large", "ExtraLarge"]
+
+#Returns the best time per call of fn, out of repeats runs of enough calls to take at least 0.2 seconds
+def perCall(fn, repeats=3):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+#Sets up a grid of the given size with the agent, ready to play
+def makeGrid(size, agent):
+    grid = Grid(size, size, agent)
+    grid.Setup()
+    return grid
+
+#Steps per second of Grid.gameLoop played by a RandomAgent, over back to back games for at least minTime seconds
+def gameLoopRate(size, minTime=0.5, repeats=3):
+    agent = RandomAgent()
+    grid = makeGrid(size, agent)
+    best = 0.0
+    for i in range(repeats):
+        steps = 0
+        start = time.perf_counter()
+        while(time.perf_counter()-start < minTime):
+            grid.reset()
+            agent.reset()
+            grid.startLoopNoGUI()
+            steps += agent.steps
+        best = max(best, steps/(time.perf_counter()-start))
+    return best
+
+#Seconds per call of Grid.getState, Snake.Look (averaged over the 4 directions) and placeRandomFood
+#(including taking the previous food off the board) on a freshly set up grid
+def gridCallCosts(size):
+    grid = makeGrid(size, RandomAgent())
+    snake = grid.snake
+    directions = list(Direction)
+
+    def look():
+        for direction in directions:
+            snake.Look(direction)
+
+    def placeFood():
+        grid.setType(grid.food, EMPTY)
+        grid.placeRandomFood()
+
+    return {"getState": perCall(grid.getState),
+            "Look": perCall(look)/len(directions),
+            "placeRandomFood": perCall(placeFood)}
+
+#Seconds per call of AIAgent.ChooseMove with the named model
+def chooseMoveCost(modelName):
+    agent = AIAgent(loadModel(modelName))
+    state = makeGrid(30, agent).getState()
+    return perCall(lambda: agent.ChooseMove(state))
+
+#Trains the named model for a few generations on a grid of the given size, without saving anything,
+#and returns (games played per second, seconds per generation)
+def trainingRate(modelName, size, populationSize, generations, workers=0):
+    from Agent.Training import Population
+    from Agent.TrainOptions import TrainOptions
+    with tempfile.TemporaryDirectory() as folder:
+        population = Population({"gridHeight": size, "gridWidth": size}, modelName=modelName)
+        population.statPath = folder
+        population.saveModels = False
+        np.random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            population.run(modelName, TrainOptions(populationSize, generations, max(2, populationSize//4), seed=0, workers=workers, checkpointEvery=0))
+            elapsed = time.perf_counter() - start
+    return population.gamesPlayed/elapsed, elapsed/generations
+
+#Runs the benchmarks, printing each result as it comes in. Returns them as a dict of name -> {value, unit, better}
+def runBenchmarks(gridSizes=GRID_SIZES, models=MODELS, populationSize=20, generations=2, workers=0, training=True):
+    results = {}
+
+    def record(name, value, unit, better):
+        results[name] = {"value": value, "unit": unit, "better": better}
+        print(name.ljust(48), formatValue(value, unit))
+
+    for size in gridSizes:
+        label = str(size) + "x" + str(size)
+        record("gameLoop/random/" + label, gameLoopRate(size), "steps/s", "higher")
+        for name, seconds in gridCallCosts(size).items():
+            record(name + "/" + label, seconds*1e6, "us/call", "lower")
+    for modelName in models:
+        record("ChooseMove/" + modelName, chooseMoveCost(modelName)*1e6, "us/call", "lower")
+    if(training):
+        for modelName in models:
+            for size in gridSizes:
+                label = modelName + "/" + str(size) + "x" + str(size)
+                games, generation = trainingRate(modelName, size, populationSize, generations, workers)
+                record("train/evaluations/" + label, games, "games/s", "higher")
+                record("train/generation/" + label, generation, "s/generation", "lower")
+    return results
+
+def formatValue(value, unit):
+    return ("%.4g" % value) + " " + unit
+
+#Describes the machine and software a run was made on, saved with its results
+def environment():
+    return {"python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def saveResults(path, results, settings):
+    with open(path, 'w') as file:
+        json.dump({"environment": environment(), "settings": settings, "results": results}, file, indent=2)
+
+#Compares results to a baseline saved by saveResults, printing each metric's speedup (above 1 is faster).
+#Returns the names of metrics that got slower by more than tolerance.
+def compareResults(results, baselinePath, tolerance=0.1):
+    with open(baselinePath, 'r') as file:
+        baseline = json.load(file)["results"]
+    regressions = []
+    print("\nCompared to " + baselinePath + ":")
+    for name, result in results.items():
+        if(name not in baseline):
+            continue
+        old = baseline[name]["value"]
+        new = result["value"]
+        if(result["better"] == "higher"):
+            speedup = new/old if old > 0 else float("inf")
+        else:
+            speedup = old/new if new > 0 else float("inf")
+        status = ""
+        if(speedup < 1-tolerance):
+            status = "  REGRESSION"
+            regressions.append(name)
+        print(name.ljust(48), formatValue(old, result["unit"]).rjust(20), "->", formatValue(new, result["unit"]).rjust(20), ("x%.2f" % speedup).rjust(8) + status)
+    return regressions
@@ -0,0 +1,33 @@
+import numpy as np
+import json
+import os
+
+#Checkpoints are uncompressed .npz files: the population matrix and every per generation stat as its own array,
+#and the scalar settings and random generator states as a JSON string.
+#They are written to a temporary file and renamed over the old checkpoint, so a crash mid write never leaves a broken one.
+
+#Writes arrays (a dict of name -> array) and info (a dict of JSON values) to path atomically
+def saveCheckpoint(path, arrays, info):
+    folder = os.path.dirname(path)
+    if(folder and not os.path.exists(folder)):
+        os.makedirs(folder)
+    temp = path + ".tmp"
+    with open(temp, "wb") as file:
+        np.savez(file, info=np.array(json.dumps(info)), **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp, path)
+
+#Returns (arrays, info) from a checkpoint written by saveCheckpoint
+def loadCheckpoint(path):
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files if name != "info"}
+        info = json.loads(str(data["info"]))
+    return arrays, info
+
+#A numpy Generator's state as JSON values, and back
+def generatorState(generator):
+    return generator.bit_generator.state
+
+def setGeneratorState(generator, state):
+    generator.bit_generator.state = state
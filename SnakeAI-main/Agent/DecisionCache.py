@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+#Remembers the moves an agent's model chose for the states it has seen, so a state seen again in the same game
+#(a snake going round in a loop, or just living long) doesn't run the model again.
+#States are keyed by the bytes of the state array. Holds at most maxSize of them, dropping the least recently used first.
+#Moves only hold for one set of weights, so the cache is cleared whenever the agent is reset or its model's weights change.
+class DecisionCache:
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.moves = OrderedDict() #state key -> move, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.moves)
+
+    #Returns the move chosen for a state, or None
+    def get(self, key):
+        move = self.moves.get(key)
+        if(move is None):
+            self.misses += 1
+            return None
+        self.moves.move_to_end(key)
+        self.hits += 1
+        return move
+
+    def put(self, key, move):
+        self.moves[key] = move
+        if(len(self.moves) > self.maxSize):
+            self.moves.popitem(last=False)
+
+    def clear(self):
+        self.moves.clear()
+
+    #Returns the hits and misses since the last call, and starts counting again
+    def takeCounts(self):
+        counts = (self.hits, self.misses)
+        self.hits = 0
+        self.misses = 0
+        return counts
+
+def hitRate(hits, misses):
+    return hits / (hits+misses) if hits+misses > 0 else 0.0
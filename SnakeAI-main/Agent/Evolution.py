@@ -0,0 +1,145 @@
+from statistics import NormalDist
+import numpy as np
+
+#Genetic operators on genomes stored as rows of a weight matrix, done for a whole batch at a time,
+#and the generational GA built from them. Parents are picked by roulette wheel or tournament, then bred with
+#single point crossover and random mutation adding a value in [-1, 1] to 10% of the genes.
+
+#Children are bred this many at a time, so the temporary arrays of crossover and mutation stay small
+BREED_ROWS = 256
+
+#Picks count parents with probability proportional to fitness, as pygad's roulette wheel did.
+#Only if some fitness is zero or below is it shifted to be positive first.
+def rouletteSelect(fitness, count, rng):
+    fitness = np.asarray(fitness, dtype=np.float64)
+    if(fitness.min() <= 0):
+        fitness = fitness - fitness.min() + 1e-6
+    return rng.choice(len(fitness), size=count, p=fitness/fitness.sum())
+
+#Picks count parents, each the fittest of size members drawn at random
+def tournamentSelect(fitness, count, rng, size=3):
+    fitness = np.asarray(fitness)
+    entrants = rng.integers(0, len(fitness), size=(count, size))
+    return entrants[np.arange(count), np.argmax(fitness[entrants], axis=1)]
+
+#Picks count parents by the named selection, as indices into the population
+def selectParents(fitness, count, rng, selection="rws"):
+    if(selection == "tournament"):
+        return tournamentSelect(fitness, count, rng)
+    return rouletteSelect(fitness, count, rng)
+
+#Each child takes the genes of its first parent up to a random point, and of its second parent after it
+#The children are written to out if given.
+def singlePointCrossover(parentsA, parentsB, rng, out=None):
+    count, numGenes = parentsA.shape
+    points = rng.integers(1, numGenes, size=count)
+    fromA = np.arange(numGenes)[None, :] < points[:, None]
+    if(out is None):
+        return np.where(fromA, parentsA, parentsB)
+    np.copyto(out, parentsB)
+    np.copyto(out, parentsA, where=fromA)
+    return out
+
+#Adds a random value in [low, high] to percent% of each child's genes, chosen at random.
+#Returns mutated copies, or with inPlace mutates the children themselves.
+def randomMutation(children, rng, percent=10, low=-1.0, high=1.0, inPlace=False):
+    count, numGenes = children.shape
+    numMutated = max(1, int(round(numGenes*percent/100)))
+    genes = np.argpartition(rng.random((count, numGenes)), numMutated-1, axis=1)[:, :numMutated]
+    rows = np.arange(count)[:, None]
+    if(not inPlace):
+        children = children.copy()
+    children[rows, genes] += rng.uniform(low, high, size=(count, numMutated)).astype(children.dtype)
+    return children
+
+#Makes count children from a population: parents picked by selection, crossover, then mutation
+def breed(population, fitness, count, rng, selection="rws"):
+    parentsA = population[selectParents(fitness, count, rng, selection)]
+    parentsB = population[selectParents(fitness, count, rng, selection)]
+    return randomMutation(singlePointCrossover(parentsA, parentsB, rng), rng)
+
+#Decides which member a new child replaces in a steady state population, or None if it doesn't get in.
+#"worst" replaces the worst member, "tournament" the worst of a random few, either only if the child is fitter.
+def pickReplacement(fitness, childFitness, replacement, rng, size=3):
+    if(replacement == "tournament"):
+        entrants = rng.integers(0, len(fitness), size=size)
+        loser = entrants[np.argmin(fitness[entrants])]
+    else:
+        loser = np.argmin(fitness)
+    if(childFitness < fitness[loser]):
+        return None
+    return loser
+
+#Racing: given the scores of the episodes each genome has played so far (one row per genome, at least two episodes),
+#returns which of them might still have a mean score of at least threshold, at the given confidence.
+#A genome is dropped once its mean plus z standard errors is below the threshold. Its spread is taken to be at least
+#the typical spread of a genome's scores (pooled over all of them), so a genome isn't dropped just because its first
+#few games happened to score the same.
+def raceSurvivors(scores, threshold, confidence=0.95):
+    numEpisodes = scores.shape[1]
+    z = NormalDist().inv_cdf(confidence)
+    variance = scores.var(axis=1, ddof=1)
+    spread = np.sqrt(np.maximum(variance, variance.mean()))
+    return scores.mean(axis=1) + z*spread/np.sqrt(numEpisodes) >= threshold
+
+#A generational GA over a population kept as one contiguous (members x genes) float32 matrix.
+#Every generation the fittest elitism members carry over with their fitness, parents members are picked,
+#and the rest of the population is replaced by children of consecutive pairs of those parents (the last paired with the first).
+#Everything is done on whole matrices by index (children in blocks of BREED_ROWS), and the next generation is built in
+#a second matrix the two swap between, so breeding takes a few numpy calls per block and no other population sized memory.
+#fitnessFunc scores a matrix of genomes, returning an array of fitnesses. onGeneration is called with the GA after every generation,
+#and can change the population and fitness in place (as migration does).
+class GeneticAlgorithm:
+    def __init__(self, population, fitnessFunc, onGeneration, parents, elitism, selection="rws", rng=None):
+        self.population = np.ascontiguousarray(population, dtype=np.float32) #Taken over, not copied, if it already is one
+        self.spare = np.empty_like(self.population)
+        self.fitness = None
+        self.fitnessFunc = fitnessFunc
+        self.onGeneration = onGeneration
+        self.parents = parents
+        self.elitism = min(elitism, len(self.population))
+        self.selection = selection
+        self.rng = rng if rng != None else np.random.default_rng()
+
+    #Runs generations generations. fitness is the current population's, if known (as when resuming), otherwise it is scored first.
+    def run(self, generations, fitness=None):
+        if(fitness is None):
+            fitness = self.fitnessFunc(self.population)
+        self.fitness = np.array(fitness, dtype=np.float64)
+        for generation in range(generations):
+            numElites = self.breed()
+            self.fitness[numElites:] = self.fitnessFunc(self.population[numElites:])
+            self.onGeneration(self)
+
+    #Builds the next generation: the elites first, in order of fitness, then the children, which aren't scored yet.
+    #Returns the number of elites.
+    def breed(self):
+        population = self.population
+        nextPopulation = self.spare
+        numElites = self.elitism
+        elites = np.argsort(-self.fitness, kind="stable")[:numElites]
+        parents = selectParents(self.fitness, self.parents, self.rng, self.selection)
+
+        nextPopulation[:numElites] = population[elites]
+        self.fitness[:numElites] = self.fitness[elites]
+        numChildren = len(population) - numElites
+        for start in range(0, numChildren, BREED_ROWS):
+            end = min(start+BREED_ROWS, numChildren)
+            pairs = np.arange(start, end) % len(parents)
+            children = nextPopulation[numElites+start:numElites+end]
+            singlePointCrossover(population[parents[pairs]], population[parents[(pairs+1) % len(parents)]], self.rng, out=children)
+            randomMutation(children, self.rng, inPlace=True)
+        self.population, self.spare = nextPopulation, population
+        return numElites
+
+    #The fitness a child must reach to be among the fittest elitism members of the next generation: if it is below every elite,
+    #the elites fill all those places. None before the population is first scored, or without elites.
+    def eliteThreshold(self):
+        if(self.fitness is None or self.elitism == 0):
+            return None
+        return self.fitness[:self.elitism].min()
+
+    #The fittest member, its fitness and its index
+    def best(self):
+        index = int(np.argmax(self.fitness))
+        return self.population[index], self.fitness[index], index
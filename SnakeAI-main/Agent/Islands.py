@@ -0,0 +1,245 @@
+from multiprocessing.connection import Listener, Client, deliver_challenge, answer_challenge
+from multiprocessing import AuthenticationError
+import multiprocessing
+import ipaddress
+import threading
+import traceback
+import struct
+import queue
+import os
+import numpy as np
+
+#Key islands all on this machine connect with. Islands on other machines need a key of the user's own, see islandAuthkey.
+LOCAL_AUTHKEY = b"SnakeAI-islands"
+
+#Migrants are sent as raw bytes, never pickled: this header (sending island, migrants, genes per migrant),
+#then each migrant's fitness as float64, then their genomes as float32
+MIGRANT_HEADER = struct.Struct("<iii")
+MAX_MESSAGE = 1 << 28
+
+def packMigrants(index, genomes, fitness):
+    genomes = np.ascontiguousarray(genomes, dtype=np.float32)
+    return MIGRANT_HEADER.pack(index, genomes.shape[0], genomes.shape[1]) + np.asarray(fitness, dtype=np.float64).tobytes() + genomes.tobytes()
+
+#Returns (sending island, genomes, fitness) from bytes made by packMigrants. Raises ValueError if they don't fit the header.
+def unpackMigrants(data):
+    source, count, numGenes = MIGRANT_HEADER.unpack_from(data)
+    if(count < 0 or numGenes < 0 or len(data) != MIGRANT_HEADER.size + count*8 + count*numGenes*4):
+        raise ValueError("Malformed migrants")
+    fitness = np.frombuffer(data, dtype=np.float64, count=count, offset=MIGRANT_HEADER.size)
+    genomes = np.frombuffer(data, dtype=np.float32, count=count*numGenes, offset=MIGRANT_HEADER.size + count*8)
+    return source, genomes.reshape(count, numGenes), fitness
+
+def isLoopback(host):
+    if(host == "localhost"):
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+#The key islands authenticate each other with: key, or the SNAKEAI_ISLAND_KEY environment variable.
+#Islands all on this machine can do without one, but any island reachable from elsewhere can't,
+#since anyone who could connect to it could otherwise send it migrants.
+def islandAuthkey(addresses, key=None):
+    key = key or os.environ.get("SNAKEAI_ISLAND_KEY")
+    if(key):
+        return key.encode()
+    if(all(isLoopback(host) for host, port in addresses)):
+        return LOCAL_AUTHKEY
+    raise ValueError("Islands on other machines need a shared key, give the same one to every machine with --island-key or SNAKEAI_ISLAND_KEY")
+
+#Sends an island's best genomes to its neighbours and collects the ones sent to it.
+#Every island listens on its own address, and connects to its neighbours' addresses to send.
+#Migrants are taken in whenever they have arrived, so islands never wait on each other,
+#and an island that isn't up yet, has finished or doesn't answer within timeout seconds just misses that exchange.
+#Connections are authenticated with authkey, which must be the user's own to listen on an address other machines can reach.
+#Each incoming connection is authenticated on its own thread, so a connection that never finishes the handshake,
+#drops during it or has the wrong key only ever loses that connection.
+class Migration:
+    def __init__(self, index, addresses, topology="ring", interval=10, count=2, authkey=LOCAL_AUTHKEY, timeout=5.0):
+        if(authkey == LOCAL_AUTHKEY and not isLoopback(addresses[index][0])):
+            raise ValueError("Refusing to listen on " + str(addresses[index][0]) + " without a key of your own")
+        self.index = index
+        self.addresses = addresses
+        self.interval = interval
+        self.count = count
+        self.authkey = authkey
+        self.timeout = timeout
+        self.received = 0
+        self.closed = False
+
+        numIslands = len(addresses)
+        if(topology == "full"):
+            self.neighbours = [i for i in range(numIslands) if i != index]
+        else:
+            self.neighbours = [(index+1) % numIslands] if numIslands > 1 else []
+        self.connections = {}
+        self.connecting = {} #Neighbour -> thread connecting to it, while it hasn't got a connection
+
+        self.inbox = queue.Queue()
+        self.listener = Listener(addresses[index]) #Authenticated per connection, in receiveLoop
+        threading.Thread(target=self.acceptLoop, daemon=True).start()
+
+    #Accepts neighbours connecting to this island, authenticating and reading from each on its own thread
+    def acceptLoop(self):
+        while(not self.closed):
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                continue
+            threading.Thread(target=self.receiveLoop, args=(conn,), daemon=True).start()
+
+    def receiveLoop(self, conn):
+        try:
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+        except (OSError, EOFError, AuthenticationError):
+            conn.close()
+            return
+        while(True):
+            try:
+                data = conn.recv_bytes(MAX_MESSAGE)
+            except (OSError, EOFError):
+                return
+            try:
+                self.inbox.put(unpackMigrants(data))
+            except (ValueError, struct.error):
+                pass
+
+    #Connects and authenticates to a neighbour, run on its own thread by send
+    def connect(self, neighbour):
+        try:
+            self.connections[neighbour] = Client(self.addresses[neighbour], authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError):
+            pass
+
+    #Sends migrants to every neighbour that is connected, or can be connected to within timeout seconds.
+    #The others miss these migrants. A connection still being made carries on in the background for the next exchange.
+    def send(self, genomes, fitness):
+        for neighbour in self.neighbours:
+            if(neighbour not in self.connections):
+                connecting = self.connecting.get(neighbour)
+                if(connecting == None or not connecting.is_alive()):
+                    connecting = threading.Thread(target=self.connect, args=(neighbour,), daemon=True)
+                    connecting.start()
+                    self.connecting[neighbour] = connecting
+                connecting.join(self.timeout)
+                if(neighbour not in self.connections):
+                    continue
+            try:
+                self.connections[neighbour].send_bytes(packMigrants(self.index, genomes, fitness))
+            except OSError:
+                self.connections.pop(neighbour).close()
+
+    #Sends this island's best count genomes, and replaces its worst members with any migrants that have arrived.
+    #Works in place on the population matrix and its fitness array.
+    def exchange(self, population, fitness):
+        best = np.argsort(fitness)[-self.count:]
+        self.send(np.array(population[best]), np.array(fitness[best]))
+
+        genomes = []
+        fits = []
+        while(True):
+            try:
+                source, migrants, migrantFitness = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if(migrants.shape[1] != population.shape[1]):
+                continue
+            genomes.extend(migrants)
+            fits.extend(migrantFitness)
+        if(genomes):
+            genomes = np.array(genomes)[:len(population)]
+            fits = np.array(fits)[:len(population)]
+            worst = np.argsort(fitness)[:len(genomes)]
+            population[worst] = genomes
+            fitness[worst] = fits
+            self.received += len(genomes)
+        return len(genomes)
+
+    def close(self):
+        self.closed = True
+        for conn in list(self.connections.values()):
+            conn.close()
+        self.listener.close()
+
+#Runs one island in its own process: a normal Population, with its stats kept under
+#statbackup/<name>/island_<index>, migrating every interval generations. Sends back (index, best genome, its fitness, None),
+#or (index, None, None, traceback) if the island failed, so the launcher never waits on an island that is gone.
+def islandMain(config, index, addresses, topology, interval, count, authkey, modelName, options, results):
+    try:
+        from Agent.Training import Population
+        pop = Population(config, modelName=modelName)
+        pop.statPath = "statbackup/" + modelName + "/island_" + str(index)
+        pop.saveModels = False
+        pop.migration = Migration(index, addresses, topology, interval, count, authkey)
+        try:
+            solution, fitness = pop.run(modelName, options)
+        finally:
+            pop.migration.close()
+    except BaseException:
+        results.put((index, None, None, traceback.format_exc()))
+        raise
+    results.put((index, solution, fitness, None))
+
+#Runs the islands with the given indices (all of them by default) as processes on this machine.
+#addresses holds the (host, port) of every island, including any run on other machines.
+#Every island runs Population.run with the same TrainOptions. key is the islands' shared key, see islandAuthkey.
+#When done, saves the best genome of the islands run here as the model.
+def runIslands(config, modelName, options, addresses, topology, interval, count, indices=None, key=None):
+    authkey = islandAuthkey(addresses, key)
+    if(indices is None):
+        indices = range(len(addresses))
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = []
+    for index in indices:
+        process = context.Process(target=islandMain, args=(config, index, addresses, topology, interval, count, authkey, modelName, options, results))
+        process.start()
+        processes.append(process)
+
+    try:
+        best = collectIslands(processes, results)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if(process.is_alive()):
+                process.terminate()
+                process.join()
+
+    best.sort(key=lambda result: result[2], reverse=True)
+    for index, solution, fitness in sorted(best, key=lambda result: result[0]):
+        print("Island", index, "Best Fitness:", fitness-250)
+    index, solution, fitness = best[0]
+
+    from Agent.Training import Population
+    Population(config, modelName=modelName).saveSolution(solution, modelName)
+    print("Best Model: Island", index, "Fitness:", fitness-250)
+
+#Waits for the result of every island process, returning (index, solution, fitness) of each.
+#Raises as soon as an island fails, or dies without sending its result.
+def collectIslands(processes, results):
+    best = []
+    while(len(best) < len(processes)):
+        try:
+            index, solution, fitness, error = results.get(timeout=1)
+        except queue.Empty:
+            for process in processes:
+                if(not process.is_alive() and process.exitcode != 0):
+                    raise RuntimeError("An island process stopped unexpectedly (exit code " + str(process.exitcode) + ")")
+            continue
+        if(error != None):
+            raise RuntimeError("Island " + str(index) + " failed:\n" + error)
+        best.append((index, solution, fitness))
+    return best
+
+#Turns host:port strings into addresses, or numIslands ports on this machine starting at port
+def islandAddresses(numIslands, hosts=None, port=6000):
+    if(hosts):
+        addresses = []
+        for host in hosts:
+            name, hostPort = host.rsplit(":", 1)
+            addresses.append((name, int(hostPort)))
+        return addresses
+    return [("127.0.0.1", port+i) for i in range(numIslands)]
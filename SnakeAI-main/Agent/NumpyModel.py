@@ -0,0 +1,256 @@
+from Agent.BatchedModel import ACTIVATIONS
+import numpy as np
+import struct
+import json
+import os
+
+MODEL_DIR = "Agent/Models/"
+
+#Returns where the named model is stored: its .npz weights file if it has one, otherwise its SavedModel directory
+def modelPath(name):
+    path = MODEL_DIR + name + ".npz"
+    if(os.path.exists(path)):
+        return path
+    return MODEL_DIR + name
+
+#Loads the named model from Agent/Models, in either format
+def loadModel(name):
+    return NumpyModel.load(modelPath(name))
+
+#Returns the names of the models in Agent/Models, in either format
+def listModels():
+    names = set()
+    for entry in os.listdir(MODEL_DIR):
+        if(entry.endswith(".npz")):
+            names.add(entry[:-4])
+        elif(os.path.exists(os.path.join(MODEL_DIR, entry, "keras_metadata.pb"))):
+            names.add(entry)
+    return sorted(names, key=str.lower)
+
+#Returns the layer list of the named model, without reading its weights
+def modelLayers(name):
+    path = modelPath(name)
+    if(path.endswith(".npz")):
+        with np.load(path) as data:
+            return [tuple(layer) for layer in json.loads(str(data["layers"]))]
+    return readSavedLayers(path)
+
+#A Dense network run with plain NumPy. Can be used by an AIAgent in place of a Keras model,
+#and loads the saved models in Agent/Models without needing TensorFlow.
+#Models are saved as .npz files holding each layer's kernel and bias, plus the layer list as JSON.
+class NumpyModel:
+    #layers is a list of (inputs, outputs, activation) tuples, weights a list of kernels and biases as from Keras get_weights()
+    def __init__(self, layers, weights=None):
+        self.layers = layers
+        self.version = 0 #Counts weight changes, so anything derived from the weights can tell when it is out of date
+        self.numParams = sum(inSize*outSize + outSize for inSize, outSize, _ in layers)
+        if(weights is None):
+            weights = []
+            for inSize, outSize, _ in layers:
+                weights.append(np.zeros((inSize, outSize), dtype=np.float32))
+                weights.append(np.zeros(outSize, dtype=np.float32))
+        self.set_weights(weights)
+
+    #Builds a new model taking the 13 state values, with relu hidden layers of the given sizes and a softmax output
+    #for the 3 moves. Kernels are initialized glorot uniform and biases to zero, the same as Keras Dense layers.
+    @classmethod
+    def create(self, hiddenLayers, rng=None):
+        if(rng is None):
+            rng = np.random.default_rng()
+        sizes = [13] + list(hiddenLayers) + [3]
+        layers = []
+        weights = []
+        for i in range(len(sizes)-1):
+            inSize = sizes[i]
+            outSize = sizes[i+1]
+            layers.append((inSize, outSize, "softmax" if i == len(sizes)-2 else "relu"))
+            limit = np.sqrt(6 / (inSize+outSize))
+            weights.append(rng.uniform(-limit, limit, size=(inSize, outSize)).astype(np.float32))
+            weights.append(np.zeros(outSize, dtype=np.float32))
+        return self(layers, weights)
+
+    #Reads a model saved by save, or the architecture and weights of a Keras SavedModel directory, such as Agent/Models/<name>
+    @classmethod
+    def load(self, path):
+        if(path.endswith(".npz")):
+            with np.load(path) as data:
+                layers = [tuple(layer) for layer in json.loads(str(data["layers"]))]
+                weights = []
+                for i in range(len(layers)):
+                    weights.append(data["kernel"+str(i)])
+                    weights.append(data["bias"+str(i)])
+            return self(layers, weights)
+
+        layers = readSavedLayers(path)
+        tensors = readSavedVariables(os.path.join(path, "variables", "variables"))
+        weights = []
+        for i in range(len(layers)):
+            weights.append(tensors["layer_with_weights-"+str(i)+"/kernel/.ATTRIBUTES/VARIABLE_VALUE"])
+            weights.append(tensors["layer_with_weights-"+str(i)+"/bias/.ATTRIBUTES/VARIABLE_VALUE"])
+        return self(layers, weights)
+
+    #Writes the model to a .npz file. Written to a temporary file first, so a crash never leaves half a model.
+    def save(self, path):
+        arrays = {}
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays["kernel"+str(i)] = kernel
+            arrays["bias"+str(i)] = bias
+        temp = path + ".tmp"
+        with open(temp, "wb") as file:
+            np.savez(file, layers=np.array(json.dumps(self.layers)), **arrays)
+        os.replace(temp, path)
+
+    #Same as Keras, returns a list of kernels and biases
+    def get_weights(self):
+        weights = []
+        for kernel, bias in zip(self.kernels, self.biases):
+            weights.append(kernel)
+            weights.append(bias)
+        return weights
+
+    def set_weights(self, weights):
+        self.version += 1
+        self.kernels = [np.asarray(w, dtype=np.float32) for w in weights[0::2]]
+        self.biases = [np.asarray(w, dtype=np.float32) for w in weights[1::2]]
+
+    #Sets the weights from a flat vector laid out like pygad.kerasga.model_weights_as_vector
+    def setWeightsVector(self, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        weights = []
+        start = 0
+        for inSize, outSize, _ in self.layers:
+            end = start + inSize*outSize
+            weights.append(vector[start:end].reshape(inSize, outSize))
+            weights.append(vector[end:end+outSize])
+            start = end + outSize
+        self.set_weights(weights)
+
+    def getWeightsVector(self):
+        return np.concatenate([w.reshape(-1) for w in self.get_weights()])
+
+    #Runs a batch of inputs through the network, like calling a Keras model
+    def __call__(self, inputs):
+        x = np.asarray(inputs, dtype=np.float32)
+        for (_, _, activation), kernel, bias in zip(self.layers, self.kernels, self.biases):
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+
+#-------------------SavedModel Reading------------------
+#Just enough of the protobuf wire format and the TensorFlow checkpoint table format
+#to read back the Dense models this project saves.
+
+#Reads a protobuf varint from buf at pos, returns the value and the position after it
+def readVarint(buf, pos):
+    value = 0
+    shift = 0
+    while(True):
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if(byte < 0x80):
+            return value, pos
+
+#Returns a list of (field number, value) from a protobuf message.
+#Varints and fixed ints are returned as ints, length delimited fields as bytes.
+def readFields(buf):
+    fields = []
+    pos = 0
+    while(pos < len(buf)):
+        key, pos = readVarint(buf, pos)
+        field = key >> 3
+        wireType = key & 7
+        if(wireType == 0):
+            value, pos = readVarint(buf, pos)
+        elif(wireType == 1):
+            value = struct.unpack_from("<Q", buf, pos)[0]
+            pos += 8
+        elif(wireType == 2):
+            size, pos = readVarint(buf, pos)
+            value = bytes(buf[pos:pos+size])
+            pos += size
+        elif(wireType == 5):
+            value = struct.unpack_from("<I", buf, pos)[0]
+            pos += 4
+        else:
+            raise ValueError("Unsupported protobuf wire type " + str(wireType))
+        fields.append((field, value))
+    return fields
+
+#Reads the layer list of a saved Sequential model from the Keras config in keras_metadata.pb
+def readSavedLayers(path):
+    with open(os.path.join(path, "keras_metadata.pb"), 'rb') as file:
+        metadata = file.read()
+
+    config = None
+    for field, node in readFields(metadata):
+        nodeFields = dict(readFields(node))
+        if(field == 1 and nodeFields.get(3) == b"root"):
+            config = json.loads(nodeFields[5])["config"]
+    if(config is None):
+        raise ValueError("No model config found in " + path)
+
+    layers = []
+    inSize = None
+    for layer in config["layers"]:
+        layerConfig = layer["config"]
+        if("batch_input_shape" in layerConfig):
+            inSize = layerConfig["batch_input_shape"]["items"][-1]
+        if(layer["class_name"] == "Dense"):
+            layers.append((inSize, layerConfig["units"], layerConfig["activation"]))
+            inSize = layerConfig["units"]
+        elif(layer["class_name"] != "InputLayer"):
+            raise ValueError("Unsupported layer " + layer["class_name"])
+    return layers
+
+#Reads one block of a checkpoint index table, returns a list of its (key, value) entries
+def readTableBlock(table, offset, size):
+    if(table[offset+size] != 0):
+        raise ValueError("Compressed checkpoint index blocks are not supported")
+    block = table[offset:offset+size]
+    numRestarts = struct.unpack_from("<I", block, len(block)-4)[0]
+    end = len(block) - 4 - 4*numRestarts
+
+    entries = []
+    key = b""
+    pos = 0
+    while(pos < end):
+        shared, pos = readVarint(block, pos)
+        unshared, pos = readVarint(block, pos)
+        valueSize, pos = readVarint(block, pos)
+        key = key[:shared] + block[pos:pos+unshared]
+        pos += unshared
+        entries.append((key, block[pos:pos+valueSize]))
+        pos += valueSize
+    return entries
+
+#Reads all float tensors of a checkpoint, given its prefix (path without .index or .data-*)
+def readSavedVariables(prefix):
+    with open(prefix + ".index", 'rb') as file:
+        table = file.read()
+    with open(prefix + ".data-00000-of-00001", 'rb') as file:
+        data = file.read()
+
+    #Footer holds the metaindex and index block handles, then an 8 byte magic number
+    footer = table[-48:]
+    _, pos = readVarint(footer, 0)
+    _, pos = readVarint(footer, pos)
+    indexOffset, pos = readVarint(footer, pos)
+    indexSize, pos = readVarint(footer, pos)
+
+    tensors = {}
+    for _, handle in readTableBlock(table, indexOffset, indexSize):
+        blockOffset, pos = readVarint(handle, 0)
+        blockSize, pos = readVarint(handle, pos)
+        for key, value in readTableBlock(table, blockOffset, blockSize):
+            if(key == b""):
+                continue #Bundle header
+            fields = dict(readFields(value))
+            if(fields.get(1) != 1):
+                continue #Not DT_FLOAT, such as the object graph
+            shape = [dict(readFields(dim)).get(1, 0) for field, dim in readFields(fields.get(2, b"")) if field == 2]
+            start = fields.get(4, 0)
+            tensor = np.frombuffer(data, dtype="<f4", count=fields.get(5, 0)//4, offset=start)
+            tensors[key.decode()] = tensor.reshape(shape).copy()
+    return tensors
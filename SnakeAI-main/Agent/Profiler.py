@@ -0,0 +1,169 @@
+from Agent.TrainingLog import LogWriter, readLog
+import numpy as np
+import pstats
+import time
+import sys
+try:
+    import resource
+except ImportError: #Not available on Windows, where peak memory isn't reported
+    resource = None
+
+#Opt in timers and counters of where the time of training goes, printed with each generation's stats
+#and logged to statbackup/<name>/profile, one row per generation.
+#Calls are timed by wrap(), which shadows a method on that one object, so nothing is timed (or slowed down)
+#unless a run is profiled. Phase times are exclusive: time in a phase timed inside another only counts to the inner one.
+
+#Phases and counters in the order they are printed and logged
+PHASES = ["ga", "breed", "insert", "stats", "setWeights", "publish", "wait",
+          "reset", "getState", "inference", "move", "step", "food", "report", "save"]
+COUNTERS = ["games", "steps", "foodEaten"]
+#Phases timed inside worker processes
+WORKER_PHASES = ["setWeights", "reset", "getState", "inference", "move", "food"]
+
+class PhaseProfile:
+    def __init__(self):
+        self.stack = [] #[phase, start, time of phases inside it] of every timed call in progress
+        self.workerMemory = {} #Worker index -> its peak memory so far, kept across generations
+        self.reset()
+
+    #Clears the times and counts, to start the next generation
+    def reset(self):
+        self.times = {}
+        self.counts = {}
+        self.workers = {} #Worker index -> (times, games)
+        self.start = time.perf_counter()
+
+    def push(self, phase):
+        self.stack.append([phase, time.perf_counter(), 0.0])
+
+    def pop(self):
+        phase, start, inner = self.stack.pop()
+        self.add(phase, time.perf_counter()-start, inner)
+
+    #Adds seconds to a phase, less inner, the part of them already counted to phases inside it
+    def add(self, phase, seconds, inner=0.0):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds - inner
+        if(self.stack):
+            self.stack[-1][2] += seconds
+
+    def count(self, counter, amount=1):
+        self.counts[counter] = self.counts.get(counter, 0) + int(amount)
+
+    #Replaces obj's method name with one timed as phase
+    def wrap(self, obj, name, phase):
+        method = getattr(obj, name)
+        def timed(*args, **kwargs):
+            self.push(phase)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.pop()
+        setattr(obj, name, timed)
+
+    #Returns the times so far and clears them, used by workers to send the times of each game
+    def take(self):
+        times = self.times
+        self.times = {}
+        return times
+
+    #Adds the times of a game played by a worker, and its peak memory after it
+    def addWorker(self, index, times, memory=None):
+        total, games = self.workers.get(index, ({}, 0))
+        for phase, seconds in times.items():
+            total[phase] = total.get(phase, 0.0) + seconds
+        self.workers[index] = (total, games+1)
+        if(memory != None):
+            self.workerMemory[index] = memory
+
+    #Lines describing the generation, printed with its stats
+    def summary(self, wall):
+        line = ("Profile: " + formatSeconds(wall) + " wall | " + formatTimes(self.times) + " | " +
+                ", ".join(str(self.counts.get(name, 0)) + " " + name for name in COUNTERS))
+        memory = peakMemory()
+        if(memory != None):
+            line += " | " + formatBytes(memory) + " peak"
+        lines = [line]
+        for index in sorted(self.workers):
+            times, games = self.workers[index]
+            line = "  Worker " + str(index) + ": " + formatTimes(times) + " | " + str(games) + " games"
+            if(index in self.workerMemory):
+                line += " | " + formatBytes(self.workerMemory[index]) + " peak"
+            lines.append(line)
+        return lines
+
+    #The generation as a row of the profile log
+    def row(self, generation, wall, numWorkers):
+        row = {"generation": generation, "wall": wall}
+        for phase in PHASES:
+            row[phase] = self.times.get(phase, 0.0)
+        for counter in COUNTERS:
+            row[counter] = self.counts.get(counter, 0)
+        row["peakMemory"] = peakMemory() or 0
+        if(numWorkers > 0):
+            for phase in WORKER_PHASES:
+                row["worker_" + phase] = [self.workers.get(index, ({}, 0))[0].get(phase, 0.0) for index in range(numWorkers)]
+            row["worker_games"] = [self.workers.get(index, ({}, 0))[1] for index in range(numWorkers)]
+            row["worker_peakMemory"] = [self.workerMemory.get(index, 0) for index in range(numWorkers)]
+        return row
+
+def formatSeconds(seconds):
+    if(seconds >= 1):
+        return ("%.2f" % seconds) + "s"
+    return ("%.1f" % (seconds*1000)) + "ms"
+
+def formatBytes(count):
+    return ("%.1f" % (count/2**20)) + "MB"
+
+#Peak resident memory of this process in bytes, or with children, of the largest of its child processes that have exited
+#(workers, once the pool is closed). None where it can't be measured.
+def peakMemory(children=False):
+    if(resource == None):
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    if(sys.platform == "darwin"): #In bytes on macOS, kilobytes elsewhere
+        return usage
+    return usage*1024
+
+#Phases with any time, in PHASES order, then any others
+def formatTimes(times):
+    names = [name for name in PHASES if name in times] + sorted(name for name in times if name not in PHASES)
+    return ", ".join(name + " " + formatSeconds(times[name]) for name in names if times[name] > 0)
+
+#Opens the profile log of a run. Worker phases get a value per worker.
+#A resumed run appends to its log, after dropping the generations logged after its checkpoint,
+#unless it is profiled with a different number of workers (or the log's columns changed), which starts a new log.
+def openProfileLog(path, numWorkers, resume=False, generation=0):
+    columns = {"generation": (np.int64, 1), "wall": (np.float64, 1)}
+    for phase in PHASES:
+        columns[phase] = (np.float64, 1)
+    for counter in COUNTERS:
+        columns[counter] = (np.int64, 1)
+    columns["peakMemory"] = (np.int64, 1)
+    if(numWorkers > 0):
+        for phase in WORKER_PHASES:
+            columns["worker_" + phase] = (np.float64, numWorkers)
+        columns["worker_games"] = (np.int64, numWorkers)
+        columns["worker_peakMemory"] = (np.int64, numWorkers)
+    try:
+        log = LogWriter(path, columns, resume=resume)
+    except ValueError:
+        log = LogWriter(path, columns)
+    if(log.rows > 0):
+        generations = readLog(path)["generation"][:, 0]
+        log.truncate(int(np.searchsorted(generations, generation, side="right")))
+    return log
+
+#Holds the stats of a cProfile.Profile sent from a worker, so pstats can load it
+class SentStats:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+#Merges the cProfile stats sent by workers into one file pstats, snakeviz or flameprof can read
+def dumpStats(path, statsList):
+    stats = pstats.Stats(SentStats(statsList[0]))
+    for sent in statsList[1:]:
+        stats.add(SentStats(sent))
+    stats.dump_stats(path)
@@ -0,0 +1,69 @@
+import numpy as np
+
+#Guesses how many steps a genome's game will last, from the games played by the previous generation.
+#Most genomes are new children, so they get the step count of the closest genome that has been played,
+#which is usually one of their parents.
+#Played genomes are kept in a bank allocated once and overwritten oldest first, and distances are worked out
+#blockRows solutions at a time, so estimating never holds more than a block of distances to the whole bank.
+class StepEstimator:
+    def __init__(self, bankSize, blockRows=256):
+        self.bankSize = bankSize
+        self.blockRows = blockRows
+        self.genomes = None
+        self.norms = None #Squared length of each banked genome
+        self.steps = None
+        self.count = 0 #Banked genomes, they fill the bank from the start
+        self.next = 0 #Row the next played genome goes to
+
+    #Remembers the step counts of a batch of played genomes, keeping the most recent bankSize of them
+    def record(self, solutions, steps):
+        solutions = np.asarray(solutions, dtype=np.float32)[:self.bankSize]
+        steps = np.asarray(steps, dtype=np.float64)[:self.bankSize]
+        if(self.genomes is None):
+            self.genomes = np.empty((self.bankSize, solutions.shape[1]), dtype=np.float32)
+            self.norms = np.empty(self.bankSize, dtype=np.float32)
+            self.steps = np.empty(self.bankSize)
+        rows = (self.next + np.arange(len(solutions))) % self.bankSize
+        self.genomes[rows] = solutions
+        self.norms[rows] = np.einsum("ij,ij->i", solutions, solutions)
+        self.steps[rows] = steps
+        self.next = (self.next + len(solutions)) % self.bankSize
+        self.count = min(self.count + len(solutions), self.bankSize)
+
+    #Returns the expected steps of each solution, all ones if nothing has been played yet
+    def estimate(self, solutions):
+        solutions = np.asarray(solutions, dtype=np.float32)
+        if(self.count == 0):
+            return np.ones(len(solutions))
+        genomes = self.genomes[:self.count]
+        norms = self.norms[:self.count]
+        closest = np.empty(len(solutions), dtype=np.int64)
+        for start in range(0, len(solutions), self.blockRows):
+            block = solutions[start:start+self.blockRows]
+            #Squared distances to every banked genome, |a|^2 + |b|^2 - 2a.b, leaving out |a|^2 as it doesn't change which is closest
+            dists = norms[None, :] - 2*(block @ genomes.T)
+            closest[start:start+len(block)] = np.argmin(dists, axis=1)
+        return np.maximum(self.steps[closest], 1)
+
+#Splits rows into tasks for the worker pool, longest expected games first.
+#Each task holds about 1/(workers*tasksPerWorker) of the expected work, so long games get a task of their own
+#and short ones are grouped. Idle workers take the next task from the shared queue, so the short tasks at
+#the end fill in around the long ones, and no worker is left waiting on a long game picked up late.
+def planTasks(expectedSteps, numWorkers, tasksPerWorker=8):
+    expectedSteps = np.asarray(expectedSteps, dtype=np.float64)
+    order = np.argsort(-expectedSteps, kind="stable")
+    budget = expectedSteps.sum() / (numWorkers*tasksPerWorker)
+
+    tasks = []
+    task = []
+    work = 0.0
+    for row in order:
+        if(task and work + expectedSteps[row] > budget):
+            tasks.append(task)
+            task = []
+            work = 0.0
+        task.append(int(row))
+        work += expectedSteps[row]
+    if(task):
+        tasks.append(task)
+    return tasks
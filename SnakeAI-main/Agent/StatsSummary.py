@@ -0,0 +1,112 @@
+from Agent.TrainingLog import hasLog, readLog
+import numpy as np
+import json
+import os
+
+#Multi resolution summaries of a run's per generation stats, kept in statbackup/<name>/summary so plots of long runs
+#never have to read or draw every generation. Level 0 holds every generation, and each level after it has buckets
+#FACTOR times wider, each with the min, max and mean of the generations in it.
+#summary.json lists the levels and where each starts, and each series is a raw file <series>.bin of (min, max, mean) rows,
+#all levels one after another, so a window of any level can be memory mapped without reading the rest.
+
+FACTOR = 4
+HEADER = "summary.json"
+
+#Returns the (min, max, mean) buckets of every level for a series of values
+def buildLevels(values):
+    values = np.asarray(values, dtype=np.float64)
+    levels = [np.stack([values, values, values], axis=1)]
+    bucket = 1
+    while(len(levels[-1]) > 1):
+        bucket *= FACTOR
+        count = -(-len(values) // bucket)
+        starts = np.arange(count)*bucket
+        sizes = np.minimum(starts+bucket, len(values)) - starts
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+        mean = np.add.reduceat(values, starts) / sizes
+        levels.append(np.stack([low, high, mean], axis=1))
+    return levels
+
+#Writes the summary of every series (a dict of name -> values per generation, all the same length) to path.
+#source is a stamp of the stats it was built from, used to tell when it is out of date.
+def buildSummary(path, series, source):
+    if(not os.path.exists(path)):
+        os.makedirs(path)
+    rows = len(next(iter(series.values()))) if series else 0
+    header = {"rows": rows, "factor": FACTOR, "source": source, "series": list(series), "levels": []}
+    for name, values in series.items():
+        levels = buildLevels(values)
+        with open(os.path.join(path, name + ".bin"), 'wb') as file:
+            for level in levels:
+                file.write(level.tobytes())
+    offset = 0
+    bucket = 1
+    for level in buildLevels(np.zeros(rows)):
+        header["levels"].append({"bucket": bucket, "offset": offset, "count": len(level)})
+        offset += len(level)
+        bucket *= FACTOR
+    #Header last, so a summary is only used once all of it is written
+    with open(os.path.join(path, HEADER), 'w') as file:
+        json.dump(header, file)
+    return header
+
+#Returns the summary's header, or None if there isn't one or it wasn't built from the given source
+def loadSummary(path, source):
+    try:
+        with open(os.path.join(path, HEADER), 'r') as file:
+            header = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if(header["source"] != source):
+        return None
+    return header
+
+#Picks the finest level that shows generations start to stop (exclusive) in at most maxPoints buckets,
+#and returns the bucket centers (in generations) and the min, max and mean of each bucket of the series in that window
+def summaryWindow(path, header, name, start, stop, maxPoints):
+    start = max(0, start)
+    stop = min(header["rows"], stop)
+    if(stop <= start):
+        empty = np.zeros(0)
+        return empty, empty, empty, empty
+    for level in header["levels"]:
+        if(-(-(stop-start) // level["bucket"]) <= maxPoints or level["count"] <= 1):
+            break
+    bucket = level["bucket"]
+    first = start // bucket
+    last = -(-stop // bucket)
+    data = np.memmap(os.path.join(path, name + ".bin"), dtype=np.float64, mode='r',
+                     offset=level["offset"]*3*8, shape=(level["count"], 3))[first:last]
+    centers = np.arange(first, last)*bucket + (bucket-1)/2
+    return centers, np.array(data[:, 0]), np.array(data[:, 1]), np.array(data[:, 2])
+
+#Returns the files a model's stats are read from: its log's average and peak columns, or the CSVs of older runs
+def statsFiles(statPath):
+    if(hasLog(statPath + "/log")):
+        return [statPath + "/log/avg.bin", statPath + "/log/peak.bin"]
+    return [statPath + "/avg.csv", statPath + "/peak.csv"]
+
+#Returns the average and peak fitness of every generation of a run, and the run's log if it has one
+def readStats(statPath):
+    if(hasLog(statPath + "/log")):
+        log = readLog(statPath + "/log")
+        return log["avg"][:, 0], log["peak"][:, 0], log
+    avg = np.atleast_1d(np.loadtxt(statPath + "/avg.csv", delimiter=",", dtype=np.float64))
+    peak = np.atleast_1d(np.loadtxt(statPath + "/peak.csv", delimiter=",", dtype=np.float64))
+    rows = min(len(avg), len(peak))
+    return avg[:rows], peak[:rows], None
+
+#Returns the summary folder and header of a run's stats, (re)building the summary first if the stats have changed since.
+#Runs with a log of every member's fitness also get "low" and "high" series, the 10th and 90th percentile of each generation.
+def modelSummary(statPath):
+    path = statPath + "/summary"
+    source = [[name, os.path.getsize(name), os.path.getmtime(name)] for name in statsFiles(statPath)]
+    header = loadSummary(path, source)
+    if(header == None):
+        avg, peak, log = readStats(statPath)
+        series = {"avg": avg, "peak": peak}
+        if(log != None and "fitness" in log and len(log["fitness"]) > 0):
+            series["low"], series["high"] = np.percentile(log["fitness"], [10, 90], axis=1)
+        header = buildSummary(path, series, source)
+    return path, header
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, replace
+import numpy as np
+
+#Settings a run is started with, saved in its checkpoint and taken back from it when the run is resumed
+RUN_SETTINGS = ["populationSize", "generations", "parents", "mode", "replacement", "interval",
+                "selection", "seed", "reseed", "episodes", "race"]
+
+#Everything Population.run needs besides the model. main.py builds one from the train command's arguments.
+#workers and the fields after it only say how this invocation plays its games, and can change when a run is resumed.
+@dataclass
+class TrainOptions:
+    populationSize: int = None
+    generations: int = None #Total generations of the run, not the ones left when resuming
+    parents: int = None
+    mode: str = "generational" #"generational", run by a GeneticAlgorithm, or "steady-state", see Population.runSteadyState
+    replacement: str = "worst" #Steady state only, which member a child replaces, see pickReplacement
+    interval: int = None #Steady state only, games between stats, the population size if None
+    selection: str = "rws" #How parents are picked, "rws" (roulette wheel) or "tournament"
+    seed: int = None #Food seed shared by every game of a generation, random food if None
+    reseed: int = 0 #Generations between changes of the seed, never if 0
+    episodes: int = 1 #Games every genome is scored on, generational only
+    race: float = None #Confidence at which children that can't make it into the elites stop being played, no racing if None
+    workers: int = 0 #Worker processes playing the games, batched in the training process if 0
+    decisionCache: int = 0 #States whose moves each worker's agent remembers within a game
+    resume: bool = False
+    checkpointEvery: int = 50 #Generations between checkpoints, never if 0
+    profile: bool = False
+    profileGenerations: list = None #Generations run under cProfile
+    record: bool = False #Whether the best episode of every generation is archived
+
+    #The run settings, as saved in a checkpoint
+    def settings(self):
+        return {name: getattr(self, name) for name in RUN_SETTINGS}
+
+    #Returns these options with the run settings of a checkpoint's info. generations can only be raised.
+    #Settings missing from older checkpoints take their defaults.
+    def resumed(self, info):
+        settings = {name: info.get(name, getattr(TrainOptions, name)) for name in RUN_SETTINGS}
+        settings["generations"] = max(self.generations or 0, info["generations"])
+        return replace(self, **settings)
+
+    #Raises ValueError for settings that don't go together
+    def validate(self):
+        if(self.mode == "steady-state"):
+            if(self.record):
+                raise ValueError("Episodes can only be recorded in generational mode")
+            if(self.episodes > 1):
+                raise ValueError("Genomes can only be played on several episodes in generational mode")
+
+    #Fills in what the settings leave open: the steady state interval, and a random seed for unseeded runs playing
+    #several episodes, changed every generation unless reseed is given.
+    def completed(self):
+        options = self
+        if(options.mode == "steady-state" and options.interval == None):
+            options = replace(options, interval=options.populationSize)
+        if(options.episodes > 1 and options.seed == None):
+            options = replace(options, seed=int(np.random.default_rng().integers(0, 2**31)), reseed=options.reseed or 1)
+        return options
@@ -1,101 +1,477 @@
-from Agent.Agents import AIAgent
-from Game.Grid import Grid
-from Game.GUI import GUI
-import tensorflow
-import pygad.kerasga
+from Agent.BatchedModel import BatchedModel
+from Agent.NumpyModel import NumpyModel, loadModel, MODEL_DIR
+from Agent.Workers import WorkerPool
+from Agent.Scheduler import StepEstimator
+from Agent.Evolution import GeneticAlgorithm, breed, pickReplacement, raceSurvivors
+from Agent.DecisionCache import hitRate
+from Agent.TrainingLog import LogWriter
+from Agent.StatsSummary import modelSummary
+from Agent.Profiler import PhaseProfile, openProfileLog, dumpStats, peakMemory, formatBytes
+from Agent.Checkpoint import saveCheckpoint, loadCheckpoint, generatorState, setGeneratorState
+from Game.VecGrid import VecGrid
+from Game.Replay import Episode, EpisodeArchive, packActions, GRID, VEC
 import numpy as np
+import cProfile
+import hashlib
+import time
 import os
 
+#Identifies a genome by a hash of its float32 weights
+def genomeKey(genome):
+    return hashlib.blake2b(np.ascontiguousarray(genome, dtype=np.float32).tobytes(), digest_size=16).digest()
+
 class Population():
     def __init__(self, config, modelName=None):
-        tensorflow.compat.v1.logging.set_verbosity(tensorflow.compat.v1.logging.ERROR)
         self.config = config        
         self.modelName = modelName
+        self.statPath = None #Where stats are saved, statbackup/<model name> unless set
+        self.saveModels = True #Whether the model is saved during and after run
+        self.migration = None #Set to a Migration when this population is an island
             
 
-    def run(self, populationSize, generations, parents, modelName):
-        self.grids = []
-        self.agents = []
-        self.models = []
+    #Trains the named model with the given TrainOptions.
+    #With workers > 0, games are played by that many worker processes instead of in batches in this process.
+    #In either mode, parents are picked by selection, "rws" (roulette wheel) or "tournament".
+    #With a seed, every game of a generation places its food from the same seed, changing to a new one every
+    #reseed generations (never if 0), so a genome's fitness is repeatable.
+    #The whole GA state is checkpointed to statPath every checkpointEvery generations (never if 0) and at the end.
+    #With resume, the run carries on from that checkpoint, with the run settings it was started with (see TrainOptions).
+    #generations can then be raised to train for longer, or left as None to finish the original run.
+    #With profile, the time spent in each phase of every generation is printed with its stats and logged to statPath/profile.
+    #Generations in profileGenerations are also run under cProfile, and saved there as generation_<number>.prof.
+    #With record, the moves of every game are kept, and the best episode of every generation is archived to statPath/episodes.bin.
+    #With decisionCache > 0, agents playing one game at a time (on workers) remember the moves of up to that many states per game.
+    #With episodes > 1, every genome is scored on the mean of that many games, on a set of seeds shared by the whole generation,
+    #see playEpisodes. Unseeded runs then get a random seed, changed every generation unless reseed is given.
+    #With race (a confidence, such as 0.95), children are no longer played once they can't make it into the elites.
+    def run(self, modelName, options):
         self.avgFit = []
         self.peakFit = []
+        self.utilization = []
+        self.gamesPlayed = 0
+        if(self.statPath == None):
+            self.statPath = 'statbackup/'+modelName
+
+        checkpoint = None
+        if(options.resume):
+            checkpoint = loadCheckpoint(self.checkpointPath())
+            arrays, info = checkpoint
+            options = options.resumed(info)
+            print("Resuming from generation", info["generation"])
+        options.validate()
+        if(options.decisionCache > 0 and options.workers == 0):
+            print("The decision cache is only used by games played on workers, batched games don't use it")
+        options = options.completed()
+        self.options = options
+        populationSize = options.populationSize
+        self.episodeCounts = [0, 0] #Episodes played, and the most that could have been played, since the last report
 
+        #The model is loaded once, and used as the template every genome's weights are unpacked into
         print("Setting up...")
-        for i in range(0, populationSize+1):
-            model = tensorflow.keras.models.load_model("Agent/Models/"+modelName)
-                
-            agent = AIAgent(model)
-            grid = Grid(self.config["gridHeight"],self.config["gridWidth"], agent)
-            grid.Setup()
-            self.grids.append(grid)
-            self.agents.append(agent)
-            self.models.append(model)
+        self.template = loadModel(modelName)
         print("Done.")
         print("Starting.\n")
         self.gencount = 0
-        self.gentarget = generations
+        self.gentarget = options.generations
         self.modelName = modelName
-        modelGA = pygad.kerasga.KerasGA(model=self.models[0], num_solutions=populationSize)
-        initialPopulation = modelGA.population_weights
+        if(checkpoint != None):
+            initialPopulation = arrays["population"]
+            self.gencount = info["generation"]
+            self.avgFit = list(arrays["avg"])
+            self.peakFit = list(arrays["peak"])
+            self.utilization = list(arrays["utilization"])
+        else:
+            initialPopulation = self.initialPopulation(populationSize)
+        self.batchModel = BatchedModel(self.template.layers)
+
+        #Every generation's fitnesses and game stats go to the run's log as soon as it finishes.
+        #A resumed run drops any generations logged after its checkpoint, since they are played again.
+        self.log = LogWriter(self.statPath + "/log", {"fitness": (np.float64, populationSize),
+                                                      "foodEaten": (np.int32, populationSize),
+                                                      "steps": (np.int32, populationSize),
+                                                      "died": (np.int8, populationSize),
+                                                      "avg": (np.float64, 1),
+                                                      "peak": (np.float64, 1),
+                                                      "utilization": (np.float64, 1)}, resume=options.resume)
+        self.log.truncate(self.gencount)
+        self.genomeStats = {} #Game stats and episode of the genomes in the current population and last batch, by genome hash
+
+        #Every recorded game needs a seed, games that aren't seeded get a random one
+        self.archive = None
+        if(options.record):
+            self.archive = EpisodeArchive(self.statPath + "/episodes.bin", options.resume, self.gencount)
+            self.seedRng = np.random.default_rng()
 
-        GA = pygad.GA(num_generations=generations,
-                      num_parents_mating=parents,
-                      initial_population=initialPopulation,
-                      fitness_func=self.fitness,
-                      on_generation=self.genCallback,
-                      parallel_processing=12,
-                      parent_selection_type="rws",
-                      keep_elitism=populationSize//2
-                      )
-        GA.run()
+        #Steady state runs the same number of games as the generational GA would,
+        #and reports stats every interval games instead of every generation
+        if(options.mode == "steady-state"):
+            self.gentarget = options.generations*populationSize//options.interval
+
+        self.pool = None
+        self.games = None #VecGrid batched games are played on, kept from one generation to the next
+        if(options.workers > 0):
+            self.inflight = 2*options.workers #Children being played at once in steady state, enough to keep every worker busy
+            self.pool = WorkerPool(options.workers, self.batchModel.layers, self.config["gridHeight"], self.config["gridWidth"],
+                                   populationSize+self.inflight, options.profile, options.record, options.decisionCache)
+            self.stepEstimator = StepEstimator(populationSize)
+
+        self.profile = None
+        self.profileLog = None
+        if(options.profile):
+            self.profile = PhaseProfile()
+            self.profileLog = openProfileLog(self.statPath + "/profile", options.workers, options.resume, self.gencount)
+            self.instrument()
+        self.profileGenerations = set(options.profileGenerations or [])
+        self.cprofile = None
+
+        try:
+            self.beginGeneration()
+            if(options.mode == "steady-state"):
+                solution, solFitness, solIdx = self.runSteadyState(initialPopulation, checkpoint)
+            else:
+                solution, solFitness, solIdx = self.runGenerational(initialPopulation, checkpoint)
+        finally:
+            if(self.pool != None):
+                self.pool.close()
+            self.log.close()
+            if(self.profileLog != None):
+                self.profileLog.close()
+            if(self.archive != None):
+                self.archive.close()
 
 
         #saving stats
-        path = 'statbackup/'+self.modelName
-        if not os.path.exists(path):
-            os.makedirs(path)
-        np.savetxt(path + "/avg.csv", self.avgFit, delimiter=", ")
-        np.savetxt(path + "/peak.csv", self.peakFit, delimiter=", ")
+        self.saveStats()
+        if(options.checkpointEvery > 0):
+            if(options.mode == "steady-state"):
+                self.saveCheckpoint(self.population, self.popFitness)
+            else:
+                self.saveCheckpoint(self.ga.population, self.ga.fitness)
 
-        solution = GA.best_solution()[0]
-        solIdx = GA.best_solution()[2]
-        bestModel = self.models[solIdx]
-        bestWeights = pygad.kerasga.model_weights_as_matrix(model=bestModel, weights_vector=solution)
-        bestModel.set_weights(bestWeights)
-
-        bestModel.save("Agent/Models/"+modelName)
-        print("Best Model: Model", solIdx, "Fitness:", GA.best_solution()[1]-250)
-   
-    def fitness(self, inst, solution, sol_idx):
-        agent = self.agents[sol_idx]
-        grid = self.grids[sol_idx]
-        model = agent.model
-
-        modelWeights = pygad.kerasga.model_weights_as_matrix(model=model, weights_vector=solution)
-        model.set_weights(weights=modelWeights)
-        
+        if(self.saveModels):
+            self.saveSolution(solution, modelName)
+        print("Best Model: Model", solIdx, "Fitness:", solFitness-250)
+        self.reportMemory()
+        return solution, solFitness
 
-        grid.reset()
-        agent.reset()
-        
-        #self.agent.setModel(self.model)
-        #self.agent.reset()
-        #self.grid.reset()
+    #Runs the generational GA from a population, or from a checkpoint's. Each generation's children are scored together
+    #by batchFitness, in one batch, and half the population carries over as elites, keeping their fitness.
+    #Returns the best member, its fitness and index.
+    def runGenerational(self, population, checkpoint=None):
+        options = self.options
+        GA = GeneticAlgorithm(population, self.batchFitness, self.genCallback, options.parents, options.populationSize//2, options.selection)
+        #A resumed population's fitness is already known, so it isn't played again.
+        #Checkpoints from before the GA kept its own generator carry on with a new one.
+        resumeFitness = None
+        if(checkpoint != None):
+            arrays, info = checkpoint
+            resumeFitness = arrays["fitness"]
+            if("generator" in info):
+                setGeneratorState(GA.rng, info["generator"])
+        if(self.profile != None):
+            self.profile.wrap(GA, "breed", "ga")
+        self.ga = GA
+        GA.run(max(0, options.generations-self.gencount), resumeFitness)
+        return GA.best()
 
-        #gui = GUI(self.config, self.grid)
-        #gui.startGameLoop()
+    #Times the phases of training from here on, by wrapping the methods that run them
+    def instrument(self):
+        profile = self.profile
+        profile.wrap(self, "makeGames", "reset")
+        profile.wrap(self, "recordStats", "stats")
+        profile.wrap(self, "makeChild", "breed")
+        profile.wrap(self, "insertChild", "insert")
+        profile.wrap(self, "saveProgress", "save")
+        profile.wrap(self.batchModel, "setPopulation", "setWeights")
+        profile.wrap(self.batchModel, "setGenome", "setWeights")
+        profile.wrap(self.batchModel, "chooseMoves", "inference")
+        if(self.pool != None):
+            self.pool.profile = profile
+            profile.wrap(self.pool, "publish", "publish")
+            profile.wrap(self.pool, "collect", "wait")
 
-        grid.startLoopNoGUI()
+    #Returns the food seed of the current generation's games, or None if games aren't seeded
+    def evaluationSeed(self):
+        if(self.options.seed == None):
+            return None
+        if(self.options.reseed > 0):
+            return self.options.seed + self.gencount//self.options.reseed
+        return self.options.seed
 
-        score = 50*agent.foodEaten + agent.movement + agent.died*-50
-        score += 250 #offset from negative values
+    #Food seeds of the current generation's episodes, one per episode, or [None] if games aren't seeded.
+    #Each generation's seeds follow on from the last's, so no two share any.
+    def evaluationSeeds(self):
+        seed = self.evaluationSeed()
+        if(seed == None or self.options.episodes == 1):
+            return [seed]
+        return [seed*self.options.episodes + i for i in range(self.options.episodes)]
+
+    #Plays the generation's episodes for every solution, either on the worker pool or batched in this process.
+    #Scores are the mean of what fitness() gives each game.
+    def batchFitness(self, solutions):
+        solutions = np.asarray(solutions)
+        stats = self.playEpisodes(solutions, self.evaluationSeeds())
+        self.recordStats(solutions, stats)
+        return self.meanScore(stats)
 
-        #print("Model", sol_idx, "Done. Fitness:",score-250)
+    #Mean score of each solution's games, from the totals of their stats. Scores are linear in the stats,
+    #so this is the score of the mean stats.
+    def meanScore(self, stats):
+        played = stats["played"]
+        return self.score(stats["foodEaten"]/played, stats["movement"]/played, stats["died"]/played)
+
+    #Plays every solution on each seed in turn, one round per seed, every round batched together as play() does.
+    #Returns the totals of each solution's game stats, and how many games it played. When recording, each solution's
+    #episode is that of its best game. With racing, from the second round on, solutions whose mean so far can no longer reach
+    #the elite threshold (see raceSurvivors) aren't played in the rounds after it.
+    def playEpisodes(self, solutions, seeds):
+        count = len(solutions)
+        stats = {"foodEaten": np.zeros(count, dtype=np.int64),
+                 "movement": np.zeros(count),
+                 "died": np.zeros(count, dtype=np.int64),
+                 "steps": np.zeros(count, dtype=np.int64),
+                 "played": np.zeros(count, dtype=np.int64)}
+        if(self.options.record):
+            stats["episodes"] = [None]*count
+        scores = np.zeros((count, len(seeds)))
+        threshold = None
+        if(self.options.race != None and self.options.mode == "generational"):
+            threshold = self.ga.eliteThreshold()
+
+        racing = np.arange(count)
+        for episode, seed in enumerate(seeds):
+            if(racing.size == 0):
+                break
+            played = self.play(solutions[racing], seed)
+            for name in ["foodEaten", "movement", "died", "steps"]:
+                stats[name][racing] += played[name]
+            stats["played"][racing] += 1
+            scores[racing, episode] = self.score(played["foodEaten"], played["movement"], played["died"])
+            if(self.options.record):
+                for j, i in enumerate(racing):
+                    if(episode == 0 or scores[i, episode] > scores[i, :episode].max()):
+                        stats["episodes"][i] = played["episodes"][j]
+            if(threshold != None and 0 < episode < len(seeds)-1):
+                racing = racing[raceSurvivors(scores[racing, :episode+1], threshold, self.options.race)]
+        self.episodeCounts[0] += int(stats["played"].sum())
+        self.episodeCounts[1] += count*len(seeds)
+        return stats
+
+    #Remembers the game stats of played solutions, so they can be logged with the population they end up in.
+    def recordStats(self, solutions, stats):
+        episodes = stats.get("episodes")
+        for i, solution in enumerate(solutions):
+            episode = None if episodes == None else episodes[i]
+            self.genomeStats[genomeKey(solution)] = (stats["foodEaten"][i], stats["steps"][i], stats["died"][i], episode)
+
+    #Returns the foodEaten, steps and died arrays of a population's last games, -1 where they aren't known
+    #(members carried over from before a resume). Forgets the stats of genomes no longer in the population.
+    def populationStats(self, population):
+        episodes = np.full((len(population), 3), -1, dtype=np.int64)
+        current = {}
+        for i, solution in enumerate(population):
+            key = genomeKey(solution)
+            if(key in self.genomeStats):
+                current[key] = self.genomeStats[key]
+                episodes[i] = current[key][:3]
+        self.genomeStats = current
+        return {"foodEaten": episodes[:, 0], "steps": episodes[:, 1], "died": episodes[:, 2]}
+
+    #Plays one game for every solution, on the worker pool or batched, and returns the stats of each game.
+    #When recording, the stats also hold each game's Episode.
+    def play(self, solutions, seed=None):
+        self.gamesPlayed += len(solutions)
+        if(self.pool != None):
+            if(self.options.record):
+                seed = np.full(len(solutions), seed) if seed != None else self.seedRng.integers(0, 2**63, size=len(solutions))
+            expectedSteps = self.stepEstimator.estimate(solutions)
+            stats = self.pool.evaluate(solutions, expectedSteps, seed)
+            self.stepEstimator.record(solutions, stats["steps"])
+            if(self.options.record):
+                stats["seeds"] = seed
+        else:
+            stats = self.playBatched(solutions, seed)
+        if(self.options.record):
+            stats["episodes"] = [Episode(self.engine(), self.config["gridHeight"], self.config["gridWidth"], stats["seeds"][i], stats["actions"][i], int(stats["steps"][i]))
+                                 for i in range(len(solutions))]
+        if(self.profile != None):
+            self.profile.count("games", len(solutions))
+            self.profile.count("steps", np.sum(stats["steps"]))
+            self.profile.count("foodEaten", np.sum(stats["foodEaten"]))
+        return stats
+
+    #The engine games are played on: Grids on the workers, or VecGrids when batched
+    def engine(self):
+        return VEC if self.pool == None else GRID
+
+    #Plays one game for every solution at once on a VecGrid, choosing all moves of a step
+    #with a single batched forward pass. Returns the stats of each game.
+    def playBatched(self, solutions, seed=None):
+        count = len(solutions)
+        self.batchModel.setPopulation(solutions, copy=False)
+        games = self.makeGames(count, autoReset=False, seeds=None if seed == None else [seed]*count)
+        actions = np.zeros(games.numGames, dtype=np.int64)
+        seeds = games.seeds[:count].view(np.int64).copy()
+        history = [] #Moves of every game at each step, when recording. A game's moves are the first steps rows of its column.
+
+        while(games.running.any()):
+            live = np.flatnonzero(games.running)
+            actions[live] = self.batchModel.chooseMoves(games.getStates(live), live)
+            if(self.options.record):
+                history.append(actions.astype(np.uint8))
+            games.step(actions)
+
+        #Copied, the games' arrays are overwritten by the next call
+        stats = {"foodEaten": games.lastFoodEaten[:count].copy(),
+                 "movement": games.lastMovement[:count].copy(),
+                 "died": games.lastDied[:count].copy(),
+                 "steps": games.lastSteps[:count].copy()}
+        if(self.options.record):
+            history = np.stack(history) if history else np.zeros((0, games.numGames), dtype=np.uint8)
+            stats["seeds"] = seeds
+            stats["actions"] = [packActions(history[:games.lastSteps[i], i]) for i in range(count)]
+        return stats
+
+    #Returns a VecGrid whose first numGames games are reset (with the given seeds, if any) and running, and any others stopped.
+    #Its boards and bodies take about 5 bytes per cell per game, so one VecGrid is kept and reset for every generation,
+    #and only replaced by a larger one when more games are needed. Its calls are timed when profiling.
+    def makeGames(self, numGames, autoReset, seeds=None):
+        if(self.games == None or self.games.numGames < numGames):
+            self.games = None #The smaller games are freed before the larger ones are allocated
+            games = VecGrid(numGames, self.config["gridHeight"], self.config["gridWidth"], autoReset=autoReset)
+            if(self.profile != None):
+                self.profile.wrap(games, "reset", "reset")
+                self.profile.wrap(games, "getStates", "getState")
+                self.profile.wrap(games, "step", "step")
+                self.profile.wrap(games, "placeRandomFood", "food")
+            self.games = games
+        games = self.games
+        games.autoReset = autoReset
+        games.reset(np.arange(numGames), seeds)
+        games.running[numGames:] = False
+        return games
+
+    #Fitness of a finished game, works on single values or arrays of them
+    def score(self, foodEaten, movement, died):
+        score = 50*foodEaten + movement + died*-50
+        score += 250 #offset from negative values
         return score
 
+    #-------------------Steady State------------------
+    #Runs the GA without generations. Every finished game's genome is inserted into the population right away
+    #(replacing the worst member, or the worst of a small tournament, if it is fitter) and a new child is bred
+    #and started in its place, so no game ever waits for the slowest one of a generation.
+    #A resumed run starts from the checkpoint's population, games that were being played when it was saved are bred again.
+    def runSteadyState(self, population, checkpoint=None):
+        self.rng = np.random.default_rng()
+        self.population = np.ascontiguousarray(population, dtype=np.float32)
+        if(checkpoint != None):
+            arrays, info = checkpoint
+            self.popFitness = np.array(arrays["fitness"])
+            self.evaluations = info["evaluations"]
+            setGeneratorState(self.rng, info["generator"])
+        else:
+            self.popFitness = np.asarray(self.batchFitness(self.population))
+            self.evaluations = 0
+        self.dispatched = self.evaluations
+        self.popStats = self.populationStats(self.population)
+        self.evalTarget = self.options.generations*len(self.population)
+        self.busyTime = 0.0
+        self.intervalStart = time.perf_counter()
+
+        if(self.pool != None):
+            self.steadyStatePool()
+        else:
+            self.steadyStateBatched()
+
+        best = np.argmax(self.popFitness)
+        return self.population[best], self.popFitness[best], best
+
+    #Breeds one child from the current population
+    def makeChild(self):
+        self.dispatched += 1
+        return breed(self.population, self.popFitness, 1, self.rng, self.options.selection)[0]
+
+    #Adds a played child to the population, reports stats every interval games
+    def insertChild(self, child, score, foodEaten, steps, died):
+        loser = pickReplacement(self.popFitness, score, self.options.replacement, self.rng)
+        if(loser != None):
+            self.population[loser] = child
+            self.popFitness[loser] = score
+            self.popStats["foodEaten"][loser] = foodEaten
+            self.popStats["steps"][loser] = steps
+            self.popStats["died"][loser] = died
+        self.evaluations += 1
+        if(self.profile != None):
+            self.profile.count("games")
+            self.profile.count("steps", steps)
+            self.profile.count("foodEaten", foodEaten)
+
+        if(self.evaluations % self.options.interval == 0):
+            utilization = None
+            if(self.pool != None):
+                now = time.perf_counter()
+                utilization = self.busyTime / (self.pool.numWorkers*(now-self.intervalStart))
+                self.busyTime = 0.0
+                self.intervalStart = now
+            self.report(self.popFitness, self.population, utilization, self.popStats)
+
+    #Each worker always has children waiting for it. Children are written to the rows after the population
+    #in the pool's shared matrix, and a row is refilled as soon as its game comes back.
+    def steadyStatePool(self):
+        popSize = len(self.population)
+        children = {}
+        for row in range(popSize, popSize+self.inflight):
+            if(self.dispatched < self.evalTarget):
+                children[row] = self.makeChild()
+                self.pool.publish([children[row]], row)
+                self.pool.submit([row], [self.evaluationSeed()])
+
+        while(self.evaluations < self.evalTarget):
+            row, foodEaten, movement, died, steps, busy = self.pool.collect()
+            self.busyTime += busy
+            self.insertChild(children[row], self.score(foodEaten, movement, died), foodEaten, steps, died)
+            if(self.dispatched < self.evalTarget):
+                children[row] = self.makeChild()
+                self.pool.publish([children[row]], row)
+                self.pool.submit([row], [self.evaluationSeed()])
+
+    #Plays one game per population member at once on an auto resetting VecGrid.
+    #When a game ends its child is inserted, and a new child takes over that game's slot in the batched model.
+    def steadyStateBatched(self):
+        size = len(self.population)
+        children = np.stack([self.makeChild() for i in range(size)])
+        self.batchModel.setPopulation(children)
+        games = self.makeGames(size, autoReset=True, seeds=None if self.options.seed == None else [self.evaluationSeed()]*size)
+        actions = np.zeros(size, dtype=np.int64)
+
+        while(self.evaluations < self.evalTarget):
+            live = np.flatnonzero(games.running)
+            actions[live] = self.batchModel.chooseMoves(games.getStates(live), live)
+            results, done = games.step(actions)
+            for slot in np.flatnonzero(done):
+                self.insertChild(children[slot], self.score(games.lastFoodEaten[slot], games.lastMovement[slot], games.lastDied[slot]),
+                                 games.lastFoodEaten[slot], games.lastSteps[slot], games.lastDied[slot])
+                if(self.dispatched < self.evalTarget):
+                    children[slot] = self.makeChild()
+                    self.batchModel.setGenome(slot, children[slot])
+                    if(self.options.seed != None):
+                        games.reset([slot], [self.evaluationSeed()])
+                else:
+                    games.running[slot] = False
+
+    #-------------------Reporting------------------
     def genCallback(self, ga):
+        utilization = None
+        if(self.pool != None):
+            utilization = self.pool.utilization
+        self.report(ga.fitness, ga.population, utilization, self.populationStats(ga.population))
+
+    #Prints and records the stats of a generation (or interval of games in steady state),
+    #and saves progress every 50 of them. episodes holds the population's foodEaten, steps and died arrays.
+    def report(self, fit, population, utilization=None, episodes=None):
+        reportStart = time.perf_counter()
         self.gencount += 1
-        fit = ga.last_generation_fitness
         avg = np.average(fit)-250
         peak = np.max(fit)-250
         
@@ -104,40 +480,159 @@ class Population():
 
         print("Generation", self.gencount, "of", self.gentarget, "finished!")
         print("Average Fitness: ", avg)
+        if(utilization != None):
+            self.utilization.append(utilization)
+            print("Worker Utilization: " + str(round(100*utilization, 1)) + "%")
+        if(episodes == None):
+            episodes = {"foodEaten": -1, "steps": -1, "died": -1}
+        self.log.append(fitness=np.asarray(fit)-250,
+                        foodEaten=np.broadcast_to(episodes["foodEaten"], len(fit)),
+                        steps=np.broadcast_to(episodes["steps"], len(fit)),
+                        died=np.broadcast_to(episodes["died"], len(fit)),
+                        avg=avg,
+                        peak=peak,
+                        utilization=np.nan if utilization == None else utilization)
+        if(self.archive != None):
+            self.archiveBest(population, fit)
+        if(self.migration != None and self.gencount%self.migration.interval==0):
+            print("Migrants received:", self.migration.exchange(population, fit))
+        if(self.options.episodes > 1):
+            played, planned = self.episodeCounts
+            print("Episodes Played: " + str(played) + " of " + str(planned) + " (" + str(round(100*(1-played/max(1, planned)), 1)) + "% cut by racing)")
+            self.episodeCounts = [0, 0]
+        if(self.pool != None and self.pool.decisionCache > 0):
+            hits, misses = self.pool.decisionCounts
+            print("Decision Cache Hit Rate: " + str(round(100*hitRate(hits, misses), 1)) + "% (" + str(hits) + " model calls saved)")
+            self.pool.decisionCounts = [0, 0]
+        self.endGeneration(reportStart)
         print("Peak Fitness:", peak, "\n")
+        self.saveProgress(population, fit)
+        self.beginGeneration()
+
+    #Prints the peak memory of the run, and of its largest worker. Workers have exited by now, so theirs is known.
+    def reportMemory(self):
+        memory = peakMemory()
+        if(memory == None):
+            return
+        line = "Peak Memory: " + formatBytes(memory)
+        if(self.pool != None):
+            line += " (largest worker " + formatBytes(peakMemory(children=True)) + ")"
+        print(line)
+
+    #Adds the episode of the generation's best member to the archive, unless its game was played before a resume
+    def archiveBest(self, population, fit):
+        best = int(np.argmax(fit))
+        stats = self.genomeStats.get(genomeKey(population[best]))
+        if(stats != None and stats[3] != None):
+            self.archive.append(self.gencount, fit[best]-250, stats[3])
+
+    #Saves the stats and model every 50 generations, and checkpoints every checkpointEvery
+    def saveProgress(self, population, fit):
         if(self.gencount%50==0):
             print("Saving progress...")
-            path = 'statbackup/'+self.modelName
-            if not os.path.exists(path):
+            self.saveStats()
+            if(self.saveModels):
+                self.saveSolution(population[np.argmax(fit)], self.modelName)
+        if(self.options.checkpointEvery > 0 and self.gencount%self.options.checkpointEvery==0):
+            self.saveCheckpoint(population, fit)
+
+    #Starts cProfile if the next generation is one to profile
+    def beginGeneration(self):
+        if(self.gencount+1 not in self.profileGenerations):
+            return
+        self.cprofile = cProfile.Profile()
+        if(self.pool != None):
+            self.pool.cprofile = True
+        self.cprofile.enable()
+
+    #Prints and logs the time spent in each phase of the generation that just finished, and saves its cProfile.
+    #Its saves and checkpoint come after, so they are counted to the next generation.
+    def endGeneration(self, reportStart):
+        if(self.cprofile != None):
+            self.cprofile.disable()
+            path = self.statPath + "/profile"
+            if(not os.path.exists(path)):
                 os.makedirs(path)
-            np.savetxt(path + "/avg.csv", self.avgFit, delimiter=", ")
-            np.savetxt(path + "/peak.csv", self.peakFit, delimiter=", ")
-            
-            model = self.models[np.argmax(fit)]
-            model.save("Agent/Models/"+self.modelName)
+            name = path + "/generation_" + str(self.gencount)
+            self.cprofile.dump_stats(name + ".prof")
+            print("cProfile saved to", name + ".prof")
+            self.cprofile = None
+            if(self.pool != None):
+                self.pool.cprofile = False
+                if(self.pool.profileStats):
+                    dumpStats(name + "_workers.prof", self.pool.profileStats)
+                    print("Worker cProfile saved to", name + "_workers.prof")
+                    self.pool.profileStats = []
+        if(self.profile != None):
+            now = time.perf_counter()
+            self.profile.add("report", now-reportStart)
+            wall = now - self.profile.start
+            for line in self.profile.summary(wall):
+                print(line)
+            self.profileLog.append(**self.profile.row(self.gencount, wall, 0 if self.pool == None else self.pool.numWorkers))
+            self.profile.reset()
 
-    
-        
+    #Writes the stats of the run so far to statbackup/<model name>, or statPath if set
+    def saveStats(self):
+        path = self.statPath
+        if not os.path.exists(path):
+            os.makedirs(path)
+        np.savetxt(path + "/avg.csv", self.avgFit, delimiter=", ")
+        np.savetxt(path + "/peak.csv", self.peakFit, delimiter=", ")
+        if(self.utilization):
+            np.savetxt(path + "/utilization.csv", self.utilization, delimiter=", ")
+        #Rebuilding the plot summary from the log, so plotting a long run doesn't have to
+        self.log.flush()
+        modelSummary(path)
+
+    def checkpointPath(self):
+        return self.statPath + "/checkpoint.npz"
+
+    #Saves everything needed to carry on the run from here: the population and its fitness,
+    #the generation, the stats so far, the run's settings and the state of the GA's random generator
+    def saveCheckpoint(self, population, fit):
+        arrays = {"population": np.asarray(population),
+                  "fitness": np.asarray(fit, dtype=np.float64),
+                  "avg": np.asarray(self.avgFit, dtype=np.float64),
+                  "peak": np.asarray(self.peakFit, dtype=np.float64),
+                  "utilization": np.asarray(self.utilization, dtype=np.float64)}
+        info = self.options.settings()
+        info["generation"] = self.gencount
+        if(self.options.mode == "steady-state"):
+            info["evaluations"] = self.evaluations
+            info["generator"] = generatorState(self.rng)
+        else:
+            info["generator"] = generatorState(self.ga.rng)
+        saveCheckpoint(self.checkpointPath(), arrays, info)
 
     #-------------------Model Functions------------------
-     #layers is a list of tuples, with an integer count and a string activation function
+    #The starting population: the template's own weights,
+    #and populationSize-1 copies of them with uniform [-1, 1] noise added to every weight.
+    #Built in place as one float32 matrix, with the noise drawn a block of rows at a time so it never needs a float64 copy of it.
+    def initialPopulation(self, populationSize, blockRows=256):
+        weights = self.template.getWeightsVector().astype(np.float32)
+        population = np.empty((populationSize, weights.size), dtype=np.float32)
+        population[:] = weights
+        for start in range(1, populationSize, blockRows):
+            end = min(start+blockRows, populationSize)
+            population[start:end] += np.random.uniform(low=-1.0, high=1.0, size=(end-start, weights.size))
+        return population
+
+    #Saves a flat weight vector as the named model
+    def saveSolution(self, solution, modelName):
+        model = getattr(self, "template", None)
+        if(model == None):
+            model = loadModel(modelName)
+        model = NumpyModel(model.layers)
+        model.setWeightsVector(solution)
+        model.save(MODEL_DIR+modelName+".npz")
+
+    #layers is a list of the number of nodes in each hidden layer.
     #It does NOT include the input or output layers
-    
     def buildModel(self, layers, modelName):
         self.modelName = modelName
-        model = tensorflow.keras.Sequential()
-        #15
-        model.add(tensorflow.keras.layers.Dense(layers[0], activation=tensorflow.keras.activations.relu, input_shape=[13,]))
-        for size in layers[1:]:
-            model.add(tensorflow.keras.layers.Dense(size, activation=tensorflow.keras.activations.relu))
-        
-        model.add(tensorflow.keras.layers.Dense(3, activation=tensorflow.keras.activations.softmax))
-        
-        #adam = tensorflow.keras.optimizers.Adam()
-        #model.compile(loss='mse', optimizer=adam)
-        #if(weights):
-        #    model.load_weights(weights)
-        model.save("Agent/Models/"+self.modelName)
+        model = NumpyModel.create(layers)
+        model.save(MODEL_DIR+self.modelName+".npz")
         return model
     
     def saveModel(self, path):
@@ -0,0 +1,126 @@
+import numpy as np
+import json
+import os
+
+#An append only, column per file log of a training run, kept in statbackup/<name>/log.
+#columns.json lists every column's dtype and width (values per generation), and each column is a raw file
+#<column>.bin of rows of that many values, one row per generation. Rows are only ever appended, so a crash
+#can at most leave a partial last row, which readers ignore.
+
+HEADER = "columns.json"
+
+#Writes generations to a log, buffering at most flushEvery generations or maxBuffer bytes before appending them to the files.
+#columns is a dict of name -> (dtype, width). An existing log is appended to if resume is set, otherwise it is replaced.
+class LogWriter:
+    def __init__(self, path, columns, resume=False, flushEvery=1, maxBuffer=1<<20):
+        self.path = path
+        self.columns = {name: (np.dtype(dtype), width) for name, (dtype, width) in columns.items()}
+        self.flushEvery = flushEvery
+        self.maxBuffer = maxBuffer
+        self.buffers = {name: [] for name in self.columns}
+        self.bufferedRows = 0
+        self.bufferedBytes = 0
+
+        if(not os.path.exists(path)):
+            os.makedirs(path)
+        header = {name: {"dtype": dtype.str, "width": width} for name, (dtype, width) in self.columns.items()}
+        if(resume and os.path.exists(os.path.join(path, HEADER))):
+            with open(os.path.join(path, HEADER), 'r') as file:
+                if(json.load(file) != header):
+                    raise ValueError("The log in " + path + " has different columns, it can't be resumed")
+        else:
+            for name in os.listdir(path):
+                if(name.endswith(".bin")):
+                    os.remove(os.path.join(path, name))
+            with open(os.path.join(path, HEADER), 'w') as file:
+                json.dump(header, file)
+        self.files = {name: open(self.columnPath(name), 'ab') for name in self.columns}
+        self.rows = 0
+        self.truncate(self.completeRows()) #New rows must start on a row boundary
+
+    def columnPath(self, name):
+        return os.path.join(self.path, name + ".bin")
+
+    #Number of whole rows in every column's file
+    def completeRows(self):
+        rows = None
+        for name, (dtype, width) in self.columns.items():
+            count = os.path.getsize(self.columnPath(name)) // (dtype.itemsize*width)
+            rows = count if rows is None else min(rows, count)
+        return rows or 0
+
+    #Cuts the log down to its first rows generations, and any partial row left by a crash.
+    #Used when resuming from a checkpoint older than the end of the log.
+    def truncate(self, rows):
+        self.flush()
+        rows = min(rows, self.completeRows())
+        for name, (dtype, width) in self.columns.items():
+            self.files[name].truncate(rows*dtype.itemsize*width)
+        self.rows = rows
+
+    #Adds a generation. Every column must be given, as a single value or an array of its width.
+    def append(self, **values):
+        for name, (dtype, width) in self.columns.items():
+            row = np.asarray(values[name], dtype=dtype).reshape(-1)
+            if(row.size != width):
+                raise ValueError("Column " + name + " takes " + str(width) + " values per generation, got " + str(row.size))
+            data = row.tobytes()
+            self.buffers[name].append(data)
+            self.bufferedBytes += len(data)
+        self.bufferedRows += 1
+        self.rows += 1
+        if(self.bufferedRows >= self.flushEvery or self.bufferedBytes >= self.maxBuffer):
+            self.flush()
+
+    #Appends the buffered generations to the files
+    def flush(self):
+        for name, buffer in self.buffers.items():
+            if(buffer):
+                self.files[name].write(b"".join(buffer))
+                self.files[name].flush()
+                buffer.clear()
+        self.bufferedRows = 0
+        self.bufferedBytes = 0
+
+    def close(self):
+        self.flush()
+        for file in self.files.values():
+            file.close()
+
+#Memory maps every column of a log, returns a dict of name -> read only (generations, width) arrays.
+#All columns are cut to the number of generations every one of them has in full.
+def readLog(path):
+    with open(os.path.join(path, HEADER), 'r') as file:
+        header = json.load(file)
+    columns = {}
+    rows = None
+    for name, spec in header.items():
+        dtype = np.dtype(spec["dtype"])
+        width = spec["width"]
+        count = os.path.getsize(os.path.join(path, name + ".bin")) // (dtype.itemsize*width)
+        rows = count if rows is None else min(rows, count)
+        columns[name] = (dtype, width)
+
+    log = {}
+    for name, (dtype, width) in columns.items():
+        if(rows == 0):
+            log[name] = np.zeros((0, width), dtype=dtype)
+        else:
+            log[name] = np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode='r', shape=(rows, width))
+    return log
+
+def hasLog(path):
+    return os.path.exists(os.path.join(path, HEADER))
+
+#Builds a log from the avg.csv and peak.csv a run saved before logs existed. Only the avg and peak columns can be filled.
+def importCsv(statPath, logPath=None):
+    if(logPath is None):
+        logPath = os.path.join(statPath, "log")
+    avg = np.atleast_1d(np.loadtxt(os.path.join(statPath, "avg.csv"), delimiter=",", dtype=np.float64))
+    peak = np.atleast_1d(np.loadtxt(os.path.join(statPath, "peak.csv"), delimiter=",", dtype=np.float64))
+    rows = min(len(avg), len(peak))
+    writer = LogWriter(logPath, {"avg": (np.float64, 1), "peak": (np.float64, 1)}, flushEvery=max(rows, 1))
+    for i in range(rows):
+        writer.append(avg=avg[i], peak=peak[i])
+    writer.close()
+    return rows
@@ -0,0 +1,187 @@
+from Agent.Agents import AIAgent
+from Agent.NumpyModel import NumpyModel
+from Agent.Scheduler import planTasks
+from Agent.Profiler import PhaseProfile, peakMemory
+from Game.Grid import Grid
+from Game.Replay import recordMoves, packActions
+from multiprocessing import shared_memory
+import multiprocessing
+import cProfile
+import queue
+import time
+import numpy as np
+
+#Runs in each worker process. The worker keeps one model, agent and grid for its whole life,
+#and plays a game for every (genome row, seed) it is sent, reading the weights from shared memory.
+#When profiled, the phases of every game are timed and sent back with its stats, and games of tasks
+#sent with cProfile on are also run under cProfile. When recording, the moves of every game are sent back packed.
+#With a decision cache, its hits and misses in every game are sent back.
+def workerLoop(index, shmName, shape, layers, cols, rows, profiled, recording, decisionCache, tasks, results):
+    shm = shared_memory.SharedMemory(name=shmName)
+    weights = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    model = NumpyModel(layers)
+    agent = AIAgent(model, decisionCache)
+    grid = Grid(cols, rows, agent)
+    grid.Setup()
+
+    profile = None
+    if(profiled):
+        profile = PhaseProfile()
+        profile.wrap(model, "setWeightsVector", "setWeights")
+        profile.wrap(grid, "reset", "reset")
+        profile.wrap(grid, "gameLoop", "move")
+        profile.wrap(grid, "getState", "getState")
+        profile.wrap(grid, "placeRandomFood", "food")
+        profile.wrap(agent, "ChooseMove", "inference")
+    moves = recordMoves(agent) if recording else None
+
+    while(True):
+        task = tasks.get()
+        if(task is None):
+            break
+        games, profiling = task
+        for row, seed in games:
+            profiler = None
+            if(profiling):
+                profiler = cProfile.Profile()
+                profiler.enable()
+            if(moves != None):
+                moves.clear()
+            start = time.perf_counter()
+            model.setWeightsVector(weights[row])
+            grid.reset(seed)
+            agent.reset()
+            grid.startLoopNoGUI()
+            busy = time.perf_counter() - start
+
+            report = None
+            if(profile != None or profiler != None or moves != None or agent.decisions != None):
+                report = {"worker": index}
+                if(agent.decisions != None):
+                    report["decisions"] = agent.decisions.takeCounts()
+                if(moves != None):
+                    report["actions"] = packActions(moves)
+                if(profile != None):
+                    report["times"] = profile.take()
+                    report["memory"] = peakMemory()
+                if(profiler != None):
+                    profiler.disable()
+                    profiler.create_stats()
+                    report["stats"] = profiler.stats
+            results.put((row, agent.foodEaten, agent.movement, agent.died, agent.steps, busy, report))
+
+    del weights
+    shm.close()
+
+#A pool of long lived worker processes for fitness evaluation.
+#Genome weights are published once per generation into a shared (capacity x params) float32 matrix,
+#tasks only carry row numbers, and workers send back the stats of each game they play.
+#With profiled set, workers time the phases of their games, which are added to profile, a PhaseProfile, as they come back.
+#With recording set, workers send back the moves of every game, see Game/Replay.py.
+#With decisionCache > 0, each worker's agent has a decision cache of that size, whose hits and misses are added up in decisionCounts.
+class WorkerPool:
+    def __init__(self, numWorkers, layers, cols, rows, capacity, profiled=False, recording=False, decisionCache=0):
+        self.numWorkers = numWorkers
+        self.capacity = capacity
+        self.numParams = sum(inSize*outSize + outSize for inSize, outSize, _ in layers)
+        self.utilization = 0.0 #Fraction of worker time spent playing during the last evaluate()
+        self.profile = None
+        self.cprofile = False #Whether games submitted are run under cProfile
+        self.profileStats = [] #cProfile stats of those games, one dict per game
+        self.recording = recording
+        self.actions = {} #Packed moves of the last game played from each row, when recording
+        self.decisionCache = decisionCache
+        self.decisionCounts = [0, 0] #Decision cache hits and misses of the workers' games
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, capacity*self.numParams*4))
+        self.weights = np.ndarray((capacity, self.numParams), dtype=np.float32, buffer=self.shm.buf)
+
+        #Spawned rather than forked: forking a process that already runs threads (queue feeders, BLAS pools) can leave a lock
+        #held forever in the child. A spawned worker starts clean, sharing only the queues and the weights it attaches to by name.
+        context = multiprocessing.get_context("spawn")
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.workers = []
+        for i in range(numWorkers):
+            worker = context.Process(target=workerLoop, daemon=True,
+                                     args=(i, self.shm.name, self.weights.shape, layers, cols, rows, profiled, recording, decisionCache, self.tasks, self.results))
+            worker.start()
+            self.workers.append(worker)
+
+    #Copies genomes into the shared matrix, starting at the given row
+    def publish(self, solutions, start=0):
+        solutions = np.asarray(solutions, dtype=np.float32)
+        self.weights[start:start+len(solutions)] = solutions
+
+    #Queues a game for each of the given rows, to be played by whichever worker is free.
+    #seeds gives each game's food seed, unseeded games place food at random.
+    def submit(self, rows, seeds=None):
+        if(seeds is None):
+            seeds = [None]*len(rows)
+        seeds = [None if seed is None else int(seed) for seed in seeds]
+        self.tasks.put((list(zip(rows, seeds)), self.cprofile))
+
+    #Waits for the next finished game, returns (row, foodEaten, movement, died, steps, busy seconds)
+    def collect(self):
+        while(True):
+            try:
+                result = self.results.get(timeout=1)
+                break
+            except queue.Empty:
+                if(not all(worker.is_alive() for worker in self.workers)):
+                    raise RuntimeError("An evaluation worker has stopped unexpectedly")
+        report = result[-1]
+        if(report != None):
+            if("times" in report and self.profile != None):
+                self.profile.addWorker(report["worker"], report["times"], report["memory"])
+            if("stats" in report):
+                self.profileStats.append(report["stats"])
+            if("actions" in report):
+                self.actions[result[0]] = report["actions"]
+            if("decisions" in report):
+                self.decisionCounts[0] += report["decisions"][0]
+                self.decisionCounts[1] += report["decisions"][1]
+        return result[:-1]
+
+    #Plays one game for each solution, spread over the workers, longest expected games first.
+    #Returns the stats of every game as arrays, in the same order as the solutions, and their packed moves when recording.
+    #With a seed, every game is played with that food seed, or with seeds, one per solution, each game with its own.
+    def evaluate(self, solutions, expectedSteps=None, seed=None):
+        count = len(solutions)
+        if(expectedSteps is None):
+            expectedSteps = np.ones(count)
+        if(seed is None or np.ndim(seed) == 0):
+            seed = [seed]*count
+        start = time.perf_counter()
+        self.publish(solutions)
+        for task in planTasks(expectedSteps, self.numWorkers):
+            self.submit(task, [seed[row] for row in task])
+
+        stats = {"foodEaten": np.zeros(count, dtype=np.int64),
+                 "movement": np.zeros(count),
+                 "died": np.zeros(count, dtype=bool),
+                 "steps": np.zeros(count, dtype=np.int64)}
+        busy = 0.0
+        for i in range(count):
+            row, foodEaten, movement, died, steps, seconds = self.collect()
+            stats["foodEaten"][row] = foodEaten
+            stats["movement"][row] = movement
+            stats["died"][row] = died
+            stats["steps"][row] = steps
+            busy += seconds
+
+        wall = time.perf_counter() - start
+        self.utilization = busy / (self.numWorkers*wall) if wall > 0 else 1.0
+        if(self.recording):
+            stats["actions"] = [self.actions.pop(row) for row in range(count)]
+        return stats
+
+    #Stops the workers and frees the shared memory
+    def close(self):
+        for worker in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+        del self.weights
+        self.shm.close()
+        self.shm.unlink()
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
-from Game.Grid import Grid
+import numpy as np
+from Game.Grid import Grid, EMPTY
 from Game.Point import PointType
 
 class GUI:
@@ -9,14 +10,46 @@ class GUI:
         self.grid = None
         self.gameCanvas = None
         self.grid = grid
+        self.items = {} #Canvas rectangle of each cell that has been drawn, reused whenever the cell changes
     
     #Starts a game loop, and displays the game in a window.
     def startGameLoop(self):
         self.grid.gameRunning = True
         self.setupWindow(self.grid.gameLoop)    
         
+    #Plays back a recorded episode (a Game.Replay.Replay, which also takes the place of the grid), moving speed moves
+    #every frame, starting from move start. Frames are drawn from the replay's boards, only redrawing the cells that changed.
+    def startReplay(self, replay, speed=1, start=0):
+        self.openWindow()
+        self.gameCanvas.delete(tk.ALL)
+        self.items = {}
+        self.shown = np.full(self.grid.numPoints, EMPTY, dtype=np.int8)
+        self.drawReplay(replay, start, speed)
+        self.r.mainloop()
+
+    def drawReplay(self, replay, step, speed):
+        board = replay.board(step)
+        for cell in np.flatnonzero(board != self.shown).tolist():
+            self.drawCell(cell, board[cell])
+        self.shown[:] = board
+        self.r.title("Snake - move " + str(step) + " of " + str(replay.steps))
+        if(step < replay.steps):
+            self.gameCanvas.after(self.conf["updateRate"], self.drawReplay, replay, min(step+speed, replay.steps), speed)
+        else:
+            print("Replay over!")
+            print("")
+            self.r.after(1000, self.r.destroy)
+        self.gameCanvas.update()
+
     #Setting up window
     def setupWindow(self, gameLoop):
+        self.openWindow()
+        self.drawBoard()
+        self.drawGame(gameLoop)
+        self.r.mainloop()
+
+    #Opens the window, with a canvas sized to the grid
+    def openWindow(self):
         self.r = tk.Tk()
         r = self.r
         r.title("Snake")
@@ -34,33 +67,48 @@ class GUI:
         self.pixelSize = min(canvasSize//self.grid.colNum, canvasSize//self.grid.rowNum)
         self.gameCanvas = tk.Canvas(master=r, width=round(canvasSize/ratio[1]), height=round(canvasSize/ratio[0]), bg=self.conf["colorPalette"][PointType.EMPTY])
         self.gameCanvas.pack(anchor=tk.CENTER)
-        self.drawGame(gameLoop)
-        r.mainloop()
     
 
     #Gets the corresponding color of a point
     def pickColor(self, type):
         return self.conf["colorPalette"][type]
 
-    #Draws the current state of the game, then calls for it to be updated by the agent
-    #Loops until game is over.
-    def drawGame(self, gameLoop):
+    #Draws the whole board once, and has the grid record which cells change from then on
+    def drawBoard(self):
+        self.gameCanvas.delete(tk.ALL)
+        self.items = {}
+        self.grid.trackChanges()
+        for cell in range(self.grid.numPoints):
+            self.drawCell(cell)
+
+    #Draws one point as a pixel, with color according to its type (the grid's, unless given).
+    #Empty points aren't drawn (the background is their color), a point that becomes empty has its rectangle hidden
+    #until it is needed again, so a frame costs the same however large the grid is.
+    def drawCell(self, cell, pointType=None):
         canvas = self.gameCanvas
-        #Clear previous board
-        canvas.delete(tk.ALL)
-        
-        #Draw each point as a pixel, with color according to its type
-        for x in range(self.grid.colNum):
-            for y in range(self.grid.rowNum):
-                x1 = x*self.pixelSize
-                x2 = x1+self.pixelSize
+        if(pointType == None):
+            pointType = self.grid.cells[cell]
+        item = self.items.get(cell)
+        if(pointType == EMPTY):
+            if(item != None):
+                canvas.itemconfigure(item, state=tk.HIDDEN)
+        elif(item == None):
+            y, x = divmod(cell, self.grid.colNum)
+            x1 = x*self.pixelSize
+            x2 = x1+self.pixelSize
 
-                y1 = y*self.pixelSize
-                y2 = y1+self.pixelSize
+            y1 = y*self.pixelSize
+            y2 = y1+self.pixelSize
+            self.items[cell] = canvas.create_rectangle(x1, y1, x2, y2, fill=self.pickColor(pointType))
+        else:
+            canvas.itemconfigure(item, fill=self.pickColor(pointType), state=tk.NORMAL)
 
-                pointType = self.grid.getPoint(x, y).GetType()
-                if(pointType != PointType.EMPTY): #Don't draw empty spaces, saves performance on large grids
-                    canvas.create_rectangle(x1, y1, x2, y2, fill=self.pickColor(pointType))
+    #Draws the cells that changed since the last frame, then calls for the game to be updated by the agent
+    #Loops until game is over.
+    def drawGame(self, gameLoop):
+        canvas = self.gameCanvas
+        for cell in self.grid.takeChanges():
+            self.drawCell(cell)
         
         #Loop while game is ongoing
         if(self.grid.gameRunning):
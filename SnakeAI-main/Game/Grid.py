@@ -1,4 +1,5 @@
 from Game.Point import Point,PointType
+from array import array
 import random
 import time
 from enum import Enum
@@ -75,16 +76,50 @@ class Direction(Enum):
                 raise RuntimeError
 
 
+#Direction lookups done once, so moving and looking don't go through the match statements every step
+CLOCKWISE = {direction: Direction.rotateCW(direction) for direction in Direction}
+COUNTERCLOCKWISE = {direction: Direction.rotateCCW(direction) for direction in Direction}
+
+#Point types as plain ints, the values stored in Grid.cells
+EMPTY = PointType.EMPTY.value
+FOOD = PointType.FOOD.value
+WALL = PointType.WALL.value
+HEAD = PointType.HEAD.value
+BODY = PointType.BODY.value
+
+
 class Grid:
     def __init__(self, cols, rows, agent):
         self.colNum = cols
         self.rowNum = rows
         self.numPoints = self.colNum * self.rowNum
-        self.points = [[Point(PointType.EMPTY, x, y) for x in range(0, cols)] for y in range(0, rows)] #Initialize all points as empty
+        self.cells = array('b', [EMPTY])*self.numPoints #Type of every point, indexed by y*cols+x. Initialize all points as empty
         self.snake = None
         self.food = None
         self.agent = agent
         self.gameRunning = False
+        self.rng = random #Food placement draws from the global random module, unless a game is reset with a seed
+
+        #Moving one point in a direction is adding its offset to the cell index
+        self.offsets = {}
+        for direction in Direction:
+            offset = Direction.getOffset(direction)
+            self.offsets[direction] = offset[0]*cols + offset[1]
+
+        #Index of empty cells. freeCells holds them in no particular order,
+        #freePos holds the position of each cell in freeCells, or -1 if it isn't empty.
+        #Kept up to date by setType, so food can be placed without scanning the board.
+        self.freeCells = array('i')
+        self.freePos = array('i', [-1])*self.numPoints
+
+        #Occupancy bitboards, bit x of rowMasks[y] and bit y of colMasks[x] are set when that point isn't empty.
+        #Also kept up to date by setType, so looking along a row or column is a couple of bit operations.
+        self.rowMasks = [0]*self.rowNum
+        self.colMasks = [0]*self.colNum
+
+        #Cells whose type changed since the last takeChanges, only recorded once trackChanges is called,
+        #so a display can redraw just those instead of the whole board
+        self.changed = None
     
 
     def Setup(self):
@@ -92,14 +127,34 @@ class Grid:
         for x in range(0, self.colNum):
             for y in range(0, self.rowNum):
                 if(x == 0 or x == self.colNum-1)or(y == 0 or y == self.rowNum-1):
-                    self.points[y][x].SetType(PointType.WALL) #Set border points as walls
+                    self.cells[y*self.colNum+x] = WALL #Set border points as walls
                 else:
-                    self.points[y][x].SetType(PointType.EMPTY) #Set other points as empty
+                    self.cells[y*self.colNum+x] = EMPTY #Set other points as empty
+
+        #Indexing empty points
+        self.freeCells = array('i')
+        self.freePos = array('i', [-1])*self.numPoints
+        self.rowMasks = [0]*self.rowNum
+        self.colMasks = [0]*self.colNum
+        for cell in range(0, self.numPoints):
+            if(self.cells[cell] == EMPTY):
+                self.addFree(cell)
+            else:
+                self.toggleOccupied(cell)
 
         #Placing snake in center of board, and then placing food
         headX = self.colNum//2
         headY = self.rowNum//2
         self.PlaceSnake(4, [headX, headY], Direction.UP)
+
+        #Remembering the starting board, so every reset starts from exactly the same state
+        self.startCells = array('b', self.cells)
+        self.startFreeCells = array('i', self.freeCells)
+        self.startFreePos = array('i', self.freePos)
+        self.startRowMasks = list(self.rowMasks)
+        self.startColMasks = list(self.colMasks)
+        self.startBody = list(self.snake.body)
+        self.startHeading = self.snake.heading
         self.placeRandomFood()
 
     #Starts the game loop, which lasts until the snake dies.
@@ -110,32 +165,38 @@ class Grid:
     
     #Returns the integer value of a point
     def getPointType(self, point):
-        return point.GetType().value
+        return self.cells[point.cell]
     
     #Returns a 1d array of all points on the grid, represented as their integer values
     #Could be used as NN input, currently unused as it needs a very large input layer.
     def flattenGrid(self):
-        flat = np.array(self.points)
-        flat = flat.flatten()
-        out = np.vectorize(self.getPointType)(flat)
-        return out
+        return np.frombuffer(self.cells, dtype=np.int8).astype(int)
 
     #Resets the board to be ready for antoher without needing the slow Setup()
-    def reset(self):
-        #Clears the snake and remaining food
-        if(self.snake != None):
-            while(self.snake.body):
-                point = self.snake.body.pop()
-                point.SetType(PointType.EMPTY)
-        if(self.food != None):
-            self.food.SetType(PointType.EMPTY)
-        self.snake = None
+    #With a seed, food is placed from a random.Random(seed), so the game is the same every time
+    #it is played with that seed and the same moves. Without one, the global random module is used.
+    def reset(self, seed=None):
+        self.rng = random if seed is None else random.Random(seed)
+
+        if(self.changed != None):
+            startCells = self.startCells
+            self.changed.update(cell for cell in range(self.numPoints) if self.cells[cell] != startCells[cell])
+
+        #Restoring the starting board saved by Setup. Copying the empty cell index too keeps its order
+        #independent of earlier games, which seeded food placement relies on.
+        self.cells[:] = self.startCells
+        self.freeCells = array('i', self.startFreeCells)
+        self.freePos[:] = self.startFreePos
+        self.rowMasks[:] = self.startRowMasks
+        self.colMasks[:] = self.startColMasks
         self.food = None
-        
+
         #Placeing new snake and food
-        headX = self.colNum//2
-        headY = self.rowNum//2
-        self.PlaceSnake(4, [headX, headY], Direction.UP)
+        from Game.Snake import Snake
+        self.snake = Snake(self, len(self.startBody), self.startHeading)
+        self.snake.body.extend(self.startBody)
+        self.snake.head = self.startBody[0]
+        self.snake.heading = self.startHeading
         self.placeRandomFood()
 
     #Called whenever a snake dies, currently just stops the gameLoop
@@ -154,28 +215,89 @@ class Grid:
         self.snake = Snake(self, size, heading)
         self.snake.BuildBody(position, heading)
 
+    #Returns the cell index of the given coordinates
+    def getCell(self, x, y):
+        return y*self.colNum + x
+
     #Returns the point at the given coordinates
     def getPoint(self, x, y):
-        return self.points[y][x]
+        return Point(self, y*self.colNum + x)
 
     #Returns the point adjacent to the given point, in the given direction
     def getAdjPoint(self, point, direction):
-        x, y = point.GetPosition()
-        offset = Direction.getOffset(direction)
-        return self.points[y+offset[0]][x+offset[1]]
-    
-    #Returns a list of empty points
-    #NOTE: Could be optimized, rather than building the list, start a list in Setup()
-    #Add and remove points from the empty list as the snake moves and food is eaten/placed
-    #Simply get that list when needed
+        return Point(self, point.cell + self.offsets[direction])
+
+    #Sets the type of a cell, keeping the index of empty cells up to date
+    def setType(self, cell, type):
+        wasEmpty = self.cells[cell] == EMPTY
+        self.cells[cell] = type
+        if(self.changed != None):
+            self.changed.add(cell)
+        if(wasEmpty != (type == EMPTY)):
+            if(wasEmpty):
+                self.removeFree(cell)
+            else:
+                self.addFree(cell)
+            self.toggleOccupied(cell)
+
+    #Starts recording the cells that change type
+    def trackChanges(self):
+        self.changed = set()
+
+    #Returns the cells whose type changed since the last call (or trackChanges), and starts over.
+    #A move changes at most the new head, the old head, the removed tail and the food.
+    def takeChanges(self):
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+    #Flips a cell between empty and occupied in the bitboards
+    def toggleOccupied(self, cell):
+        y, x = divmod(cell, self.colNum)
+        self.rowMasks[y] ^= 1 << x
+        self.colMasks[x] ^= 1 << y
+
+    #Finds the nearest non-empty point from a cell in a direction, using the bitboards.
+    #Returns its type and distance, the same as walking there point by point.
+    #The walls around the board mean there is always one to find.
+    def look(self, cell, direction):
+        cols = self.colNum
+        y, x = divmod(cell, cols)
+        match direction:
+            case Direction.RIGHT:
+                ahead = self.rowMasks[y] >> (x+1)
+                dist = (ahead & -ahead).bit_length() #Lowest set bit
+                hit = cell + dist
+            case Direction.LEFT:
+                behind = self.rowMasks[y] & ((1 << x)-1)
+                dist = x - behind.bit_length() + 1 #Highest set bit
+                hit = cell - dist
+            case Direction.UP:
+                ahead = self.colMasks[x] >> (y+1)
+                dist = (ahead & -ahead).bit_length()
+                hit = cell + dist*cols
+            case Direction.DOWN:
+                behind = self.colMasks[x] & ((1 << y)-1)
+                dist = y - behind.bit_length() + 1
+                hit = cell - dist*cols
+        return (self.cells[hit], dist)
+
+    def addFree(self, cell):
+        self.freePos[cell] = len(self.freeCells)
+        self.freeCells.append(cell)
+
+    #Swaps the last free cell into the removed cell's place, so removal is O(1)
+    def removeFree(self, cell):
+        pos = self.freePos[cell]
+        last = self.freeCells.pop()
+        if(last != cell):
+            self.freeCells[pos] = last
+            self.freePos[last] = pos
+        self.freePos[cell] = -1
+
+    #Returns a list of empty points, in no particular order
     def getEmptyPoints(self):
-        freePoints = []
-        for x in range(0, self.colNum):
-            for y in range(0, self.rowNum):
-                point = self.points[y][x]
-                if(point.GetType() == PointType.EMPTY):
-                    freePoints.append(point)
-        return freePoints
+        return [Point(self, cell) for cell in self.freeCells]
     
     #Returns an array of information about the game to be fed into AIAgent models
     #Currently includes: Position of head, current direction, distance and type of points forward, to the left, and right, the size of the snake, food position, manhattan distance from head to food 
@@ -183,16 +305,15 @@ class Grid:
         snake = self.snake
         food = self.food
         heading = snake.heading
-        headPos = snake.head.GetPosition()
-        
-        foodPos = food.GetPosition()
+        head = snake.head
+        cols = self.colNum
 
-        lookLeft = snake.Look(Direction.rotateCCW(heading))
+        lookLeft = snake.Look(COUNTERCLOCKWISE[heading])
         lookForward = snake.Look(heading)
-        lookRight = snake.Look(Direction.rotateCW(heading))
+        lookRight = snake.Look(CLOCKWISE[heading])
 
-        state = np.asarray([headPos[0],
-                            headPos[1],
+        state = np.asarray([head % cols,
+                            head // cols,
                             heading.value,
 
                             lookLeft[0],
@@ -203,32 +324,28 @@ class Grid:
                             lookRight[1],
 
                             snake.bodySize,
-                            foodPos[0],
-                            foodPos[1],
-                            self.GetDistance(snake.head, food)
+                            food % cols,
+                            food // cols,
+                            self.GetDistance(head, food)
                             ])
 
         return state
 
-    #Returns the manhattan distance between 2 points
-    def GetDistance(self, point1, point2):
-        x1 = point1.x
-        y1 = point1.y
-
-        x2 = point2.x
-        y2 = point2.y
+    #Returns the manhattan distance between 2 cells
+    def GetDistance(self, cell1, cell2):
+        y1, x1 = divmod(cell1, self.colNum)
+        y2, x2 = divmod(cell2, self.colNum)
 
         distance = abs(x1-x2) + abs(y1-y2)
         return distance
 
 
-    #Places food in a random empty space
+    #Places food in a random empty space, picked uniformly from the index of empty cells
     def placeRandomFood(self):
-        freePoints = self.getEmptyPoints()
-        if(freePoints):
-            point = random.choice(freePoints)
-            point.SetType(PointType.FOOD)
-            self.food = point
+        if(self.freeCells):
+            cell = self.freeCells[self.rng.randrange(len(self.freeCells))]
+            self.setType(cell, FOOD)
+            self.food = cell
         else:
             #A perfect game has somehow been played
             #TODO: What to do here?
@@ -237,11 +354,11 @@ class Grid:
     #Places food at a given coordinate, if it is empty
     #Returns true or false depending on if food was successfully placed or not
     def placeFoodAt(self, position):
-        point = self.points[position[0]][position[1]]
-        if(point.GetType() != PointType.EMPTY):
+        cell = position[0]*self.colNum + position[1]
+        if(self.cells[cell] != EMPTY):
             return False
-        point.SetType(PointType.FOOD)
-        self.food = point
+        self.setType(cell, FOOD)
+        self.food = cell
         return True
 
     
@@ -2,27 +2,43 @@ from enum import IntEnum
 class PointType(IntEnum):
     EMPTY = 1
     FOOD = 2
-    
+
     WALL =  -1
     HEAD = -2
     BODY = -3
 
+#A view of one cell of a Grid. The grid stores the type of every point in a flat buffer,
+#indexed by y*cols+x, a Point just remembers which cell it looks at.
 class Point:
-    def __init__(self, type, x, y):
-        self.type = type
-        self.x = x
-        self.y = y
+    __slots__ = ("grid", "cell")
+
+    def __init__(self, grid, cell):
+        self.grid = grid
+        self.cell = cell
+
+    def __eq__(self, other):
+        return isinstance(other, Point) and self.grid is other.grid and self.cell == other.cell
+
+    def __hash__(self):
+        return hash((id(self.grid), self.cell))
+
+    @property
+    def x(self):
+        return self.cell % self.grid.colNum
+
+    @property
+    def y(self):
+        return self.cell // self.grid.colNum
 
     def SetType(self, type):
-        self.type = type
-        
+        self.grid.setType(self.cell, type)
+
     def GetType(self):
-        return self.type
+        return PointType(self.grid.cells[self.cell])
 
 
     def UpdatePosition(self, x, y):
-        self.x = x
-        self.y = y
+        self.cell = y*self.grid.colNum + x
 
     def GetPosition(self):
-        return [self.x, self.y]
\ No newline at end of file
+        return [self.x, self.y]
@@ -0,0 +1,228 @@
+from Game.Grid import Grid
+from Game.VecGrid import VecGrid
+from collections import deque
+from array import array
+import numpy as np
+import struct
+import json
+import os
+
+#Episodes are recorded as the engine that played them, the board size, the food seed and the moves made.
+#Every game starts from the same board for its size, and food only depends on the seed and the moves,
+#so this is enough to play the game again exactly, without the model that played it.
+#Moves (0 left, 1 forward, 2 right) are packed 4 to a byte.
+
+#Engines, which place food differently from the same seed
+GRID = "grid" #Grid, played one game at a time (by the GUI and worker processes)
+VEC = "vec" #VecGrid, played in batches (by batched training and the spectator)
+ENGINES = [GRID, VEC]
+
+#Packs moves into 2 bits each, the first move in the lowest bits of the first byte
+def packActions(actions):
+    actions = np.asarray(actions, dtype=np.uint8)
+    padded = np.zeros(-(-len(actions)//4)*4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).astype(np.uint8).tobytes()
+
+def unpackActions(packed, count):
+    data = np.frombuffer(packed, dtype=np.uint8)
+    actions = (data[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    return actions.reshape(-1)[:count].astype(np.int64)
+
+class Episode:
+    def __init__(self, engine, cols, rows, seed, packed, steps, info=None):
+        self.engine = engine
+        self.cols = cols
+        self.rows = rows
+        self.seed = int(seed)
+        self.packed = packed
+        self.steps = steps
+        self.info = info or {} #Anything else worth keeping, like the model or fitness
+
+    @classmethod
+    def fromActions(self, engine, cols, rows, seed, actions, info=None):
+        return self(engine, cols, rows, seed, packActions(actions), len(actions), info)
+
+    def actions(self):
+        return unpackActions(self.packed, self.steps)
+
+    #Saves the episode to a small .npz file
+    def save(self, path):
+        header = {"engine": self.engine, "cols": self.cols, "rows": self.rows, "seed": self.seed, "steps": self.steps, "info": self.info}
+        with open(path, 'wb') as file:
+            np.savez(file, header=np.array(json.dumps(header)), actions=np.frombuffer(self.packed, dtype=np.uint8))
+
+    @classmethod
+    def load(self, path):
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            packed = data["actions"].tobytes()
+        return self(header["engine"], header["cols"], header["rows"], header["seed"], packed, header["steps"], header["info"])
+
+#Records the moves an agent chooses, by wrapping its ChooseMove. Returns the list they are added to.
+def recordMoves(agent):
+    moves = []
+    choose = agent.ChooseMove
+    def recorded(*args):
+        move = choose(*args)
+        moves.append(int(move))
+        return move
+    agent.ChooseMove = recorded
+    return moves
+
+#An agent that never chooses, Grid just needs one to exist
+class NoAgent:
+    pass
+
+#Plays an episode on a Grid, one move at a time, as the GUI and workers do
+class GridEngine:
+    def __init__(self, cols, rows, seed):
+        self.grid = Grid(cols, rows, NoAgent())
+        self.grid.Setup()
+        self.grid.reset(seed)
+
+    def step(self, action):
+        self.grid.snake.MakeMove(action)
+
+    def board(self):
+        return np.frombuffer(self.grid.cells, dtype=np.int8)
+
+    def snapshot(self):
+        grid = self.grid
+        snake = grid.snake
+        return (grid.cells.tobytes(), grid.freeCells.tobytes(), grid.freePos.tobytes(), list(grid.rowMasks), list(grid.colMasks),
+                list(snake.body), snake.heading, snake.head, grid.food, grid.rng.getstate())
+
+    def restore(self, state):
+        grid = self.grid
+        snake = grid.snake
+        cells, freeCells, freePos, rowMasks, colMasks, body, heading, head, food, rngState = state
+        grid.cells[:] = array('b', cells)
+        grid.freeCells = array('i', freeCells)
+        grid.freePos[:] = array('i', freePos)
+        grid.rowMasks[:] = rowMasks
+        grid.colMasks[:] = colMasks
+        snake.body = deque(body)
+        snake.heading = heading
+        snake.head = head
+        grid.food = food
+        grid.rng.setstate(rngState)
+
+#Plays an episode on a single game VecGrid, as batched training and the spectator do
+class VecEngine:
+    STATE = ["flat", "bodies", "headPtr", "bodyLen", "heading", "head", "food", "foodCount", "energy", "running"]
+
+    def __init__(self, cols, rows, seed):
+        self.games = VecGrid(1, cols, rows, autoReset=False)
+        self.games.reset(seeds=[seed])
+        self.action = np.zeros(1, dtype=np.int64)
+
+    def step(self, action):
+        self.action[0] = action
+        self.games.step(self.action)
+
+    def board(self):
+        return self.games.flat[0]
+
+    def snapshot(self):
+        return [getattr(self.games, name)[0].copy() for name in self.STATE]
+
+    def restore(self, state):
+        for name, value in zip(self.STATE, state):
+            getattr(self.games, name)[0] = value
+
+ENGINE_CLASSES = {GRID: GridEngine, VEC: VecEngine}
+
+#Rebuilds any frame of an episode without a model. The episode is played through once when loaded,
+#keeping a snapshot of the game every keyframeEvery steps, so seeking to a step only plays from the keyframe before it.
+#Frame i is the board after i moves, frame 0 is the starting board.
+class Replay:
+    def __init__(self, episode, keyframeEvery=256):
+        self.episode = episode
+        self.colNum = episode.cols
+        self.rowNum = episode.rows
+        self.numPoints = episode.cols*episode.rows
+        self.steps = episode.steps
+        self.moves = episode.actions()
+        self.keyframeEvery = keyframeEvery
+
+        self.engine = ENGINE_CLASSES[episode.engine](episode.cols, episode.rows, episode.seed)
+        self.keyframes = []
+        for step in range(self.steps+1):
+            if(step % keyframeEvery == 0):
+                self.keyframes.append(self.engine.snapshot())
+            if(step < self.steps):
+                self.engine.step(self.moves[step])
+        self.position = self.steps #Step the engine is at
+
+    #Returns the board after the given number of moves, as a flat int8 array indexed by y*cols+x.
+    #Stepping forward from the current frame is one move per frame, anything else restores a keyframe first.
+    def board(self, step):
+        step = max(0, min(step, self.steps))
+        if(step < self.position or step - self.position > self.keyframeEvery):
+            self.engine.restore(self.keyframes[step // self.keyframeEvery])
+            self.position = step // self.keyframeEvery * self.keyframeEvery
+        while(self.position < step):
+            self.engine.step(self.moves[self.position])
+            self.position += 1
+        return self.engine.board()
+
+#Writes the board as an RGB image, scale pixels per cell, colored with the palette (PointType -> '#rrggbb')
+def saveFrame(path, board, cols, rows, palette, scale=8):
+    import matplotlib.image
+    colors = np.zeros((256, 3), dtype=np.uint8)
+    for pointType, color in palette.items():
+        colors[int(pointType) & 0xFF] = [int(color[i:i+2], 16) for i in (1, 3, 5)]
+    image = colors[np.asarray(board, dtype=np.int8).reshape(rows, cols).view(np.uint8)]
+    image = np.repeat(np.repeat(image, scale, axis=0), scale, axis=1)
+    matplotlib.image.imsave(path, image)
+
+#An append only file of episodes, one record after another, used to keep the best episode of every generation of a run.
+#Each record is a fixed header followed by the packed moves. A crash can at most leave a partial last record, which is ignored.
+RECORD = struct.Struct("<qdqqBHH")
+
+class EpisodeArchive:
+    #A resumed run keeps the records up to its checkpoint's generation, otherwise the archive is started over
+    def __init__(self, path, resume=False, generation=0):
+        self.path = path
+        folder = os.path.dirname(path)
+        if(folder and not os.path.exists(folder)):
+            os.makedirs(folder)
+        keep = 0
+        if(resume and os.path.exists(path)):
+            for offset, record in scanArchive(path):
+                if(record[0] > generation):
+                    break
+                keep = offset
+        self.file = open(path, 'ab')
+        self.file.truncate(keep)
+
+    #Adds an episode, with the generation it was played in and its fitness
+    def append(self, generation, fitness, episode):
+        self.file.write(RECORD.pack(generation, fitness, episode.seed, episode.steps, ENGINES.index(episode.engine), episode.cols, episode.rows))
+        self.file.write(episode.packed)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+#Yields the end offset of every whole record in an archive, and its (generation, fitness, seed, steps, engine, cols, rows, packed moves)
+def scanArchive(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    offset = 0
+    while(offset + RECORD.size <= len(data)):
+        generation, fitness, seed, steps, engine, cols, rows = RECORD.unpack_from(data, offset)
+        end = offset + RECORD.size + -(-steps//4)
+        if(end > len(data)):
+            break
+        yield end, (generation, fitness, seed, steps, ENGINES[engine], cols, rows, data[offset+RECORD.size:end])
+        offset = end
+
+#Returns every episode in an archive, in the order they were added, with their generation and fitness in info
+def readArchive(path):
+    episodes = []
+    for offset, (generation, fitness, seed, steps, engine, cols, rows, packed) in scanArchive(path):
+        episodes.append(Episode(engine, cols, rows, seed, packed, steps, {"generation": generation, "fitness": fitness}))
+    return episodes
@@ -1,5 +1,4 @@
-from Game.Point import Point, PointType
-from Game.Grid import Grid, Direction
+from Game.Grid import Direction, CLOCKWISE, COUNTERCLOCKWISE, EMPTY, FOOD, HEAD, BODY
 from collections import deque
 class Snake:
     
@@ -7,21 +6,16 @@ class Snake:
         self.heading = heading
         self.bodySize = startSize
         self.grid = grid
-        self.body = deque()
+        self.body = deque() #Cell indices of the body, head first
         self.heading = None
-        self.head = None
+        self.head = None #Cell index of the head
     
-    #Checks each point in a line from the snake head in a given direction.
-    #When a non-empty point is encountered, the distance to that point and'
-    #the type of point are returned as (Type, Dist). Type is an int corresponding
-    #to the PointType enum.
+    #Looks in a line from the snake head in a given direction. For the first
+    #non-empty point, the distance to that point and the type of point are
+    #returned as (Type, Dist). Type is an int corresponding to the PointType enum.
+    #The grid answers this from its occupancy bitboards, without walking the points.
     def Look(self, direction):
-        lookedAt = self.grid.getAdjPoint(self.head, direction)
-        dist = 1
-        while(lookedAt.GetType() == PointType.EMPTY):
-            lookedAt = self.grid.getAdjPoint(lookedAt, direction)
-            dist += 1
-        return (lookedAt.GetType().value, dist)
+        return self.grid.look(self.head, direction)
 
     #Builds the snake on the grid, with the head placed at the specified position
     #and facing in the direction. The rest of the body will be placed opposite the 
@@ -30,8 +24,8 @@ class Snake:
     def BuildBody(self, position, heading):
         
         #Placing the head
-        curSegment = self.grid.getPoint(*position) 
-        curSegment.SetType(PointType.HEAD)
+        curSegment = self.grid.getCell(*position)
+        self.grid.setType(curSegment, HEAD)
         self.body.append(curSegment)
         self.head = curSegment
         self.heading = heading
@@ -39,14 +33,14 @@ class Snake:
         #Adding remainder of body off of head
         buildDir = Direction.reverse(heading)
         while(len(self.body) < self.bodySize):
-            nextSegment = self.grid.getAdjPoint(curSegment, buildDir)
+            nextSegment = curSegment + self.grid.offsets[buildDir]
             
             #Turn if obstacle in way of body
-            if(nextSegment.GetType() != PointType.EMPTY):
+            if(self.grid.cells[nextSegment] != EMPTY):
                 buildDir = Direction.rotateCW(buildDir)
             else:
                 curSegment = nextSegment
-                curSegment.SetType(PointType.BODY)
+                self.grid.setType(curSegment, BODY)
                 self.body.append(curSegment)
             
     
@@ -56,20 +50,22 @@ class Snake:
     #a 1, -1, and 0, respectively.
     def MoveForward(self):
         #Get head and spot snake is about to move into
+        grid = self.grid
         head = self.body[0]
-        newPos = self.grid.getAdjPoint(head, self.heading)
+        newPos = head + grid.offsets[self.heading]
+        newType = grid.cells[newPos]
 
         #Snake has eaten food, same as normal movement, just doesn't delete tail
-        if newPos.GetType() == PointType.FOOD:
-            head.SetType(PointType.BODY)
-            newPos.SetType(PointType.HEAD)
+        if newType == FOOD:
+            grid.setType(head, BODY)
+            grid.setType(newPos, HEAD)
             self.body.appendleft(newPos)
             self.grid.placeRandomFood()
             self.head = newPos
             return 1
 
         #Snake has hit itself or a wall
-        elif newPos.GetType()!=PointType.EMPTY:
+        elif newType != EMPTY:
             self.grid.GameOver()
             return -1
         
@@ -77,11 +73,11 @@ class Snake:
         else:
             #Remove end of tail
             tail = self.body.pop()
-            tail.SetType(PointType.EMPTY)
+            grid.setType(tail, EMPTY)
 
             #Move head into space
-            head.SetType(PointType.BODY)
-            newPos.SetType(PointType.HEAD)
+            grid.setType(head, BODY)
+            grid.setType(newPos, HEAD)
             self.body.appendleft(newPos)
             self.head = newPos
             return 0
@@ -90,10 +86,10 @@ class Snake:
 
     #Turns the head of the snake, and moves in that direction
     def TurnRight(self):
-        self.heading = Direction.rotateCW(self.heading)
+        self.heading = CLOCKWISE[self.heading]
         return self.MoveForward()
     def TurnLeft(self):
-        self.heading = Direction.rotateCCW(self.heading)
+        self.heading = COUNTERCLOCKWISE[self.heading]
         return self.MoveForward()
 
     #Takes input from agent, and makes the corresponding movement
@@ -0,0 +1,183 @@
+import tkinter as tk
+import threading
+import queue
+import math
+import numpy as np
+from Game.Point import PointType
+from Game.VecGrid import EMPTY, WALL
+
+GAP = 4 #Pixels between tiles
+LABEL_HEIGHT = 14 #Pixels above each tile for its label
+
+#Shows many games at once, each on its own tile of one canvas.
+#The games are a VecGrid stepped in batch by a background thread, which hands the window a frame per step holding just the
+#cells that changed. The window takes a frame every updateRate ms and updates only those cells, the same way GUI does,
+#so the Tk thread never simulates and a frame costs the same whatever the size of the boards.
+class Spectator:
+    #chooseMoves takes the states of the running games and their indices, and returns their moves.
+    #labels names each game's tile. With restart, finished games start again straight away (needs a VecGrid with autoReset).
+    def __init__(self, config, games, chooseMoves, labels, columns=None, restart=False):
+        self.conf = config
+        self.games = games
+        self.chooseMoves = chooseMoves
+        self.labels = labels
+        self.restart = restart
+        self.columns = columns or math.ceil(math.sqrt(games.numGames))
+        self.frames = queue.Queue(maxsize=2) #Keeps the simulation at most a couple of steps ahead of the window
+        self.stopped = threading.Event()
+        self.items = {} #Canvas rectangle of each board cell that has been drawn, by index into all boards
+        self.texts = [] #Label item of each game, and the text it shows
+        self.episodes = np.zeros(games.numGames, dtype=np.int64) #Finished games, and their total food, in each tile
+        self.foodTotal = np.zeros(games.numGames, dtype=np.int64)
+        self.shown = (games.foodEaten.copy(), games.running.copy(), self.episodes.copy()) #Stats as of the frame on screen
+
+    #Opens the window and plays the games until they are all over, or until the window is closed with restart
+    def start(self):
+        games = self.games
+        self.r = tk.Tk()
+        r = self.r
+        r.title("Snake - " + str(games.numGames) + " games")
+        r.configure(bg='#262626')
+        r.resizable(False, False)
+        r.protocol("WM_DELETE_WINDOW", self.close)
+
+        #Sizing the tiles to fit the canvas
+        canvasSize = self.conf["canvasSize"]
+        tileRows = math.ceil(games.numGames/self.columns)
+        self.pixelSize = max(1, min((canvasSize - GAP*(self.columns+1)) // (self.columns*games.colNum),
+                                    (canvasSize - (GAP+LABEL_HEIGHT)*tileRows - GAP) // (tileRows*games.rowNum)))
+        self.tileWidth = games.colNum*self.pixelSize
+        self.tileHeight = games.rowNum*self.pixelSize
+        width = self.columns*(self.tileWidth+GAP) + GAP
+        height = tileRows*(self.tileHeight+LABEL_HEIGHT+GAP) + GAP
+        self.gameCanvas = tk.Canvas(master=r, width=width, height=height, bg='#262626', highlightthickness=0)
+        self.gameCanvas.pack(anchor=tk.CENTER)
+
+        self.drawTiles()
+        self.thread = threading.Thread(target=self.simulate, daemon=True)
+        self.thread.start()
+        r.after(self.conf["updateRate"], self.drawFrame)
+        r.mainloop()
+
+    def close(self):
+        self.stopped.set()
+        self.printResults()
+        self.r.destroy()
+
+    #Gets the corresponding color of a point
+    def pickColor(self, type):
+        return self.conf["colorPalette"][type]
+
+    #Top left corner of a game's board on the canvas
+    def tileOrigin(self, game):
+        row, column = divmod(game, self.columns)
+        return GAP + column*(self.tileWidth+GAP), GAP + row*(self.tileHeight+LABEL_HEIGHT+GAP) + LABEL_HEIGHT
+
+    #Draws every tile's walls, label and starting board. Walls never change, so each tile's are just two rectangles.
+    def drawTiles(self):
+        canvas = self.gameCanvas
+        games = self.games
+        pixel = self.pixelSize
+        for game in range(games.numGames):
+            x0, y0 = self.tileOrigin(game)
+            canvas.create_rectangle(x0, y0, x0+self.tileWidth, y0+self.tileHeight, fill=self.pickColor(PointType.WALL), width=0)
+            canvas.create_rectangle(x0+pixel, y0+pixel, x0+self.tileWidth-pixel, y0+self.tileHeight-pixel, fill=self.pickColor(PointType.EMPTY), width=0)
+            text = self.labelText(game)
+            item = canvas.create_text(x0, y0-LABEL_HEIGHT//2, text=text, anchor=tk.W, fill="#d0d0d0", font=("TkDefaultFont", 8))
+            self.texts.append([item, text])
+        flat = games.flat.reshape(-1)
+        for index in np.flatnonzero((flat != EMPTY) & (flat != WALL)).tolist():
+            self.drawCell(index, flat[index])
+
+    #Draws one cell of one board, reusing its rectangle as GUI.drawCell does
+    def drawCell(self, index, pointType):
+        canvas = self.gameCanvas
+        item = self.items.get(index)
+        if(pointType == EMPTY):
+            if(item != None):
+                canvas.itemconfigure(item, state=tk.HIDDEN)
+        elif(item == None):
+            game, cell = divmod(index, self.games.numPoints)
+            y, x = divmod(cell, self.games.colNum)
+            x0, y0 = self.tileOrigin(game)
+            x1 = x0 + x*self.pixelSize
+            y1 = y0 + y*self.pixelSize
+            #Outlines would cover small pixels entirely
+            outline = {} if self.pixelSize >= 6 else {"width": 0}
+            self.items[index] = canvas.create_rectangle(x1, y1, x1+self.pixelSize, y1+self.pixelSize, fill=self.pickColor(pointType), **outline)
+        else:
+            canvas.itemconfigure(item, fill=self.pickColor(pointType), state=tk.NORMAL)
+
+    def labelText(self, game):
+        foodEaten, running, episodes = self.shown
+        text = self.labels[game] + "  food " + str(foodEaten[game])
+        if(self.restart):
+            return text + "  games " + str(episodes[game])
+        if(not running[game]):
+            return text + "  over"
+        return text
+
+    #Runs in the background thread. Steps every running game, and queues the cells that changed as a frame,
+    #along with the stats the labels show. Queues None once every game is over.
+    def simulate(self):
+        games = self.games
+        actions = np.zeros(games.numGames, dtype=np.int64)
+        shown = games.flat.reshape(-1).copy() #The boards as of the last frame
+        while(not self.stopped.is_set()):
+            live = np.flatnonzero(games.running)
+            if(live.size == 0):
+                self.queueFrame(None)
+                return
+            actions[live] = self.chooseMoves(games.getStates(live), live)
+            results, done = games.step(actions)
+            self.episodes[done] += 1
+            self.foodTotal[done] += games.lastFoodEaten[done]
+
+            flat = games.flat.reshape(-1)
+            changed = np.flatnonzero(flat != shown)
+            shown[changed] = flat[changed]
+            self.queueFrame((changed, shown[changed], (games.foodEaten.copy(), games.running.copy(), self.episodes.copy())))
+
+    def queueFrame(self, frame):
+        while(not self.stopped.is_set()):
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    #Draws the next frame, if the simulation has one ready, then waits for the next one.
+    def drawFrame(self):
+        try:
+            frame = self.frames.get_nowait()
+        except queue.Empty:
+            self.r.after(self.conf["updateRate"], self.drawFrame)
+            return
+        if(frame == None):
+            print("Games over!")
+            self.printResults()
+            self.r.after(1000, self.r.destroy)
+            return
+        changed, types, self.shown = frame
+        for index, pointType in zip(changed.tolist(), types.tolist()):
+            self.drawCell(index, pointType)
+        self.updateLabels()
+        self.r.after(self.conf["updateRate"], self.drawFrame)
+
+    #Changes the labels whose text is out of date
+    def updateLabels(self):
+        for game, label in enumerate(self.texts):
+            text = self.labelText(game)
+            if(text != label[1]):
+                self.gameCanvas.itemconfigure(label[0], text=text)
+                label[1] = text
+
+    #Prints the average food eaten by each label's finished games
+    def printResults(self):
+        totals = {}
+        for game, label in enumerate(self.labels):
+            episodes, food = totals.get(label, (0, 0))
+            totals[label] = (episodes + self.episodes[game], food + self.foodTotal[game])
+        for label, (episodes, food) in totals.items():
+            if(episodes > 0):
+                print(label + ": " + str(round(food/episodes, 2)) + " food eaten on average over " + str(episodes) + " games")
@@ -0,0 +1,274 @@
+from Game.Point import PointType
+from Game.Grid import Direction
+import numpy as np
+
+#Headings are stored as indices into these tables, in clockwise order.
+#Index i corresponds to the Direction with value i+1 (UP, RIGHT, DOWN, LEFT).
+#Offsets are (dy, dx), matching Direction.getOffset
+HEADINGS = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
+DY = np.array([1, 0, -1, 0], dtype=np.int64)
+DX = np.array([0, 1, 0, -1], dtype=np.int64)
+
+EMPTY = np.int8(PointType.EMPTY)
+FOOD = np.int8(PointType.FOOD)
+WALL = np.int8(PointType.WALL)
+HEAD = np.int8(PointType.HEAD)
+BODY = np.int8(PointType.BODY)
+
+#Mixes 64 bit integers into well spread 64 bit values (the splitmix64 finalizer).
+#Used to draw food positions from a game's seed and how many foods it has placed, so the draws
+#of one game don't depend on which other games are in the batch or how far along they are.
+def mix64(x):
+    x = np.asarray(x, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+#A uniform float in [0, 1) for each (seed, counter) pair
+def seededUniform(seeds, counters):
+    bits = mix64(mix64(seeds) + np.asarray(counters, dtype=np.uint64))
+    return (bits >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+#Runs N games of snake in lockstep. Each game follows the same rules as a Grid played by an AIAgent,
+#but every board is a slice of one int8 array of shape (N, rows, cols), and every move, collision,
+#food placement and score update is done as an array operation over all games at once.
+class VecGrid:
+    def __init__(self, numGames, cols, rows, energyMax=300, startSize=4, autoReset=True, seed=None):
+        self.numGames = numGames
+        self.colNum = cols
+        self.rowNum = rows
+        self.numPoints = cols * rows
+        self.energyMax = energyMax
+        self.startSize = startSize
+        self.autoReset = autoReset
+        self.rng = np.random.default_rng(seed)
+        self.games = np.arange(numGames)
+
+        #Boards, and a flat (N, rows*cols) view of them indexed by y*cols+x
+        self.boards = np.empty((numGames, rows, cols), dtype=np.int8)
+        self.flat = self.boards.reshape(numGames, self.numPoints)
+
+        #Snake bodies are ring buffers of cell indices. The head is at bodies[n, headPtr[n]]
+        #and the tail is bodyLen[n]-1 slots after it.
+        self.capacity = self.numPoints
+        self.bodies = np.zeros((numGames, self.capacity), dtype=np.int32)
+        self.headPtr = np.zeros(numGames, dtype=np.int64)
+        self.bodyLen = np.zeros(numGames, dtype=np.int64)
+        self.heading = np.zeros(numGames, dtype=np.int64)
+        self.head = np.zeros(numGames, dtype=np.int64)
+        self.food = np.zeros(numGames, dtype=np.int64)
+        self.running = np.zeros(numGames, dtype=bool)
+
+        #Each episode has a seed, and food is drawn from it and the number of foods placed so far
+        self.seeds = np.zeros(numGames, dtype=np.uint64)
+        self.foodCount = np.zeros(numGames, dtype=np.uint64)
+
+        #Per game stats, same as AIAgent
+        self.steps = np.zeros(numGames, dtype=np.int64)
+        self.movement = np.zeros(numGames, dtype=np.float64)
+        self.foodEaten = np.zeros(numGames, dtype=np.int64)
+        self.died = np.zeros(numGames, dtype=bool)
+        self.energy = np.zeros(numGames, dtype=np.int64)
+
+        #Stats of the most recently finished episode of each game, filled in before auto reset
+        self.lastSteps = np.zeros(numGames, dtype=np.int64)
+        self.lastMovement = np.zeros(numGames, dtype=np.float64)
+        self.lastFoodEaten = np.zeros(numGames, dtype=np.int64)
+        self.lastDied = np.zeros(numGames, dtype=bool)
+
+        self.buildTemplate()
+        self.reset()
+
+    #Builds the starting board (walls and snake, no food) once, following Grid.Setup and Snake.BuildBody.
+    #Every reset copies from it instead of rebuilding.
+    def buildTemplate(self):
+        cols = self.colNum
+        rows = self.rowNum
+        board = np.full((rows, cols), EMPTY, dtype=np.int8)
+        board[0, :] = WALL
+        board[rows-1, :] = WALL
+        board[:, 0] = WALL
+        board[:, cols-1] = WALL
+        flat = board.reshape(-1)
+
+        #Head in the center facing up, body built opposite to the heading, turning clockwise at obstacles
+        x = cols//2
+        y = rows//2
+        flat[y*cols+x] = HEAD
+        body = [y*cols+x]
+        buildDir = HEADINGS.index(Direction.reverse(Direction.UP))
+        while(len(body) < self.startSize):
+            nx = x + DX[buildDir]
+            ny = y + DY[buildDir]
+            if(flat[ny*cols+nx] != EMPTY):
+                buildDir = (buildDir+1) % 4
+            else:
+                x = nx
+                y = ny
+                flat[y*cols+x] = BODY
+                body.append(y*cols+x)
+
+        self.templateFlat = flat.copy()
+        self.templateBody = np.array(body, dtype=np.int32)
+        self.templateHeading = HEADINGS.index(Direction.UP)
+
+    #Resets the given games (a boolean mask or index array), or all games if none are given.
+    #seeds gives each reset game's episode seed, a game played again with the same seed and moves is the same game.
+    #Without them, seeds are drawn from rng.
+    def reset(self, games=None, seeds=None):
+        if(games is None):
+            games = self.games
+        games = np.asarray(games)
+        if(games.dtype == bool):
+            games = np.flatnonzero(games)
+        if(games.size == 0):
+            return
+        if(seeds is None):
+            seeds = self.rng.integers(0, 2**63, size=games.size, dtype=np.uint64)
+        self.seeds[games] = np.asarray(seeds).astype(np.uint64)
+        self.foodCount[games] = 0
+
+        size = len(self.templateBody)
+        self.flat[games] = self.templateFlat
+        self.bodies[games, :size] = self.templateBody
+        self.headPtr[games] = 0
+        self.bodyLen[games] = size
+        self.heading[games] = self.templateHeading
+        self.head[games] = self.templateBody[0]
+        self.running[games] = True
+
+        self.steps[games] = 0
+        self.movement[games] = 0.0
+        self.foodEaten[games] = 0
+        self.died[games] = False
+        self.energy[games] = self.energyMax
+
+        self.placeRandomFood(games)
+
+    #Places food on a uniformly chosen empty cell of each given board.
+    #If a board has no empty cells left, its food is left on the head, as Grid does after a perfect game.
+    def placeRandomFood(self, games):
+        empty = self.flat[games] == EMPTY
+        counts = empty.sum(axis=1)
+        picks = np.floor(seededUniform(self.seeds[games], self.foodCount[games]) * counts).astype(np.int64)
+        self.foodCount[games] += np.uint64(1)
+        cells = np.argmax(np.cumsum(empty, axis=1) > picks[:, None], axis=1)
+        cells = np.where(counts > 0, cells, self.head[games])
+        self.food[games] = cells
+        hasRoom = counts > 0
+        self.flat[games[hasRoom], cells[hasRoom]] = FOOD
+
+    #Returns the manhattan distance between the head and the food of the given games
+    def foodDistance(self, games):
+        cols = self.colNum
+        head = self.head[games]
+        food = self.food[games]
+        return np.abs(head % cols - food % cols) + np.abs(head // cols - food // cols)
+
+    #Casts a ray from the head of each given game in the given heading indices.
+    #Returns the type and distance of the first non-empty cell hit, like Snake.Look
+    def look(self, games, directions):
+        cols = self.colNum
+        reach = np.arange(1, max(self.colNum, self.rowNum), dtype=np.int64)
+        head = self.head[games]
+        x = (head % cols)[:, None] + DX[directions][:, None]*reach
+        y = (head // cols)[:, None] + DY[directions][:, None]*reach
+        np.clip(x, 0, cols-1, out=x)
+        np.clip(y, 0, self.rowNum-1, out=y)
+        seen = self.flat[games[:, None], y*cols+x]
+        first = np.argmax(seen != EMPTY, axis=1)
+        return seen[np.arange(len(games)), first], first+1
+
+    #Returns the Grid.getState observation of every game (or the given games) as an (N, 13) array
+    def getStates(self, games=None):
+        if(games is None):
+            games = self.games
+        games = np.asarray(games)
+        cols = self.colNum
+        heading = self.heading[games]
+        head = self.head[games]
+        food = self.food[games]
+
+        states = np.empty((len(games), 13), dtype=np.int64)
+        states[:, 0] = head % cols
+        states[:, 1] = head // cols
+        states[:, 2] = heading+1
+        states[:, 3], states[:, 4] = self.look(games, (heading+3) % 4)
+        states[:, 5], states[:, 6] = self.look(games, heading)
+        states[:, 7], states[:, 8] = self.look(games, (heading+1) % 4)
+        #Snake.bodySize is the starting size and is never updated as the snake grows, keep it that way here
+        states[:, 9] = self.startSize
+        states[:, 10] = food % cols
+        states[:, 11] = food // cols
+        states[:, 12] = self.foodDistance(games)
+        return states
+
+    #Makes one move in every running game. Actions are the same as Snake.MakeMove, 0 left, 1 forward, 2 right.
+    #Scores each move as AIAgent.MakeMove does, and ends games that crash or run out of energy.
+    #Returns the result of each move (1 ate, 0 moved, -1 crashed, as Snake.MoveForward) and which games finished.
+    #Finished games have their stats copied into the last* arrays, and are reset if autoReset is on.
+    def step(self, actions):
+        actions = np.asarray(actions)
+        results = np.zeros(self.numGames, dtype=np.int64)
+        done = np.zeros(self.numGames, dtype=bool)
+        games = np.flatnonzero(self.running)
+        if(games.size == 0):
+            return results, done
+        actions = actions[games]
+        cols = self.colNum
+        flat = self.flat
+
+        distToFood = self.foodDistance(games)
+
+        #Turn, then look at the cell being moved into
+        heading = (self.heading[games] + actions - 1) % 4
+        self.heading[games] = heading
+        head = self.head[games]
+        newPos = head + DY[heading]*cols + DX[heading]
+        target = flat[games, newPos]
+        ate = target == FOOD
+        moved = target == EMPTY
+        crashed = ~(ate | moved)
+
+        #Remove the tail of snakes moving into empty space
+        mover = games[moved]
+        tailSlot = (self.headPtr[mover] + self.bodyLen[mover] - 1) % self.capacity
+        flat[mover, self.bodies[mover, tailSlot]] = EMPTY
+        self.bodyLen[mover] -= 1
+
+        #Advance the head of every snake that didn't crash
+        alive = games[~crashed]
+        flat[alive, head[~crashed]] = BODY
+        flat[alive, newPos[~crashed]] = HEAD
+        self.headPtr[alive] = (self.headPtr[alive] - 1) % self.capacity
+        self.bodies[alive, self.headPtr[alive]] = newPos[~crashed]
+        self.bodyLen[alive] += 1
+        self.head[alive] = newPos[~crashed]
+
+        if(ate.any()):
+            self.placeRandomFood(games[ate])
+
+        #Scoring, same as AIAgent.MakeMove
+        change = distToFood - self.foodDistance(games)
+        self.energy[games] -= 1
+        self.foodEaten[games[ate]] += 1
+        self.energy[games[ate]] = self.energyMax
+        self.movement[games] += np.where(ate, 0.0, np.where(change > 0, 1.0, -1.5))
+        self.steps[games] += 1
+
+        starved = self.energy[games] <= 0
+        self.movement[games[starved]] -= 50
+        finished = crashed | starved
+        self.died[games[finished]] = True
+
+        results[games] = np.where(ate, 1, np.where(crashed, -1, 0))
+        ended = games[finished]
+        done[ended] = True
+        self.running[ended] = False
+        self.lastSteps[ended] = self.steps[ended]
+        self.lastMovement[ended] = self.movement[ended]
+        self.lastFoodEaten[ended] = self.foodEaten[ended]
+        self.lastDied[ended] = self.died[ended]
+        if(self.autoReset):
+            self.reset(ended)
+        return results, done
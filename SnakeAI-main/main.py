@@ -1,16 +1,26 @@
-from Game.Grid import Grid
-from Game.GUI import GUI
+import time
+launchTime = time.perf_counter()
+
 from Game.Point import PointType
-from Agent.Agents import *
-from Agent.Training import Population
-import tensorflow
-import matplotlib.pyplot as plt
 import argparse
 
-
-
-
-tensorflow.compat.v1.logging.set_verbosity(tensorflow.compat.v1.logging.ERROR)
+#Each command imports what it needs when it runs, so plot, compare, list and -h
+#start without loading the GA, the game or the GUI they don't use.
+
+#Seconds each command may take from launch until its imports are done and it starts working,
+#checked with --startup-time. Interpreter startup before main.py runs isn't included.
+STARTUP_BUDGETS = {
+    "create": 0.5,
+    "train": 1.0,
+    "run": 0.5,
+    "watch": 0.5,
+    "replay": 0.5,
+    "plot": 1.0,
+    "compare": 1.0,
+    "list": 0.5,
+    "import": 0.5,
+    "bench": 0.5,
+}
 
 conf = {
     "gridHeight": 30,
@@ -25,9 +35,18 @@ conf = {
         PointType.BODY: '#18328f'},
 }
 
+#Called by each command once its imports are done. With --startup-time, prints how long that took against the command's budget.
+def started(args):
+    if(args.startup_time):
+        elapsed = time.perf_counter() - launchTime
+        budget = STARTUP_BUDGETS[args.subcommand]
+        status = "within" if elapsed <= budget else "OVER"
+        print("Startup: " + str(round(elapsed*1000)) + " ms, " + status + " the " + str(round(budget*1000)) + " ms budget for " + args.subcommand)
+
 
 #Sets up a grid instance, with a specified agent player
 def setupGrid(agent):
+    from Game.Grid import Grid
     cols = conf["gridHeight"]
     rows = conf["gridWidth"]
     grid = Grid(cols, rows, agent)
@@ -35,8 +54,12 @@ def setupGrid(agent):
     return grid
 
 #Creates an runs a game with the given agent, displays game on screen
-def runGameGUI(agent):
+#With a seed, food is placed from it, so the game can be played again
+def runGameGUI(agent, seed=None):
+    from Game.GUI import GUI
     grid = setupGrid(agent)
+    if(seed != None):
+        grid.reset(seed)
     gui = GUI(conf, grid)
     gui.startGameLoop()
 
@@ -46,44 +69,195 @@ def runGameNoGUI(agent):
     grid.startLoopNoGUI(throttle=0)
 
 
-#Loads a model by name, and runs a game on screen using that model
+#Loads a model by name, and runs a game on screen using that model.
+#With --record, the game is saved as an episode that main.py replay can play back without the model.
 def RunAI(args):
+    from Game.Grid import Grid
+    from Game.GUI import GUI
+    from Game.Replay import Episode, recordMoves, GRID
+    from Agent.Agents import AIAgent
+    from Agent.NumpyModel import loadModel
+    import random
+    started(args)
     modelName = args.name
-    model = tensorflow.keras.models.load_model("Agent\\Models\\"+modelName)
+    model = loadModel(modelName) #No need for TensorFlow just to play
     #print(model.layers)
-    agent = AIAgent(model)
-    runGameGUI(agent)
+    agent = AIAgent(model, args.decision_cache)
+    seed = args.seed
+    if(seed == None and args.record):
+        seed = random.randrange(2**63)
+    moves = recordMoves(agent) if args.record else None
+    runGameGUI(agent, seed)
+    if(agent.decisions != None):
+        print("Decision cache: " + str(agent.decisions.hits) + " of " + str(agent.decisions.hits+agent.decisions.misses) + " moves answered without the model")
+    if(args.record):
+        Episode.fromActions(GRID, conf["gridHeight"], conf["gridWidth"], seed, moves, {"model": modelName}).save(args.record)
+        print("Game saved to " + args.record)
+
+#Plays back a recorded episode in the GUI, or saves its frames as images. Episodes are read from a file saved by
+#run --record, or from the archive a train --record run keeps of the best episode of each generation.
+def replayEpisode(args):
+    from Game.Replay import Episode, Replay, readArchive, saveFrame
+    import os
+    started(args)
+    if(args.file):
+        episode = Episode.load(args.file)
+    elif(args.name):
+        path = "statbackup/" + args.name + "/episodes.bin"
+        episodes = readArchive(path) if os.path.exists(path) else []
+        if(args.generation != None):
+            episodes = [episode for episode in episodes if episode.info["generation"] == args.generation]
+        if(not episodes):
+            replayParse.error("No recorded episode found in " + path)
+        episode = episodes[-1]
+        print("Generation", episode.info["generation"], "Fitness:", episode.info["fitness"])
+    else:
+        replayParse.error("either -f or -n is required")
+
+    replay = Replay(episode)
+    print(str(replay.steps) + " moves")
+    if(args.export):
+        if(not os.path.exists(args.export)):
+            os.makedirs(args.export)
+        frames = range(args.start, replay.steps+1, args.every)
+        for step in frames:
+            saveFrame(os.path.join(args.export, "frame_%06d.png" % step), replay.board(step), replay.colNum, replay.rowNum, conf["colorPalette"], args.scale)
+        print(str(len(frames)) + " frames saved to " + args.export)
+        return
+    from Game.GUI import GUI
+    config = dict(conf, updateRate=args.rate or conf["updateRate"])
+    GUI(config, replay).startReplay(replay, args.speed, args.start)
+
+#Plays several games at once with each of the given models, shown tiled in one window.
+#Game i of every model gets seed SEED+i, so models are compared on the same food and one model is seen on several seeds.
+def watchGames(args):
+    from Game.VecGrid import VecGrid
+    from Game.Spectator import Spectator
+    from Agent.BatchedModel import BatchedModel
+    from Agent.NumpyModel import loadModel
+    import numpy as np
+    started(args)
+    perModel = args.games or max(1, 16//len(args.names))
+    seed = args.seed
+    if(seed == None):
+        seed = int(np.random.default_rng().integers(0, 2**31))
+        print("Seed:", seed)
+
+    #Each model plays its games with its own BatchedModel, holding a copy of its weights for each game
+    models = []
+    for name in args.names:
+        model = loadModel(name)
+        batch = BatchedModel(model.layers)
+        batch.setPopulation(np.repeat(model.getWeightsVector()[None, :], perModel, axis=0))
+        models.append(batch)
+
+    def chooseMoves(states, live):
+        moves = np.empty(len(live), dtype=np.int64)
+        owner = live // perModel
+        for index in np.unique(owner):
+            mine = owner == index
+            moves[mine] = models[index].chooseMoves(states[mine], live[mine] % perModel)
+        return moves
+
+    numGames = perModel*len(args.names)
+    games = VecGrid(numGames, conf["gridHeight"], conf["gridWidth"], autoReset=args.restart, seed=seed)
+    games.reset(seeds=seed + np.arange(numGames) % perModel)
+    labels = [name for name in args.names for i in range(perModel)]
+    Spectator(conf, games, chooseMoves, labels, args.columns, args.restart).start()
 
 #Creates a new model of a given name, with the given architecture
 #Trains the model according to the given parameters, saves it under given name
 def createModel(args):
-    pop = Population(conf)
-    pop.buildModel(args.layers, args.name)
+    from Agent.NumpyModel import NumpyModel, MODEL_DIR
+    started(args)
+    NumpyModel.create(args.layers).save(MODEL_DIR+args.name+".npz")
     print(args.name+" successfully created.")
 
 #Trains an existing model by creating a 1 parent population based on it,
 #and running the GA according to the given parameters. New resulting model
 #will overwrite previous model.
+#Stops with an error, before anything starts, if a checkpoint a resumed run needs isn't there
+def requireCheckpoints(paths):
+    import os
+    missing = [path for path in paths if not os.path.exists(path)]
+    if(missing):
+        trainParse.error("--resume needs a checkpoint, there is none at " + ", ".join(missing))
+
 def trainModel(args):
+    from Agent.Training import Population
+    from Agent.TrainOptions import TrainOptions
+    from Agent.Islands import runIslands, islandAddresses, islandAuthkey
+    started(args)
+    statPath = "statbackup/" + args.name
+    if(not args.resume and None in (args.generations, args.population, args.parents)):
+        trainParse.error("-g, -pop and -par are required unless resuming")
+    if(args.record and args.mode == "steady-state"):
+        trainParse.error("--record only works in generational mode")
+    if(args.episodes > 1 and args.mode == "steady-state"):
+        trainParse.error("--episodes only works in generational mode")
+    if(args.race != None and not 0 < args.race < 1):
+        trainParse.error("--race takes a confidence between 0 and 1")
+    options = TrainOptions(args.population, args.generations, args.parents, mode=args.mode, replacement=args.replacement,
+                           interval=args.interval, selection=args.selection, seed=args.seed, reseed=args.reseed,
+                           episodes=args.episodes, race=args.race, workers=args.workers, decisionCache=args.decision_cache,
+                           resume=args.resume, checkpointEvery=args.checkpoint_every, profile=args.profile,
+                           profileGenerations=args.profile_generations, record=args.record)
+    if(args.islands > 1 or args.island_hosts):
+        addresses = islandAddresses(args.islands, args.island_hosts, args.island_port)
+        try:
+            islandAuthkey(addresses, args.island_key)
+        except ValueError as error:
+            trainParse.error(str(error))
+        if(args.resume):
+            indices = args.island_index if args.island_index != None else range(len(addresses))
+            requireCheckpoints([statPath + "/island_" + str(index) + "/checkpoint.npz" for index in indices])
+        runIslands(conf, args.name, options, addresses, args.topology, args.migration_interval, args.migrants, args.island_index, args.island_key)
+        return
+    if(args.resume):
+        requireCheckpoints([statPath + "/checkpoint.npz"])
     pop = Population(conf, modelName=args.name)
-    pop.run(args.population, args.generations, args.parents, args.name)
+    pop.run(args.name, options)
+
+#Draws one series of a run's summary on a plot, at the level of detail that fits the plot's width in pixels.
+#Where points are buckets of several generations, the line is their mean and the shaded area their min to max.
+def drawSeries(ax, path, header, name, args, label=None):
+    from Agent.StatsSummary import summaryWindow
+    start = args.start if args.start != None else 0
+    stop = args.stop if args.stop != None else header["rows"]
+    x, low, high, mean = summaryWindow(path, header, name, start, stop, int(ax.get_window_extent().width))
+    line, = ax.plot(x, mean, label=label)
+    if((low != high).any()):
+        ax.fill_between(x, low, high, color=line.get_color(), alpha=0.2, linewidth=0)
+
+#Draws the 10th to 90th percentile range of a run's population, when its log has every member's fitness
+def drawSpread(ax, path, header, args):
+    from Agent.StatsSummary import summaryWindow
+    if("low" not in header["series"]):
+        return
+    start = args.start if args.start != None else 0
+    stop = args.stop if args.stop != None else header["rows"]
+    width = int(ax.get_window_extent().width)
+    x, low, _, _ = summaryWindow(path, header, "low", start, stop, width)
+    x, _, high, _ = summaryWindow(path, header, "high", start, stop, width)
+    ax.fill_between(x, low, high, alpha=0.3, linewidth=0, label="10th to 90th percentile")
+    ax.legend()
 
 #Displays a plot of the average and peak fitness of the most recent GA run.
+#When the run's log has every generation's fitnesses, the middle 80% of the population is shaded in too.
 def plotStats(args):
-    model = args.name
-    with open(("statbackup/" + model + "/avg.csv"), 'r') as file:
-        avg = [round(float(line.strip()), 3) for line in file.readlines()]
-        
-    with open(("statbackup/" + model + "/peak.csv"), 'r') as file:
-        peak = [round(float(line.strip()), 3) for line in file.readlines()]
+    import matplotlib.pyplot as plt
+    from Agent.StatsSummary import modelSummary
+    started(args)
+    path, header = modelSummary("statbackup/" + args.name)
     fig, axs = plt.subplots(1,2, figsize=(10,5))
 
-    axs[0].plot(avg)
+    drawSeries(axs[0], path, header, "avg", args)
+    drawSpread(axs[0], path, header, args)
     axs[0].set_title("Average Fitness")
     axs[0].set_xlabel("Generations")
     axs[0].set_ylabel("Fitness")
     
-    axs[1].plot(peak)
+    drawSeries(axs[1], path, header, "peak", args)
     axs[1].set_title("Peak Fitness")
     axs[1].set_xlabel("Generations")
     axs[1].set_ylabel("Fitness")
@@ -92,17 +266,10 @@ def plotStats(args):
 
 #Plots fitness of multiple models on one graph
 def compareStats(args):
+    import matplotlib.pyplot as plt
+    from Agent.StatsSummary import modelSummary
+    started(args)
     models = args.names
-    avgs = []
-    peaks = []
-    for model in models:
-        with open(("statbackup/" + model + "/avg.csv"), 'r') as file:
-            avg = [round(float(line.strip()), 3) for line in file.readlines()]
-            avgs.append(avg)
-        
-        with open(("statbackup/" + model + "/peak.csv"), 'r') as file:
-            peak = [round(float(line.strip()), 3) for line in file.readlines()]
-            peaks.append(peak)
 
     fig, axs = plt.subplots(1,2, figsize=(10,5))
 
@@ -114,17 +281,55 @@ def compareStats(args):
     axs[1].set_xlabel("Generations")
     axs[1].set_ylabel("Fitness")
 
-    for i in range(0, len(models)):
-        axs[0].plot(avgs[i], label=models[i])
-        axs[1].plot(peaks[i], label=models[i])
+    for model in models:
+        path, header = modelSummary("statbackup/" + model)
+        drawSeries(axs[0], path, header, "avg", args, label=model)
+        drawSeries(axs[1], path, header, "peak", args, label=model)
 
     plt.legend()
     plt.show()
 
+#Turns the avg.csv and peak.csv of older runs into logs, which plot and compare read from then on
+def importStats(args):
+    from Agent.TrainingLog import importCsv
+    started(args)
+    for model in args.names:
+        rows = importCsv("statbackup/" + model)
+        print(model + ": imported " + str(rows) + " generations.")
+
+#Runs the benchmark suite, optionally saving the results as JSON and comparing them to a saved baseline.
+#Exits with status 1 if any result is slower than the baseline by more than the tolerance.
+def runBench(args):
+    from Agent.Bench import runBenchmarks, saveResults, compareResults, GRID_SIZES, MODELS
+    started(args)
+    settings = {"grids": args.grids or GRID_SIZES, "models": args.models or MODELS, "population": args.population,
+                "generations": args.generations, "workers": args.workers, "training": not args.no_training}
+    results = runBenchmarks(settings["grids"], settings["models"], args.population, args.generations, args.workers, settings["training"])
+    if(args.out):
+        saveResults(args.out, results, settings)
+        print("Results saved to " + args.out)
+    if(args.compare):
+        regressions = compareResults(results, args.compare, args.tolerance)
+        if(regressions):
+            print(str(len(regressions)) + " regression(s) found.")
+            raise SystemExit(1)
+
+#Prints every model in Agent/Models with its layer sizes, without loading any weights
+def listSavedModels(args):
+    from Agent.NumpyModel import listModels, modelPath, modelLayers
+    started(args)
+    for name in listModels():
+        layers = modelLayers(name)
+        sizes = [layers[0][0]] + [outSize for _, outSize, _ in layers]
+        kind = "npz" if modelPath(name).endswith(".npz") else "SavedModel"
+        print(name.ljust(24), kind.ljust(12), " -> ".join(str(size) for size in sizes))
+
 
 #Argument parser setup ------------------------------------------------------------------------------------------------------------------------------------------------------
 parser = argparse.ArgumentParser(description="Create, train, or view statistics on neural networks trained with a genetic algorithm on the game Snake.")
 
+parser.add_argument("--startup-time", action="store_true", help="Print how long the command took to start, against its budget.")
+
 subparsers = parser.add_subparsers(title="Commands", dest="subcommand")
 
 createParse = subparsers.add_parser("create", help="Create a new model.", description="Create a new model.")
@@ -134,33 +339,109 @@ createParse.add_argument("-l", "--layers", nargs="+", type=int, required=True, h
 
 trainParse = subparsers.add_parser("train", help="Train an existing model.", description="Train an existing model.")
 trainParse.add_argument("-n", "--name", type=str, required=True, help="Name of model to train.")
-trainParse.add_argument("-g", "--generations", type=int, required=True, help="Number of generations to run.")
-trainParse.add_argument("-pop", "--population", type=int, required=True, help="Number of models in population.")
-trainParse.add_argument("-par", "--parents", type=int, required=True, help="Number of parents to be selected.")
+trainParse.add_argument("-g", "--generations", type=int, default=None, help="Number of generations to run. When resuming, the total to run up to, defaults to the original run's.")
+trainParse.add_argument("-pop", "--population", type=int, default=None, help="Number of models in population.")
+trainParse.add_argument("-par", "--parents", type=int, default=None, help="Number of parents to be selected.")
+trainParse.add_argument("-w", "--workers", type=int, default=0, help="Number of worker processes to play games on. 0 plays all games batched in one process.")
+trainParse.add_argument("-m", "--mode", choices=["generational", "steady-state"], default="generational", help="Evolve in generations, or insert each child as soon as its game ends.")
+trainParse.add_argument("-s", "--selection", choices=["rws", "tournament"], default="rws", help="How parents are picked, by roulette wheel or as the fittest of 3 random members.")
+trainParse.add_argument("-r", "--replacement", choices=["worst", "tournament"], default="worst", help="Steady state only. Member a fitter child replaces, the worst, or the worst of a random 3.")
+trainParse.add_argument("-i", "--interval", type=int, default=None, help="Steady state only. Number of games between stats, defaults to the population size.")
+trainParse.add_argument("--seed", type=int, default=None, help="Seed for food placement, every game of a generation gets the same food. Random food if not given.")
+trainParse.add_argument("--reseed", type=int, default=0, help="Generations between changes of the food seed. 0 keeps one seed for the whole run.")
+trainParse.add_argument("-k", "--episodes", type=int, default=1, help="Games each genome is scored on, the mean of them is its fitness. Every genome of a generation gets the same seeds. Generational mode only.")
+trainParse.add_argument("--race", type=float, nargs="?", const=0.95, default=None, metavar="CONFIDENCE", help="Stop playing a child's episodes once it can't make it into the elites, at this confidence (0.95 if not given).")
+trainParse.add_argument("--decision-cache", type=int, default=0, help="Number of states whose chosen move each worker's agent remembers within a game. 0 disables it.")
+trainParse.add_argument("--resume", action="store_true", help="Carry on the model's last run from its checkpoint, with the settings it was started with.")
+trainParse.add_argument("--checkpoint-every", type=int, default=50, help="Generations between checkpoints of the whole GA state. 0 disables checkpoints.")
+trainParse.add_argument("--profile", action="store_true", help="Time each phase of every generation, printed with its stats and logged to statbackup/<name>/profile.")
+trainParse.add_argument("--profile-generation", nargs="+", type=int, default=None, dest="profile_generations", metavar="GENERATION", help="Generations to run under cProfile, saved to statbackup/<name>/profile.")
+trainParse.add_argument("--record", action="store_true", help="Keep the best episode of every generation in statbackup/<name>/episodes.bin, for main.py replay. Generational mode only.")
+trainParse.add_argument("--islands", type=int, default=1, help="Number of island populations, each evolving in its own process with the given population size.")
+trainParse.add_argument("--migration-interval", type=int, default=10, help="Generations between island migrations.")
+trainParse.add_argument("--migrants", type=int, default=2, help="Number of best genomes each island sends per migration.")
+trainParse.add_argument("--topology", choices=["ring", "full"], default="ring", help="Islands send migrants to the next island, or to all others.")
+trainParse.add_argument("--island-port", type=int, default=6000, help="First port used by islands on this machine.")
+trainParse.add_argument("--island-hosts", nargs="+", type=str, default=None, help="host:port of every island, for islands spread over several machines.")
+trainParse.add_argument("--island-key", type=str, default=None, help="Shared key islands authenticate each other with, needed when any island is on another machine. Can also be given as SNAKEAI_ISLAND_KEY.")
+trainParse.add_argument("--island-index", nargs="+", type=int, default=None, help="Indices of the islands in --island-hosts to run on this machine. Defaults to all.")
 
 runParse = subparsers.add_parser("run", help="Run a game with a model.", description="Run a game with a model.")
 runParse.add_argument("-n", "--name", type=str, required=True, help="Name of model to run game.")
+runParse.add_argument("--seed", type=int, default=None, help="Seed for food placement, so the game can be played again.")
+runParse.add_argument("--record", type=str, default=None, metavar="FILE", help="Save the game as an episode to FILE (.npz), to watch with main.py replay.")
+runParse.add_argument("--decision-cache", type=int, default=0, help="Number of states whose chosen move the agent remembers, so states seen again don't run the model. 0 disables it.")
+
+replayParse = subparsers.add_parser("replay", help="Play back a recorded game.", description="Play back a recorded game, or save its frames as images.")
+replayParse.add_argument("-f", "--file", type=str, default=None, help="Episode file saved by run --record.")
+replayParse.add_argument("-n", "--name", type=str, default=None, help="Model whose training run was recorded with train --record.")
+replayParse.add_argument("-g", "--generation", type=int, default=None, help="With -n, the generation whose best episode to play. Defaults to the last one recorded.")
+replayParse.add_argument("--speed", type=int, default=1, help="Moves per frame.")
+replayParse.add_argument("--rate", type=int, default=None, help="Milliseconds per frame. Defaults to the normal game speed.")
+replayParse.add_argument("--start", type=int, default=0, help="Move to start from.")
+replayParse.add_argument("--export", type=str, default=None, metavar="FOLDER", help="Save frames as PNG images to FOLDER instead of showing them.")
+replayParse.add_argument("--every", type=int, default=1, help="With --export, save every this many moves.")
+replayParse.add_argument("--scale", type=int, default=8, help="With --export, pixels per cell.")
+
+watchParse = subparsers.add_parser("watch", help="Watch many games at once, tiled in one window.", description="Watch several games of one or more models at once, tiled in one window.")
+watchParse.add_argument("-N", "--names", nargs="+", type=str, required=True, help="Names of models to watch.")
+watchParse.add_argument("-k", "--games", type=int, default=None, help="Games per model, each on its own seed. Defaults to 16 split between the models.")
+watchParse.add_argument("--seed", type=int, default=None, help="Seed of each model's first game, the next games use the following seeds. Random if not given.")
+watchParse.add_argument("--columns", type=int, default=None, help="Number of tiles per row. Defaults to a square layout.")
+watchParse.add_argument("--restart", action="store_true", help="Start finished games again straight away, until the window is closed.")
 
 plotParse = subparsers.add_parser("plot", help="Plot the fitness of a model.", description="Plot the fitness of a model.")
 plotParse.add_argument("-n", "--name", type=str, required=True, help="Name of model to plot.")
+plotParse.add_argument("--from", dest="start", type=int, default=None, help="First generation to plot.")
+plotParse.add_argument("--to", dest="stop", type=int, default=None, help="Generation to stop plotting at.")
 
 compareParse = subparsers.add_parser("compare", help="Plot the fitness of multiple models on a graph.", description="Plot the fitness of multiple models on a graph.")
 compareParse.add_argument("-N", "--names", nargs="+", type=str, required=True, help="Names of models to plot.")
+compareParse.add_argument("--from", dest="start", type=int, default=None, help="First generation to plot.")
+compareParse.add_argument("--to", dest="stop", type=int, default=None, help="Generation to stop plotting at.")
+
+importParse = subparsers.add_parser("import", help="Import the CSV stats of older runs into logs.", description="Import the avg.csv and peak.csv stats of older runs into logs.")
+importParse.add_argument("-N", "--names", nargs="+", type=str, required=True, help="Names of models to import.")
+
+benchParse = subparsers.add_parser("bench", help="Benchmark the game and training.", description="Benchmark the game and training hot paths.")
+benchParse.add_argument("--grids", nargs="+", type=int, default=None, help="Grid sizes to benchmark, defaults to 10 30 100 200.")
+benchParse.add_argument("--models", nargs="+", type=str, default=None, help="Models to benchmark, defaults to ExtraSmall Small MediumSize Large ExtraLarge.")
+benchParse.add_argument("-pop", "--population", type=int, default=20, help="Population size of the training benchmarks.")
+benchParse.add_argument("-g", "--generations", type=int, default=2, help="Generations each training benchmark runs.")
+benchParse.add_argument("-w", "--workers", type=int, default=0, help="Worker processes for the training benchmarks.")
+benchParse.add_argument("--no-training", action="store_true", help="Only run the game and model benchmarks.")
+benchParse.add_argument("-o", "--out", type=str, default=None, help="JSON file to save the results to.")
+benchParse.add_argument("-c", "--compare", type=str, default=None, help="JSON results of an earlier run to compare against.")
+benchParse.add_argument("--tolerance", type=float, default=0.1, help="How much slower than the baseline a result may be before it counts as a regression.")
+
+listParse = subparsers.add_parser("list", help="List the saved models.", description="List the saved models and their layer sizes.")
 #----------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
 
-args = parser.parse_args()
-match args.subcommand:
-        case "create":
-            createModel(args)
-        case "train":
-            trainModel(args)
-        case "plot":
-            plotStats(args)
-        case "compare":
-            compareStats(args)
-        case "run":
-            RunAI(args)
-        case _:
-            print("Invalid command.")
\ No newline at end of file
+#Guarded so worker processes, which import this file again when they start, don't run a command
+if __name__ == "__main__":
+    args = parser.parse_args()
+    match args.subcommand:
+            case "create":
+                createModel(args)
+            case "train":
+                trainModel(args)
+            case "plot":
+                plotStats(args)
+            case "compare":
+                compareStats(args)
+            case "run":
+                RunAI(args)
+            case "watch":
+                watchGames(args)
+            case "replay":
+                replayEpisode(args)
+            case "list":
+                listSavedModels(args)
+            case "import":
+                importStats(args)
+            case "bench":
+                runBench(args)
+            case _:
+                print("Invalid command.")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+#Tests import Agent and Game from the repository root, the same as main.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(ROOT not in sys.path):
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,85 @@
+from Agent.BatchedModel import BatchedModel, GATHER_ROWS
+from Agent.NumpyModel import NumpyModel
+import numpy as np
+import pytest
+
+LAYERS = [(13, 16, "relu"), (16, 8, "relu"), (8, 3, "softmax")]
+
+#Genome weights about the size Keras initializes them to, so the outputs aren't all saturated
+def randomGenomes(rng, count):
+    numParams = BatchedModel(LAYERS).numParams
+    return rng.normal(0, 0.5, size=(count, numParams)).astype(np.float32)
+
+#The outputs and moves NumpyModel gives for each genome's own input rows, one genome at a time.
+#inputs has a row (or a (K, 13) block of rows) per entry of rows.
+def expected(genomes, inputs, rows):
+    model = NumpyModel(LAYERS)
+    outputs = np.empty(inputs.shape[:-1] + (3,), dtype=np.float32)
+    for row in np.unique(rows):
+        model.setWeightsVector(genomes[row])
+        outputs[rows == row] = model(inputs[rows == row])
+    return outputs
+
+#Where NumpyModel's two best moves are close enough for float32 rounding to swap them, either move is right
+def assertSameMoves(moves, outputs):
+    ordered = np.sort(outputs, axis=-1)
+    clear = ordered[..., -1] - ordered[..., -2] > 1e-5
+    np.testing.assert_array_equal(moves[clear], np.argmax(outputs, axis=-1)[clear])
+
+@pytest.mark.parametrize("numGenomes", [1, 7, 64])
+def testEveryGenomeMatches(numGenomes):
+    rng = np.random.default_rng(numGenomes)
+    genomes = randomGenomes(rng, numGenomes)
+    inputs = rng.random((numGenomes, 13), dtype=np.float32)
+    batched = BatchedModel(LAYERS)
+    batched.setPopulation(genomes)
+    outputs = expected(genomes, inputs, np.arange(numGenomes))
+    np.testing.assert_allclose(batched.forward(inputs), outputs, rtol=1e-5, atol=1e-6)
+    assertSameMoves(batched.chooseMoves(inputs), outputs)
+
+#Several inputs per genome, as when every episode of a genome is stepped together
+def testEpisodesPerGenome():
+    rng = np.random.default_rng(3)
+    genomes = randomGenomes(rng, 5)
+    inputs = rng.random((5, 4, 13), dtype=np.float32)
+    batched = BatchedModel(LAYERS)
+    batched.setPopulation(genomes)
+    outputs = expected(genomes, inputs, np.arange(5))
+    np.testing.assert_allclose(batched.forward(inputs), outputs, rtol=1e-5, atol=1e-6)
+    assertSameMoves(batched.chooseMoves(inputs), outputs)
+
+#More rows than are gathered at once, in any order and with genomes repeated, go through in GATHER_ROWS sized chunks
+@pytest.mark.parametrize("numRows", [GATHER_ROWS, GATHER_ROWS+1, 3*GATHER_ROWS+17])
+def testGatheredRows(numRows):
+    rng = np.random.default_rng(numRows)
+    genomes = randomGenomes(rng, 300)
+    rows = rng.integers(0, 300, size=numRows)
+    inputs = rng.random((numRows, 13), dtype=np.float32)
+    batched = BatchedModel(LAYERS)
+    batched.setPopulation(genomes)
+    outputs = expected(genomes, inputs, rows)
+    np.testing.assert_allclose(batched.forward(inputs, rows), outputs, rtol=1e-5, atol=1e-6)
+    moves = batched.chooseMoves(inputs, rows)
+    assert moves.shape == (numRows,)
+    assertSameMoves(moves, outputs)
+
+#A population set as a whole, then partly replaced genome by genome (as steady state does), runs each row's latest genome
+#and doesn't write into the array it was set from
+def testSetGenomeAfterSetPopulation():
+    rng = np.random.default_rng(4)
+    genomes = randomGenomes(rng, 20)
+    original = genomes.copy()
+    batched = BatchedModel(LAYERS)
+    batched.setPopulation(genomes)
+    current = genomes.copy()
+    for row in rng.choice(20, size=8, replace=False):
+        current[row] = randomGenomes(rng, 1)[0]
+        batched.setGenome(row, current[row])
+    np.testing.assert_array_equal(genomes, original)
+
+    rows = np.concatenate([np.arange(20), rng.integers(0, 20, size=2*GATHER_ROWS)])
+    inputs = rng.random((len(rows), 13), dtype=np.float32)
+    outputs = expected(current, inputs, rows)
+    np.testing.assert_allclose(batched.forward(inputs, rows), outputs, rtol=1e-5, atol=1e-6)
+    assertSameMoves(batched.chooseMoves(inputs, rows), outputs)
+    assertSameMoves(batched.chooseMoves(inputs[:20]), outputs[:20])
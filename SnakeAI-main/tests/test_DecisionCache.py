@@ -0,0 +1,93 @@
+from Agent.DecisionCache import DecisionCache, hitRate
+from Agent.Agents import AIAgent
+from Agent.NumpyModel import NumpyModel
+import numpy as np
+
+#A NumpyModel that counts how many batches it has been run on
+class CountingModel(NumpyModel):
+    def __init__(self, layers):
+        super().__init__(layers)
+        self.calls = 0
+
+    def __call__(self, inputs):
+        self.calls += 1
+        return super().__call__(inputs)
+
+#A model always picking move, without a version counter
+class FixedModel:
+    def __init__(self, move):
+        self.move = move
+        self.calls = 0
+
+    def __call__(self, inputs):
+        self.calls += 1
+        return np.eye(3)[[self.move]]
+
+def testEvictsLeastRecentlyUsed():
+    cache = DecisionCache(3)
+    for key in [b"a", b"b", b"c"]:
+        cache.put(key, 0)
+    assert cache.get(b"a") == 0 #a is now the most recently used, b the least
+    cache.put(b"d", 2)
+    assert len(cache) == 3
+    assert cache.get(b"b") == None
+    assert [cache.get(key) for key in [b"a", b"c", b"d"]] == [0, 0, 2]
+    cache.put(b"e", 1)
+    assert cache.get(b"a") == None and cache.get(b"e") == 1
+
+def testCounts():
+    cache = DecisionCache(10)
+    assert cache.get(b"a") == None
+    cache.put(b"a", 1)
+    cache.put(b"b", 0) #A move of 0 is still a hit
+    assert [cache.get(b"a"), cache.get(b"b"), cache.get(b"c")] == [1, 0, None]
+    assert cache.takeCounts() == (2, 2)
+    assert cache.takeCounts() == (0, 0)
+    assert hitRate(2, 2) == 0.5 and hitRate(0, 0) == 0.0
+    cache.clear()
+    assert len(cache) == 0 and cache.get(b"a") == None
+
+def testAgentAnswersRepeatedStates():
+    model = CountingModel([(13, 3, "softmax")])
+    model.setWeightsVector(np.random.default_rng(0).normal(size=model.numParams))
+    agent = AIAgent(model, decisionCache=8)
+    states = np.random.default_rng(1).random((4, 13))
+    moves = [agent.ChooseMove(state) for state in states]
+    assert [agent.ChooseMove(state) for state in states] == moves
+    assert model.calls == 4
+    assert agent.decisions.takeCounts() == (4, 4)
+    assert moves == [int(np.argmax(model(state[None]))) for state in states]
+
+#New weights bump the model's version, and the moves chosen with the old ones are dropped
+def testClearedWhenWeightsChange():
+    model = CountingModel([(13, 3, "softmax")])
+    agent = AIAgent(model, decisionCache=8)
+    state = np.ones(13)
+    weights = np.zeros(model.numParams, dtype=np.float32)
+    bias = slice(13*3, 13*3+3) #The output layer's bias is last
+    for move in [0, 2, 1]:
+        weights[bias] = np.eye(3)[move]
+        model.setWeightsVector(weights)
+        assert agent.ChooseMove(state) == move
+        assert agent.ChooseMove(state) == move
+    assert model.calls == 3
+
+#Models without a version keep their cache until the agent is reset
+def testClearedOnReset():
+    model = FixedModel(2)
+    agent = AIAgent(model, decisionCache=8)
+    state = np.zeros(13)
+    assert agent.ChooseMove(state) == 2
+    model.move = 0
+    assert agent.ChooseMove(state) == 2
+    agent.reset()
+    assert agent.ChooseMove(state) == 0
+    assert model.calls == 2
+
+def testDisabled():
+    model = FixedModel(1)
+    agent = AIAgent(model)
+    state = np.zeros(13)
+    agent.ChooseMove(state)
+    agent.ChooseMove(state)
+    assert agent.decisions == None and model.calls == 2
@@ -0,0 +1,126 @@
+from Agent.Evolution import raceSurvivors, GeneticAlgorithm, rouletteSelect, tournamentSelect, singlePointCrossover, randomMutation
+import numpy as np
+import pytest
+
+#Whatever the spread, a genome whose mean so far reaches the threshold is never dropped
+@pytest.mark.parametrize("confidence", [0.5, 0.9, 0.95, 0.999])
+@pytest.mark.parametrize("episodes", [2, 3, 10])
+def testKeepsGenomesAtOrAboveThreshold(confidence, episodes):
+    rng = np.random.default_rng(episodes)
+    scores = rng.normal(rng.normal(300, 50, size=(500, 1)), rng.uniform(0, 80, size=(500, 1)), size=(500, episodes))
+    threshold = 300.0
+    survivors = raceSurvivors(scores, threshold, confidence)
+    assert survivors[scores.mean(axis=1) >= threshold].all()
+
+#Genomes with a true mean well above the threshold survive their first noisy episodes
+def testKeepsClearlyBetterGenomes():
+    rng = np.random.default_rng(1)
+    for trial in range(200):
+        scores = rng.normal(400, 60, size=(20, 3))
+        assert raceSurvivors(scores, 250.0, 0.95).all()
+
+#A genome whose first games happened to score the same still gets the typical spread, so it isn't dropped for being just below
+def testSpreadFloor():
+    scores = np.array([[240.0, 240.0],
+                       [200.0, 300.0],
+                       [150.0, 350.0]])
+    survivors = raceSurvivors(scores, 250.0, 0.95)
+    assert survivors[0]
+
+def testDropsClearlyWorseGenomes():
+    scores = np.array([[100.0, 102.0, 98.0],
+                       [400.0, 405.0, 395.0]])
+    assert list(raceSurvivors(scores, 300.0, 0.95)) == [False, True]
+
+#Elites carry their fitness over, so after the first generation only the children are ever scored
+def testOnlyChildrenScored():
+    scored = []
+    def fitnessFunc(genomes):
+        scored.append(len(genomes))
+        return genomes.sum(axis=1)
+    population = np.random.default_rng(0).random((10, 4), dtype=np.float32)
+    GA = GeneticAlgorithm(population, fitnessFunc, lambda GA: None, 4, 5, rng=np.random.default_rng(1))
+    GA.run(3)
+    assert scored == [10, 5, 5, 5]
+    np.testing.assert_allclose(GA.fitness, GA.population.sum(axis=1), rtol=1e-6)
+
+#How often each member is picked out of many draws
+def pickRates(select, fitness, draws=200000):
+    picks = select(np.array(fitness, dtype=np.float64), draws, np.random.default_rng(0))
+    assert picks.min() >= 0 and picks.max() < len(fitness)
+    return np.bincount(picks, minlength=len(fitness)) / draws
+
+def testRouletteProportional():
+    rates = pickRates(rouletteSelect, [1.0, 2.0, 3.0, 4.0])
+    np.testing.assert_allclose(rates, [0.1, 0.2, 0.3, 0.4], atol=0.005)
+
+#Fitness of zero or below is shifted so the worst member gets (almost) no chance, and the rest keep their differences
+@pytest.mark.parametrize("fitness", [[-40.0, -10.0, -30.0, -20.0], [-20.0, 0.0, -10.0, 10.0]])
+def testRouletteShiftsNonPositive(fitness):
+    rates = pickRates(rouletteSelect, fitness)
+    shifted = np.array(fitness) - min(fitness)
+    np.testing.assert_allclose(rates, shifted/shifted.sum(), atol=0.005)
+    assert rates[np.argmin(fitness)] == 0
+
+@pytest.mark.parametrize("value", [-250.0, 0.0, 7.5])
+def testRouletteAllEqual(value):
+    rates = pickRates(rouletteSelect, [value]*5)
+    np.testing.assert_allclose(rates, 0.2, atol=0.005)
+
+#Each pick is the fittest of three random entrants, so a member's chance follows its rank alone
+def testTournamentSelect():
+    fitness = np.array([5.0, -3.0, 100.0, 0.0, 2.0])
+    rates = pickRates(tournamentSelect, fitness)
+    ranks = np.argsort(np.argsort(fitness)) #0 for the worst
+    expected = ((ranks+1)**3 - ranks**3) / len(fitness)**3
+    np.testing.assert_allclose(rates, expected, atol=0.005)
+
+    rng = np.random.default_rng(3)
+    entrants = np.random.default_rng(3).integers(0, 5, size=(50, 3))
+    assert list(tournamentSelect(fitness, 50, rng)) == [row[np.argmax(fitness[row])] for row in entrants]
+
+#Every child is its first parent up to a point past the first gene and before the last, and its second parent after it
+def testSinglePointCrossover():
+    count, numGenes = 300, 9
+    parentsA = np.zeros((count, numGenes), dtype=np.float32)
+    parentsB = np.ones((count, numGenes), dtype=np.float32)
+    children = singlePointCrossover(parentsA, parentsB, np.random.default_rng(0))
+    points = (children == 0).sum(axis=1)
+    assert points.min() == 1 and points.max() == numGenes-1
+    np.testing.assert_array_equal(children, np.arange(numGenes)[None, :] >= points[:, None])
+
+    out = np.empty_like(parentsA)
+    assert singlePointCrossover(parentsA, parentsB, np.random.default_rng(0), out=out) is out
+    np.testing.assert_array_equal(out, children)
+
+#10% of the genes, and at least one however short the genome, change by at most 1
+@pytest.mark.parametrize("numGenes, numMutated", [(2, 1), (9, 1), (40, 4), (235, 24)])
+def testRandomMutation(numGenes, numMutated):
+    children = np.random.default_rng(1).random((200, numGenes), dtype=np.float32)
+    original = children.copy()
+    mutated = randomMutation(children, np.random.default_rng(2))
+    np.testing.assert_array_equal(children, original)
+    assert mutated.dtype == np.float32
+    changed = mutated != original
+    assert (changed.sum(axis=1) == numMutated).all()
+    assert np.abs(mutated - original).max() <= 1.0
+
+    assert randomMutation(children, np.random.default_rng(2), inPlace=True) is children
+    np.testing.assert_array_equal(children, mutated)
+
+#The fittest half carries over, fittest first and with its fitness, and the best fitness never drops
+def testEliteCarryOver():
+    fitnessFunc = lambda genomes: -np.abs(genomes - 0.5).sum(axis=1)
+    population = np.random.default_rng(0).random((12, 6), dtype=np.float32)
+    best = []
+    GA = GeneticAlgorithm(population, fitnessFunc, lambda GA: best.append(GA.fitness.max()), 3, 6, rng=np.random.default_rng(1))
+    GA.run(1)
+    previous, previousFitness = GA.population.copy(), GA.fitness.copy()
+    assert GA.breed() == 6
+    order = np.argsort(-previousFitness, kind="stable")[:6]
+    np.testing.assert_array_equal(GA.population[:6], previous[order])
+    np.testing.assert_array_equal(GA.fitness[:6], previousFitness[order])
+    GA.fitness[6:] = fitnessFunc(GA.population[6:])
+
+    GA.run(20, GA.fitness)
+    assert len(best) == 21 and all(a <= b for a, b in zip(best, best[1:]))
@@ -0,0 +1,104 @@
+from Game.Grid import Grid, Direction, EMPTY, FOOD, WALL, BODY
+from test_VecGrid import ScriptedAgent
+import numpy as np
+import pytest
+
+#Sizes include boards wider and taller than 64 points, so the bitboards don't fit in a machine word
+SIZES = [(10, 10), (7, 13), (23, 5), (70, 9), (6, 80)]
+
+#A set up Grid with random interior cells filled, through setType so the free cell index and bitboards follow
+def randomBoard(cols, rows, seed, density=0.3):
+    rng = np.random.default_rng(seed)
+    grid = Grid(cols, rows, None)
+    grid.Setup()
+    for y in range(1, rows-1):
+        for x in range(1, cols-1):
+            if(rng.random() < density):
+                grid.setType(grid.getCell(x, y), int(rng.choice([BODY, FOOD])))
+            elif(rng.random() < density):
+                grid.setType(grid.getCell(x, y), EMPTY)
+    return grid
+
+#Walks from a cell point by point until something that isn't empty, the way Grid.look did before the bitboards
+def scan(grid, cell, direction):
+    dist = 0
+    while(True):
+        cell += grid.offsets[direction]
+        dist += 1
+        if(grid.cells[cell] != EMPTY):
+            return (grid.cells[cell], dist)
+
+#Every direction the game looks in, from every cell inside the walls, empty or not
+@pytest.mark.parametrize("cols, rows", SIZES)
+@pytest.mark.parametrize("seed", range(3))
+def testLookMatchesScan(cols, rows, seed):
+    grid = randomBoard(cols, rows, seed)
+    for y in range(1, rows-1):
+        for x in range(1, cols-1):
+            cell = grid.getCell(x, y)
+            for direction in Direction:
+                assert grid.look(cell, direction) == scan(grid, cell, direction), (x, y, direction)
+
+#With the snake and food cleared away, every look from a corner ends at the wall
+def testLookSeesWalls():
+    grid = Grid(12, 9, None)
+    grid.Setup()
+    for cell in range(grid.numPoints):
+        if(grid.cells[cell] != WALL):
+            grid.setType(cell, EMPTY)
+    cell = grid.getCell(1, 1)
+    assert grid.look(cell, Direction.RIGHT) == (WALL, 10)
+    assert grid.look(cell, Direction.UP) == (WALL, 7)
+    assert grid.look(cell, Direction.LEFT) == (WALL, 1)
+    assert grid.look(cell, Direction.DOWN) == (WALL, 1)
+
+#freeCells holds every empty cell once, freePos gives each one's position in it and -1 for the rest,
+#and the bitboards have a bit set for exactly the cells that aren't empty
+def assertIndexed(grid):
+    assert len(grid.freePos) == grid.numPoints
+    for i, cell in enumerate(grid.freeCells):
+        assert grid.freePos[cell] == i
+    empty = {cell for cell in range(grid.numPoints) if grid.cells[cell] == EMPTY}
+    assert len(grid.freeCells) == len(empty) and set(grid.freeCells) == empty
+    assert all(grid.freePos[cell] == -1 for cell in range(grid.numPoints) if cell not in empty)
+    for cell in range(grid.numPoints):
+        y, x = divmod(cell, grid.colNum)
+        occupied = cell not in empty
+        assert (grid.rowMasks[y] >> x) & 1 == occupied and (grid.colMasks[x] >> y) & 1 == occupied
+
+#Several games on one grid, checked after Setup, after every move (eating, moving and dying) and after every reset
+@pytest.mark.parametrize("cols, rows", [(8, 8), (12, 7), (6, 15)])
+def testFreeCellIndex(cols, rows):
+    agent = ScriptedAgent(cols*rows)
+    grid = Grid(cols, rows, agent)
+    grid.Setup()
+    assertIndexed(grid)
+    eaten = 0
+    for game in range(6):
+        grid.reset(game if game % 2 == 0 else None)
+        agent.reset()
+        assertIndexed(grid)
+        grid.gameRunning = True
+        while(grid.gameRunning):
+            grid.gameLoop()
+            assertIndexed(grid)
+        assert agent.died
+        eaten += agent.foodEaten
+    assert eaten > 0
+    grid.reset()
+    assertIndexed(grid)
+
+#Cells changed directly, in any order and to any type, keep the index whole
+def testFreeCellIndexRandomEdits():
+    rng = np.random.default_rng(0)
+    grid = Grid(9, 11, None)
+    grid.Setup()
+    for edit in range(2000):
+        cell = int(rng.integers(0, grid.numPoints))
+        grid.setType(cell, int(rng.choice([EMPTY, EMPTY, FOOD, BODY, WALL])))
+        if(edit % 100 == 0):
+            assertIndexed(grid)
+    assertIndexed(grid)
+    grid.reset()
+    assertIndexed(grid)
+    assert [cell for cell in range(grid.numPoints) if grid.cells[cell] != grid.startCells[cell]] == [grid.food]
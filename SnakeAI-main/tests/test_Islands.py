@@ -0,0 +1,87 @@
+from Agent.Islands import Migration, packMigrants, unpackMigrants, islandAuthkey
+from multiprocessing.connection import Client
+from multiprocessing import AuthenticationError
+import numpy as np
+import socket
+import time
+import pytest
+
+#Ports nothing is listening on, found by letting the OS pick them
+def freeAddresses(count):
+    sockets = [socket.socket() for i in range(count)]
+    for sock in sockets:
+        sock.bind(("127.0.0.1", 0))
+    addresses = [sock.getsockname() for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return addresses
+
+#Two islands, 0 sending to 1, with populations of 4 genomes of 3 genes
+@pytest.fixture
+def islands():
+    addresses = freeAddresses(2)
+    pair = [Migration(i, addresses, count=2, timeout=2.0) for i in range(2)]
+    yield pair
+    for island in pair:
+        island.close()
+
+def population(value):
+    return np.full((4, 3), value, dtype=np.float32), np.arange(4, dtype=np.float64)
+
+#Sends island 0's migrants to island 1, and waits for island 1 to take them in. Returns how many it took.
+def migrate(islands, wait=5.0):
+    start = time.perf_counter()
+    islands[0].exchange(*population(1.0))
+    assert time.perf_counter() - start < wait
+    genomes, fitness = population(0.0)
+    received = 0
+    while(received == 0 and time.perf_counter() - start < wait):
+        time.sleep(0.05)
+        received = islands[1].exchange(genomes, fitness)
+    return received
+
+def testMigrants(islands):
+    assert migrate(islands) == 2
+
+def testPackedMigrantsRoundTrip():
+    genomes = np.random.default_rng(0).random((3, 5), dtype=np.float32)
+    source, unpacked, fitness = unpackMigrants(packMigrants(2, genomes, [1.0, 2.0, 3.0]))
+    assert source == 2 and list(fitness) == [1.0, 2.0, 3.0]
+    np.testing.assert_array_equal(unpacked, genomes)
+    with pytest.raises(ValueError):
+        unpackMigrants(packMigrants(2, genomes, [1.0, 2.0, 3.0])[:-1])
+
+#A connection that never authenticates, like a port scan left open, and one that drops straight away
+def testStrayConnections(islands):
+    stray = socket.create_connection(islands[1].addresses[1])
+    socket.create_connection(islands[1].addresses[1]).close()
+    try:
+        assert migrate(islands) == 2
+    finally:
+        stray.close()
+
+def testWrongKey(islands):
+    with pytest.raises(AuthenticationError):
+        Client(islands[1].addresses[1], authkey=b"not the key")
+    assert migrate(islands) == 2
+
+#A neighbour that accepts connections but never answers the handshake costs one timeout, and its migrants are dropped
+def testUnresponsiveNeighbour():
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen()
+    addresses = freeAddresses(1) + [silent.getsockname()]
+    island = Migration(0, addresses, count=2, timeout=0.5)
+    try:
+        start = time.perf_counter()
+        assert island.exchange(*population(1.0)) == 0
+        assert time.perf_counter() - start < 2.0
+    finally:
+        island.close()
+        silent.close()
+
+def testRemoteIslandsNeedKey():
+    assert islandAuthkey([("127.0.0.1", 6000), ("localhost", 6001)]) != None
+    with pytest.raises(ValueError):
+        islandAuthkey([("127.0.0.1", 6000), ("10.0.0.2", 6000)])
+    assert islandAuthkey([("10.0.0.2", 6000)], "secret") == b"secret"
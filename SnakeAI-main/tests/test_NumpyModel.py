@@ -0,0 +1,32 @@
+from Agent.NumpyModel import NumpyModel, readSavedLayers
+import numpy as np
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#The bundled Small SavedModel, read from its directory even if training has since saved a Small.npz
+SMALL = os.path.join(ROOT, "Agent", "Models", "Small")
+#States from a few VecGrid games, and the outputs the Keras model loaded by TensorFlow gave for them
+REFERENCE = os.path.join(ROOT, "tests", "data", "Small_reference.npz")
+
+def testReadsSavedLayers():
+    assert readSavedLayers(SMALL) == [(13, 16, "relu"), (16, 8, "relu"), (8, 3, "softmax")]
+
+def testMatchesKerasOutputs():
+    model = NumpyModel.load(SMALL)
+    with np.load(REFERENCE) as reference:
+        np.testing.assert_allclose(model(reference["states"]), reference["outputs"], rtol=1e-5, atol=1e-6)
+
+def testNpzRoundTrip(tmp_path):
+    model = NumpyModel.load(SMALL)
+    path = str(tmp_path / "Small.npz")
+    model.save(path)
+    loaded = NumpyModel.load(path)
+    assert loaded.layers == model.layers
+    np.testing.assert_array_equal(loaded.getWeightsVector(), model.getWeightsVector())
+
+def testWeightsVectorRoundTrip():
+    model = NumpyModel.create([5, 4], rng=np.random.default_rng(0))
+    vector = np.arange(model.numParams, dtype=np.float32)
+    model.setWeightsVector(vector)
+    np.testing.assert_array_equal(model.getWeightsVector(), vector)
+    assert [kernel.shape for kernel in model.kernels] == [(13, 5), (5, 4), (4, 3)]
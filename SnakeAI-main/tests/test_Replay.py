@@ -0,0 +1,56 @@
+from Game.Replay import Episode, Replay, ENGINE_CLASSES, ENGINES, GRID, packActions, unpackActions
+from Game.VecGrid import FOOD
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("count", list(range(10)) + [257, 1001])
+def testPackRoundTrip(count):
+    actions = np.random.default_rng(count).integers(0, 3, size=count)
+    packed = packActions(actions)
+    assert len(packed) == -(-count//4)
+    np.testing.assert_array_equal(unpackActions(packed, count), actions)
+
+#The state an engine's game would give its agent
+def engineState(engine):
+    if(isinstance(engine, ENGINE_CLASSES[GRID])):
+        return engine.grid.getState()
+    return engine.games.getStates()[0]
+
+#Plays up to count random moves that don't run into anything, on a fresh engine.
+#Returns the moves, and the board after each of them (the starting board first).
+def playSafely(engineName, cols, rows, seed, count):
+    rng = np.random.default_rng(seed)
+    engine = ENGINE_CLASSES[engineName](cols, rows, seed)
+    moves = []
+    boards = [engine.board().copy()]
+    for step in range(count):
+        state = engineState(engine)
+        safe = [move for move in range(3) if state[4+2*move] > 1 or state[3+2*move] == FOOD]
+        if(not safe):
+            break
+        moves.append(int(rng.choice(safe)))
+        engine.step(moves[-1])
+        boards.append(engine.board().copy())
+    return moves, boards
+
+@pytest.mark.parametrize("engineName", ENGINES)
+def testSeekingMatchesSteppingForward(engineName):
+    moves, boards = playSafely(engineName, 12, 10, 7, 120)
+    assert len(moves) > 30
+    replay = Replay(Episode.fromActions(engineName, 12, 10, 7, moves), keyframeEvery=8)
+
+    for step in range(len(boards)):
+        np.testing.assert_array_equal(replay.board(step), boards[step])
+    #Backwards, then jumping around, past keyframes and to the same step twice
+    for step in list(reversed(range(len(boards)))) + list(np.random.default_rng(0).integers(0, len(boards), size=50)):
+        np.testing.assert_array_equal(replay.board(step), boards[step])
+    np.testing.assert_array_equal(replay.board(len(boards)+10), boards[-1])
+    np.testing.assert_array_equal(replay.board(-3), boards[0])
+
+def testEpisodeSaveLoad(tmp_path):
+    episode = Episode.fromActions(GRID, 12, 10, 7, [0, 1, 2, 1, 1], {"fitness": 3.5})
+    path = str(tmp_path / "episode.npz")
+    episode.save(path)
+    loaded = Episode.load(path)
+    assert (loaded.engine, loaded.cols, loaded.rows, loaded.seed, loaded.steps, loaded.info) == (GRID, 12, 10, 7, 5, {"fitness": 3.5})
+    assert list(loaded.actions()) == [0, 1, 2, 1, 1]
@@ -0,0 +1,41 @@
+from Agent.Scheduler import StepEstimator, planTasks
+import numpy as np
+import pytest
+
+#Expected steps shaped like a generation's: mostly short games with a few long ones, all equal, all zero, and a single row
+CASES = [np.random.default_rng(0).pareto(1.5, size=101)*50 + 1,
+         np.full(64, 300.0),
+         np.zeros(17),
+         np.array([42.0])]
+
+@pytest.mark.parametrize("expectedSteps", CASES)
+@pytest.mark.parametrize("numWorkers", [1, 3, 8, 200])
+def testEveryRowOnce(expectedSteps, numWorkers):
+    tasks = planTasks(expectedSteps, numWorkers)
+    rows = [row for task in tasks for row in task]
+    assert sorted(rows) == list(range(len(expectedSteps)))
+    assert all(task for task in tasks)
+
+def testNoRows():
+    assert planTasks([], 4) == []
+
+@pytest.mark.parametrize("numWorkers", [1, 4])
+def testLongestFirstWithinBudget(numWorkers):
+    expectedSteps = CASES[0]
+    tasks = planTasks(expectedSteps, numWorkers, tasksPerWorker=8)
+    rows = [row for task in tasks for row in task]
+    assert np.all(np.diff(expectedSteps[rows]) <= 0)
+    #Only a single game longer than the budget gets a task over it
+    budget = expectedSteps.sum() / (numWorkers*8)
+    for task in tasks:
+        assert len(task) == 1 or expectedSteps[task].sum() <= budget
+
+def testEstimatesFromClosestGenome():
+    estimator = StepEstimator(bankSize=4, blockRows=2)
+    assert np.array_equal(estimator.estimate(np.zeros((3, 2))), np.ones(3))
+    estimator.record(np.array([[0, 0], [10, 0], [0, 10]]), [5, 50, 500])
+    assert list(estimator.estimate(np.array([[1, 1], [9, 1], [1, 9]]))) == [5, 50, 500]
+    #The bank holds 4, so recording 2 more overwrites the oldest
+    estimator.record(np.array([[10, 10], [1, 0]]), [7, 9])
+    assert estimator.count == 4
+    assert list(estimator.estimate(np.array([[0, 0], [9, 9]]))) == [9, 7]
@@ -0,0 +1,99 @@
+from Agent.StatsSummary import buildLevels, summaryWindow, modelSummary, FACTOR
+from Agent.TrainingLog import LogWriter
+import Agent.StatsSummary as StatsSummary
+import numpy as np
+import os
+import pytest
+
+#The min, max and mean of the raw values in each bucket of the given width, buckets starting at generation 0
+def rawBuckets(values, bucket):
+    chunks = [values[i:i+bucket] for i in range(0, len(values), bucket)]
+    return np.array([[chunk.min(), chunk.max(), chunk.mean()] for chunk in chunks])
+
+@pytest.mark.parametrize("length", [1, 2, 4, 5, 17, 64, 1000])
+def testLevelsMatchRaw(length):
+    values = np.random.default_rng(length).normal(100, 40, size=length)
+    levels = buildLevels(values)
+    assert len(levels[-1]) == 1
+    for k, level in enumerate(levels):
+        np.testing.assert_allclose(level, rawBuckets(values, FACTOR**k), rtol=1e-12)
+
+#A run's log, as training writes it, with the avg and peak of every generation and every member's fitness
+def writeRun(statPath, fitness, resume=False):
+    columns = {"avg": (np.float64, 1), "peak": (np.float64, 1), "fitness": (np.float64, fitness.shape[1])}
+    writer = LogWriter(os.path.join(statPath, "log"), columns, resume=resume)
+    for generation in fitness:
+        writer.append(avg=generation.mean(), peak=generation.max(), fitness=generation)
+    writer.close()
+
+@pytest.fixture
+def run(tmp_path):
+    fitness = np.random.default_rng(0).normal(200, 60, size=(777, 6))
+    writeRun(str(tmp_path), fitness)
+    return str(tmp_path), fitness
+
+#Whatever the window, the level used is the finest that fits in maxPoints buckets, and its buckets are those of the raw log
+@pytest.mark.parametrize("start, stop, maxPoints", [(0, 777, 1000), (0, 777, 100), (0, 777, 10), (0, 777, 1),
+                                                    (100, 140, 40), (100, 140, 39), (3, 500, 20), (700, 5000, 30), (-50, 9, 3)])
+def testWindowMatchesRaw(run, start, stop, maxPoints):
+    statPath, fitness = run
+    path, header = modelSummary(statPath)
+    raw = {"avg": fitness.mean(axis=1), "peak": fitness.max(axis=1)}
+    raw["low"], raw["high"] = np.percentile(fitness, [10, 90], axis=1)
+    start, stop = max(0, start), min(len(fitness), stop)
+
+    bucket = 1
+    while(-(-(stop-start) // bucket) > maxPoints and bucket < len(fitness)):
+        bucket *= FACTOR
+    first, last = start // bucket, -(-stop // bucket)
+    for name, values in raw.items():
+        centers, low, high, mean = summaryWindow(path, header, name, start, stop, maxPoints)
+        np.testing.assert_allclose(centers, np.arange(first, last)*bucket + (bucket-1)/2)
+        expected = rawBuckets(values, bucket)[first:last]
+        np.testing.assert_allclose(np.stack([low, high, mean], axis=1), expected, rtol=1e-12)
+
+def testEmptyWindow(run):
+    path, header = modelSummary(run[0])
+    assert all(len(part) == 0 for part in summaryWindow(path, header, "avg", 500, 500, 10))
+    assert all(len(part) == 0 for part in summaryWindow(path, header, "avg", 900, 1000, 10))
+
+#The summary is built once, and built again whenever the stats it was built from change size or modification time
+def testRebuiltWhenStale(run, monkeypatch):
+    statPath, fitness = run
+    builds = []
+    buildSummary = StatsSummary.buildSummary
+    def countedBuild(path, series, source):
+        builds.append(len(series["avg"]))
+        return buildSummary(path, series, source)
+    monkeypatch.setattr(StatsSummary, "buildSummary", countedBuild)
+
+    modelSummary(statPath)
+    modelSummary(statPath)
+    assert builds == [777]
+
+    #More generations logged, the files grow
+    more = np.random.default_rng(1).normal(300, 60, size=(50, 6))
+    writeRun(statPath, more, resume=True)
+    path, header = modelSummary(statPath)
+    assert builds == [777, 827] and header["rows"] == 827
+    centers, low, high, mean = summaryWindow(path, header, "avg", 777, 827, 100)
+    np.testing.assert_allclose(mean, more.mean(axis=1))
+
+    #The same number of generations rewritten, only the modification time tells the change
+    avgPath = os.path.join(statPath, "log", "avg.bin")
+    stamp = os.path.getmtime(avgPath)
+    np.full(827, 5.0).tofile(avgPath)
+    os.utime(avgPath, (stamp+10, stamp+10))
+    path, header = modelSummary(statPath)
+    assert builds == [777, 827, 827]
+    assert summaryWindow(path, header, "avg", 0, 827, 1)[3][0] == 5.0
+
+#Runs from before logs are summarized from their CSVs, without the percentile series
+def testCsvRun(tmp_path):
+    avg = np.arange(30.0)
+    np.savetxt(str(tmp_path / "avg.csv"), avg, delimiter=", ")
+    np.savetxt(str(tmp_path / "peak.csv"), avg*2, delimiter=", ")
+    path, header = modelSummary(str(tmp_path))
+    assert header["series"] == ["avg", "peak"] and header["rows"] == 30
+    centers, low, high, mean = summaryWindow(path, header, "peak", 0, 30, 8)
+    np.testing.assert_allclose(mean, rawBuckets(avg*2, 4)[:, 2])
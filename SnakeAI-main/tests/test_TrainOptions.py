@@ -0,0 +1,31 @@
+from Agent.TrainOptions import TrainOptions
+import pytest
+
+#A resumed run takes its settings from the checkpoint, keeps how this invocation plays its games, and can only gain generations
+def testResumedTakesCheckpointSettings():
+    started = TrainOptions(40, 100, 10, selection="tournament", seed=3, episodes=2, race=0.9).completed()
+    info = started.settings()
+    info["generation"] = 60
+
+    resumed = TrainOptions(generations=80, workers=4, resume=True).resumed(info)
+    assert resumed.settings() == started.settings()
+    assert (resumed.workers, resumed.resume) == (4, True)
+    assert TrainOptions(generations=150).resumed(info).generations == 150
+
+#Checkpoints from before a setting existed resume with its default
+def testResumedDefaultsMissingSettings():
+    info = {"generation": 5, "generations": 10, "populationSize": 20, "parents": 4, "mode": "generational",
+            "replacement": "worst", "interval": None, "seed": None, "reseed": 0}
+    resumed = TrainOptions(selection="tournament", episodes=5).resumed(info)
+    assert (resumed.selection, resumed.episodes, resumed.race) == ("rws", 1, None)
+
+def testCompleted():
+    assert TrainOptions(30, 5, 4, mode="steady-state").completed().interval == 30
+    options = TrainOptions(30, 5, 4, episodes=3).completed()
+    assert options.seed != None and options.reseed == 1
+    assert TrainOptions(30, 5, 4, episodes=3, seed=7, reseed=4).completed().settings()["reseed"] == 4
+
+@pytest.mark.parametrize("options", [TrainOptions(mode="steady-state", record=True), TrainOptions(mode="steady-state", episodes=2)])
+def testValidate(options):
+    with pytest.raises(ValueError):
+        options.validate()
@@ -0,0 +1,37 @@
+from Agent.Training import Population
+from Agent.TrainOptions import TrainOptions
+from Agent.BatchedModel import BatchedModel
+from Agent.NumpyModel import NumpyModel
+import numpy as np
+
+#A Population set up to play batched games, as run does, without loading a model or writing stats
+def batchedPopulation(template, record=False):
+    pop = Population({"gridHeight": 12, "gridWidth": 10})
+    pop.options = TrainOptions(record=record)
+    pop.profile = None
+    pop.pool = None
+    pop.games = None
+    pop.batchModel = BatchedModel(template.layers)
+    return pop
+
+#The games of one generation are kept for the next, and play exactly as games on a new VecGrid would,
+#whether the next generation has fewer, the same or more games
+def testGamesReusedAcrossGenerations():
+    template = NumpyModel.create([8], rng=np.random.default_rng(0))
+    solutions = np.random.default_rng(1).normal(0, 1, size=(20, template.numParams)).astype(np.float32)
+    generations = [(slice(0, 12), 3), (slice(0, 6), 4), (slice(3, 5), 5), (slice(0, 12), 3), (slice(0, 20), 6)]
+
+    pop = batchedPopulation(template, record=True)
+    played = []
+    grids = []
+    for rows, seed in generations:
+        played.append(pop.playBatched(solutions[rows], seed))
+        grids.append(pop.games)
+    assert grids[0] is grids[1] is grids[2] is grids[3] and grids[4].numGames == 20
+
+    for (rows, seed), stats in zip(generations, played):
+        expected = batchedPopulation(template, record=True).playBatched(solutions[rows], seed)
+        assert set(stats) == set(expected)
+        for name in ["foodEaten", "movement", "died", "steps", "seeds"]:
+            np.testing.assert_array_equal(stats[name], expected[name])
+        assert stats["actions"] == expected["actions"]
@@ -0,0 +1,111 @@
+from Agent.TrainingLog import LogWriter, readLog, hasLog, importCsv
+import numpy as np
+import os
+import pytest
+
+COLUMNS = {"avg": (np.float64, 1), "fitness": (np.float32, 4), "died": (np.int64, 4)}
+
+#Generation g's row of every column, so any row read back can be checked against where it came from
+def row(g):
+    return {"avg": g*1.5, "fitness": np.arange(4, dtype=np.float32) + g, "died": np.full(4, g, dtype=np.int64)}
+
+def writeLog(path, generations, **options):
+    writer = LogWriter(path, COLUMNS, **options)
+    for g in generations:
+        writer.append(**row(g))
+    writer.close()
+
+def assertRows(path, generations):
+    log = readLog(path)
+    assert set(log) == set(COLUMNS)
+    for name, (dtype, width) in COLUMNS.items():
+        assert log[name].shape == (len(generations), width) and log[name].dtype == dtype
+        for i, g in enumerate(generations):
+            np.testing.assert_array_equal(log[name][i], np.reshape(row(g)[name], -1))
+
+def testRoundTrip(tmp_path):
+    path = str(tmp_path / "log")
+    assert not hasLog(path)
+    writeLog(path, range(25), flushEvery=7)
+    assert hasLog(path)
+    assertRows(path, range(25))
+
+def testEmptyLog(tmp_path):
+    path = str(tmp_path / "log")
+    writeLog(path, [])
+    assert {name: column.shape for name, column in readLog(path).items()} == {"avg": (0, 1), "fitness": (0, 4), "died": (0, 4)}
+
+#Starting a run again without resume replaces the old log
+def testReplacedWithoutResume(tmp_path):
+    path = str(tmp_path / "log")
+    writeLog(path, range(10))
+    writeLog(path, range(100, 103))
+    assertRows(path, range(100, 103))
+
+def testResumeAppends(tmp_path):
+    path = str(tmp_path / "log")
+    writeLog(path, range(10))
+    writeLog(path, range(10, 15), resume=True)
+    assertRows(path, range(15))
+
+def testResumeHeaderMismatch(tmp_path):
+    path = str(tmp_path / "log")
+    writeLog(path, range(3))
+    for columns in [{"avg": (np.float64, 1)}, dict(COLUMNS, fitness=(np.float32, 5)), dict(COLUMNS, died=(np.int32, 4))]:
+        with pytest.raises(ValueError):
+            LogWriter(path, columns, resume=True)
+    assertRows(path, range(3))
+
+#Resuming from a checkpoint older than the end of the log drops the generations after it, which are then played again
+def testTruncateOnResume(tmp_path):
+    path = str(tmp_path / "log")
+    writeLog(path, range(20))
+    writer = LogWriter(path, COLUMNS, resume=True)
+    writer.truncate(12)
+    for g in range(50, 53):
+        writer.append(**row(g))
+    writer.close()
+    assertRows(path, list(range(12)) + [50, 51, 52])
+
+#A crash part way through writing a row leaves columns of different lengths. Readers see only the whole rows,
+#and a resumed writer cuts the partial row off before appending.
+@pytest.mark.parametrize("cut", [1, 8, 15])
+def testPartialTrailingRow(tmp_path, cut):
+    path = str(tmp_path / "log")
+    writeLog(path, range(6))
+    with open(os.path.join(path, "fitness.bin"), "ab") as file:
+        file.write(row(6)["fitness"].tobytes()[:cut])
+    with open(os.path.join(path, "avg.bin"), "ab") as file:
+        file.write(np.float64(row(6)["avg"]).tobytes())
+    assertRows(path, range(6))
+
+    writeLog(path, range(6, 9), resume=True)
+    assertRows(path, range(9))
+    for name, (dtype, width) in COLUMNS.items():
+        assert os.path.getsize(os.path.join(path, name + ".bin")) == 9*np.dtype(dtype).itemsize*width
+
+def testAppendChecksWidth(tmp_path):
+    writer = LogWriter(str(tmp_path / "log"), COLUMNS)
+    with pytest.raises(ValueError):
+        writer.append(avg=1.0, fitness=np.zeros(3), died=np.zeros(4))
+    writer.close()
+
+#The CSVs older runs saved, written the same way Training.saveStats writes them
+@pytest.mark.parametrize("generations", [1, 40])
+def testImportCsv(tmp_path, generations):
+    avg = np.random.default_rng(generations).normal(200, 50, size=generations)
+    peak = avg + 30
+    np.savetxt(str(tmp_path / "avg.csv"), avg, delimiter=", ")
+    np.savetxt(str(tmp_path / "peak.csv"), peak, delimiter=", ")
+    assert importCsv(str(tmp_path)) == generations
+    log = readLog(str(tmp_path / "log"))
+    assert set(log) == {"avg", "peak"}
+    np.testing.assert_array_equal(log["avg"][:, 0], avg)
+    np.testing.assert_array_equal(log["peak"][:, 0], peak)
+
+#A peak.csv longer than avg.csv (a run stopped between writing the two) is cut to the shorter
+def testImportCsvUnevenLengths(tmp_path):
+    np.savetxt(str(tmp_path / "avg.csv"), np.arange(5.0), delimiter=", ")
+    np.savetxt(str(tmp_path / "peak.csv"), np.arange(7.0), delimiter=", ")
+    assert importCsv(str(tmp_path), str(tmp_path / "imported")) == 5
+    assert readLog(str(tmp_path / "imported"))["peak"].shape == (5, 1)
@@ -0,0 +1,95 @@
+from Agent.Agents import AIAgent
+from Game.Grid import Grid
+from Game.VecGrid import VecGrid, FOOD, DX, DY
+import numpy as np
+import pytest
+
+#Heads for the food, avoiding anything right next to it, with a random move now and then so games differ.
+#Remembers every state it saw and move it made.
+class ScriptedAgent(AIAgent):
+    def __init__(self, seed, noise=0.1):
+        super().__init__(None)
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise
+        self.states = []
+        self.moves = []
+
+    def ChooseMove(self, input):
+        x, y, heading = input[0], input[1], input[2]-1
+        safe = [move for move in range(3) if input[4+2*move] > 1 or input[3+2*move] == FOOD]
+        if(not safe or self.rng.random() < self.noise):
+            move = int(self.rng.integers(0, 3))
+        else:
+            #Manhattan distance to the food after each safe move, moves are left, forward and right of heading
+            def distance(move):
+                direction = (heading+move-1) % 4
+                return abs(x+DX[direction]-input[10]) + abs(y+DY[direction]-input[11])
+            move = min(safe, key=distance)
+        self.states.append(np.array(input))
+        self.moves.append(move)
+        return move
+
+#The two engines draw food differently from a seed, so the VecGrid is handed the food cells the Grid game placed, in order
+class QueuedFoodGrid(VecGrid):
+    def __init__(self, cols, rows, foods, energyMax=300):
+        self.foods = list(foods)
+        super().__init__(1, cols, rows, energyMax=energyMax, autoReset=False)
+
+    def placeRandomFood(self, games):
+        if(self.foods):
+            cell = self.foods.pop(0)
+            self.food[games] = cell
+            self.flat[games, cell] = FOOD
+
+#Plays one seeded game on a Grid, returning the agent and every food cell placed
+def playGrid(cols, rows, agent, seed):
+    grid = Grid(cols, rows, agent)
+    grid.Setup()
+    foods = []
+    place = grid.placeRandomFood
+    def recordFood():
+        place()
+        foods.append(grid.food)
+    grid.placeRandomFood = recordFood
+    grid.reset(seed)
+    agent.reset()
+    grid.startLoopNoGUI()
+    return agent, foods
+
+#Plays the same moves on a VecGrid, checking every state matches, and returns its stats
+def replayVec(cols, rows, agent, foods, energyMax=300):
+    games = QueuedFoodGrid(cols, rows, foods, energyMax)
+    #The reset in VecGrid's constructor has already taken the first food
+    for state, move in zip(agent.states, agent.moves):
+        assert games.running[0]
+        np.testing.assert_array_equal(games.getStates()[0], state)
+        games.step(np.array([move]))
+    assert not games.running[0]
+    return games.lastSteps[0], games.lastMovement[0], games.lastFoodEaten[0], bool(games.lastDied[0])
+
+@pytest.mark.parametrize("cols, rows", [(10, 10), (30, 30), (8, 12), (20, 6)])
+@pytest.mark.parametrize("seed", range(5))
+def testMatchesGrid(cols, rows, seed):
+    agent, foods = playGrid(cols, rows, ScriptedAgent(seed), seed)
+    assert replayVec(cols, rows, agent, foods) == (agent.steps, agent.movement, agent.foodEaten, agent.died)
+
+#A snake that only ever goes forward from the middle of a large board runs out of energy long before it reaches the wall
+class ForwardAgent(ScriptedAgent):
+    def ChooseMove(self, input):
+        self.states.append(np.array(input))
+        self.moves.append(1)
+        return 1
+
+def testStarvationMatchesGrid():
+    agent = ForwardAgent(0)
+    agent.energyMax = 8
+    agent, foods = playGrid(30, 30, agent, 3)
+    assert agent.steps == 8 and agent.foodEaten == 0 and agent.died
+    assert replayVec(30, 30, agent, foods, energyMax=8) == (agent.steps, agent.movement, agent.foodEaten, agent.died)
+
+def testSeededFoodRepeats():
+    first = VecGrid(4, 10, 10, autoReset=False)
+    second = VecGrid(4, 10, 10, autoReset=False)
+    first.reset(seeds=[1, 2, 3, 4])
+    second.reset(seeds=[1, 2, 3, 4])
+    np.testing.assert_array_equal(first.food, second.food)